@@ -0,0 +1,90 @@
+import gc
+import sys
+import time
+import tracemalloc
+
+
+def percentile(sorted_samples, p):
+    if not sorted_samples:
+        return 0
+    idx = min(len(sorted_samples) - 1, int(len(sorted_samples) * p / 100))
+    return sorted_samples[idx]
+
+
+def measure_ops(fn, batches):
+    """
+    Mỗi batch là 1 list args: gọi fn(*args) cho từng phần tử, lấy median ops/s của các batch.
+    Trả về {"ops_per_s", "ops_per_s_spread"}: spread = (max - min) / median, dùng làm
+    ngưỡng nhiễu khi so sánh với baseline.
+    (Op làm đổi trạng thái như put-evict cần batch khác nhau cho mỗi lần lặp.)
+    GC tắt trong lúc đo để số liệu ổn định giữa các lần chạy.
+    """
+    rates = []
+    for args_list in batches:
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            for args in args_list:
+                fn(*args)
+            elapsed = time.perf_counter() - t0
+        finally:
+            gc.enable()
+        rates.append(len(args_list) / elapsed if elapsed > 0 else 0)
+    return summarize_rates(rates)
+
+
+def summarize_rates(rates):
+    rates = sorted(rates)
+    median = rates[len(rates) // 2]
+    return {
+        "ops_per_s": median,
+        "ops_per_s_spread": (rates[-1] - rates[0]) / median if median else 0
+    }
+
+
+def measure_latency(fn, args_list):
+    """Latency từng op (µs): p50/p99/max"""
+    perf_ns = time.perf_counter_ns
+    samples = []
+    append = samples.append
+    gc.collect()
+    gc.disable()
+    try:
+        for args in args_list:
+            t0 = perf_ns()
+            fn(*args)
+            append(perf_ns() - t0)
+    finally:
+        gc.enable()
+    samples.sort()
+    return {
+        "p50_us": percentile(samples, 50) / 1000,
+        "p99_us": percentile(samples, 99) / 1000,
+        "max_us": samples[-1] / 1000 if samples else 0
+    }
+
+
+def measure_allocs(fn, args_list):
+    """
+    Cấp phát trên mỗi op:
+    - alloc_blocks_per_op: số block Python giữ lại sau khi chạy (sys.getallocatedblocks)
+    - alloc_bytes_per_op: peak bộ nhớ cấp phát thêm trong lúc chạy (tracemalloc)
+    """
+    n = max(1, len(args_list))
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for args in args_list:
+            fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    gc.collect()
+    return {
+        "alloc_blocks_per_op": (sys.getallocatedblocks() - blocks_before) / n,
+        "alloc_bytes_per_op": (peak - base) / n
+    }
@@ -0,0 +1,48 @@
+# Chiều "tốt hơn" của từng metric; metric không có ở đây thì chỉ ghi lại, không so sánh
+HIGHER_IS_BETTER = {"ops_per_s", "hit_ratio"}
+LOWER_IS_BETTER = {"p50_us", "p99_us", "alloc_blocks_per_op", "alloc_bytes_per_op"}
+
+# Thay đổi tuyệt đối nhỏ hơn ngưỡng này coi là nhiễu (vd 0.01 block/op, latency dưới µs)
+MIN_ABSOLUTE = {"alloc_blocks_per_op": 0.5, "alloc_bytes_per_op": 16, "hit_ratio": 0.005,
+                "p50_us": 1.0, "p99_us": 2.0}
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    So sánh kết quả hiện tại với baseline (cùng định dạng JSON của run.py).
+    Trả về (regressions, improvements): list (benchmark, metric, cũ, mới, % thay đổi)
+    threshold: tỉ lệ thay đổi tối thiểu theo chiều xấu đi để coi là regression.
+    Metric có "<metric>_spread" (dao động giữa các lần lặp) thì ngưỡng nâng lên
+    bằng spread lớn nhất của 2 lần chạy, để không báo nhầm do nhiễu.
+    """
+    regressions, improvements = [], []
+    base_results = baseline.get("results", {})
+    for bench, metrics in current.get("results", {}).items():
+        base = base_results.get(bench)
+        if base is None:
+            continue
+        for metric, new in metrics.items():
+            old = base.get(metric)
+            if old is None or (metric not in HIGHER_IS_BETTER and metric not in LOWER_IS_BETTER):
+                continue
+            if abs(new - old) < MIN_ABSOLUTE.get(metric, 0):
+                continue
+            if old == 0:
+                change = 0.0 if new == 0 else float("inf")
+            else:
+                change = (new - old) / abs(old)
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            limit = max(threshold, base.get(metric + "_spread", 0), metrics.get(metric + "_spread", 0))
+            row = (bench, metric, old, new, change * 100)
+            if worse > limit:
+                regressions.append(row)
+            elif worse < -limit:
+                improvements.append(row)
+    return regressions, improvements
+
+
+def format_rows(rows):
+    lines = []
+    for bench, metric, old, new, pct in rows:
+        lines.append(f"  {bench:<44} {metric:<20} {old:>14.3f} -> {new:>14.3f} ({pct:+.1f}%)")
+    return "\n".join(lines)
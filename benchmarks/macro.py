@@ -0,0 +1,129 @@
+import gc
+import time
+import random
+from cache.lru_cache import LRUCache
+from cache.lfu_cache import LFUCache
+from cache.tinylfu_cache import WTinyLFUCache
+from cache.gdsf_cache import GDSFCache
+from server.media_server import MediaServer
+
+NUM_SEGMENTS = 2000
+SEGMENT_KB = 100
+CACHE_MB = 50
+REQUESTS = 50_000
+
+CACHES = {
+    "LRU": LRUCache,
+    "LFU": LFUCache,
+    "W-TinyLFU": WTinyLFUCache,
+    "GDSF": GDSFCache
+}
+
+
+def segment_id(i):
+    return f"seg_{i:04d}.dat"
+
+
+class SyntheticOrigin:
+    def __init__(self, num_segments=NUM_SEGMENTS, segment_kb=SEGMENT_KB):
+        """Origin trong RAM cho benchmark: không đọc file, mọi segment dùng chung 1 payload"""
+        self.ids = {segment_id(i) for i in range(num_segments)}
+        self.payload = b"x" * (segment_kb * 1024)
+
+    def exists(self, seg_id):
+        return seg_id in self.ids
+
+    def size(self, seg_id):
+        if seg_id not in self.ids:
+            raise FileNotFoundError(seg_id)
+        return len(self.payload)
+
+    def read(self, seg_id):
+        if seg_id not in self.ids:
+            raise FileNotFoundError(seg_id)
+        return self.payload
+
+    def read_range(self, seg_id, offset, length):
+        return self.read(seg_id)[offset:offset + length]
+
+
+# === WORKLOAD ===
+
+def _zipf_weights(rnd, n, alpha=0.9):
+    weights = [1 / (i + 1) ** alpha for i in range(n)]
+    rnd.shuffle(weights)
+    return weights
+
+
+def zipf(rnd, n):
+    ids = [segment_id(i) for i in range(NUM_SEGMENTS)]
+    return rnd.choices(ids, weights=_zipf_weights(rnd, NUM_SEGMENTS), k=n)
+
+
+def sequential(rnd, n, viewers=50, video_len=100):
+    """Mỗi viewer xem 1 video từ đầu tới cuối, các viewer chạy xen kẽ nhau"""
+    num_videos = NUM_SEGMENTS // video_len
+    weights = _zipf_weights(rnd, num_videos)
+    pos = [None] * viewers
+    trace = []
+    while len(trace) < n:
+        for v in range(viewers):
+            if pos[v] is None or pos[v] % video_len == video_len - 1:
+                pos[v] = rnd.choices(range(num_videos), weights=weights)[0] * video_len
+            else:
+                pos[v] += 1
+            trace.append(segment_id(pos[v]))
+    return trace[:n]
+
+
+def flash_crowd(rnd, n, hot=20, share=0.8):
+    """Nửa đầu Zipf bình thường, nửa sau 80% request dồn vào vài segment vốn rất lạnh"""
+    trace = zipf(rnd, n)
+    hot_ids = [segment_id(NUM_SEGMENTS - 1 - i) for i in range(hot)]
+    for i in range(n // 2, n):
+        if rnd.random() < share:
+            trace[i] = rnd.choice(hot_ids)
+    return trace
+
+
+def scan(rnd, n, share=0.3):
+    """Traffic Zipf xen với 1 lượt quét tuần tự toàn catalog (vd job backup / CDN warmup)"""
+    trace = zipf(rnd, n)
+    cursor = 0
+    for i in range(n):
+        if rnd.random() < share:
+            trace[i] = segment_id(cursor % NUM_SEGMENTS)
+            cursor += 1
+    return trace
+
+
+WORKLOADS = {
+    "zipf": zipf,
+    "sequential": sequential,
+    "flash_crowd": flash_crowd,
+    "scan": scan
+}
+
+
+def run(workloads=None, caches=None, requests=REQUESTS, seed=42, log=print):
+    results = {}
+    for wl in workloads or WORKLOADS:
+        trace = WORKLOADS[wl](random.Random(seed), requests)
+        for name in caches or CACHES:
+            log(f"   ▶ macro {wl} / {name}")
+            server = MediaServer(None, cache=CACHES[name](capacity_mb=CACHE_MB),
+                                 disk_latency=0, origin=SyntheticOrigin())
+            get = server.get_segment
+            gc.collect()
+            t0 = time.perf_counter()
+            for seg in trace:
+                get(seg)
+            elapsed = time.perf_counter() - t0
+            m = server.get_metrics()
+            results[f"macro/{wl}/{name}"] = {
+                "ops_per_s": len(trace) / elapsed if elapsed > 0 else 0,
+                "hit_ratio": m['hit_ratio'],
+                "p50_us": m['p50_latency'] * 1000,
+                "p99_us": m['p99_latency'] * 1000
+            }
+    return results
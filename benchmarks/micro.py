@@ -0,0 +1,79 @@
+import random
+import itertools
+from cache.lru_cache import LRUCache
+from cache.lfu_cache import LFUCache
+from cache.tinylfu_cache import WTinyLFUCache
+from cache.gdsf_cache import GDSFCache
+from cache.two_tier_cache import TwoTierCache
+from cache.sharded_cache import ShardedCache
+from cache.slab_cache import SlabCache
+from cache.thread_safe_wrapper import ThreadSafeCache
+from .common import measure_ops, measure_latency, measure_allocs, summarize_rates
+
+VALUE_SIZE = 100                 # byte, mọi item dùng chung 1 object
+ENTRY_COUNTS = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+OPS = 100_000                    # số op mỗi batch đo throughput
+LATENCY_OPS = 20_000
+ALLOC_OPS = 10_000
+REPEAT = 5                       # số lần lặp, lấy median
+
+# Cache trong RAM (DiskCache / LogStructuredDiskCache có benchmark riêng trong experiments/)
+CACHES = {
+    "LRU": lambda mb: LRUCache(mb),
+    "LFU": lambda mb: LFUCache(mb),
+    "W-TinyLFU": lambda mb: WTinyLFUCache(mb),
+    "GDSF": lambda mb: GDSFCache(mb),
+    "TwoTier": lambda mb: TwoTierCache(mb, mb),
+    "TwoTier-adaptive": lambda mb: TwoTierCache(mb, mb, adaptive=True),
+    "Sharded-16": lambda mb: ShardedCache(mb, num_shards=16),
+    "Slab": lambda mb: SlabCache(mb),
+    "ThreadSafe-LRU": lambda mb: ThreadSafeCache(LRUCache(mb))
+}
+
+
+def bench_cache(name, factory, label, ops, seed):
+    """put_insert (cache rỗng -> đầy), get_hit, get_miss, put_evict (mỗi put đẩy 1 item ra)"""
+    rnd = random.Random(seed)
+    count = ENTRY_COUNTS[label]
+    value = b"x" * VALUE_SIZE
+    capacity_mb = count * VALUE_SIZE / (1024 * 1024)
+    keys = [f"k{i:08d}" for i in range(count)]
+    fresh = (f"n{i:08d}" for i in itertools.count())   # key mới cho các op put_evict
+
+    def put_batch(n):
+        return [(k, value) for k in (next(fresh) for _ in range(n))]
+
+    results = {}
+    # put_insert: mỗi lần lặp cần cache rỗng mới, cache của lần cuối dùng cho các op sau
+    fill_args = [(k, value) for k in keys]
+    rates = []
+    cache = None
+    for _ in range(REPEAT):
+        cache = None   # giải phóng cache cũ trước khi tạo cache mới (mức 1M entry)
+        cache = factory(capacity_mb)
+        rates.append(measure_ops(cache.put, [fill_args])["ops_per_s"])
+    results["put_insert"] = summarize_rates(rates)
+
+    hit_args = [(k,) for k in rnd.choices(keys, k=ops)]
+    results["get_hit"] = measure_ops(cache.get, [hit_args] * REPEAT)
+    results["get_hit"].update(measure_latency(cache.get, hit_args[:LATENCY_OPS]))
+    results["get_hit"].update(measure_allocs(cache.get, hit_args[:ALLOC_OPS]))
+
+    miss_args = [(f"m{i:08d}",) for i in range(ops)]
+    results["get_miss"] = measure_ops(cache.get, [miss_args] * REPEAT)
+    results["get_miss"].update(measure_latency(cache.get, miss_args[:LATENCY_OPS]))
+
+    results["put_evict"] = measure_ops(cache.put, [put_batch(ops) for _ in range(REPEAT)])
+    results["put_evict"].update(measure_latency(cache.put, put_batch(LATENCY_OPS)))
+    results["put_evict"].update(measure_allocs(cache.put, put_batch(ALLOC_OPS)))
+
+    return {f"micro/{name}/{label}/{op}": r for op, r in results.items()}
+
+
+def run(entry_counts=None, caches=None, ops=OPS, seed=42, log=print):
+    results = {}
+    for label in entry_counts or ENTRY_COUNTS:
+        for name in caches or CACHES:
+            log(f"   ▶ micro {name} @ {label}")
+            results.update(bench_cache(name, CACHES[name], label, ops, seed))
+    return results
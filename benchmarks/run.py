@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks import micro, macro, scaling
+from benchmarks.compare import compare, format_rows
+
+SUITES = ("micro", "macro", "scaling")
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suites(suites, quick=False, seed=42):
+    results = {}
+    if "micro" in suites:
+        results.update(micro.run(entry_counts=["1k", "100k"] if quick else None,
+                                 ops=20_000 if quick else micro.OPS, seed=seed))
+    if "macro" in suites:
+        results.update(macro.run(requests=10_000 if quick else macro.REQUESTS, seed=seed))
+    if "scaling" in suites:
+        results.update(scaling.run(ops=10_000 if quick else scaling.OPS_PER_THREAD, seed=seed))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "suites": list(suites),
+            "quick": quick,
+            "seed": seed
+        },
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite cho cache / MediaServer")
+    parser.add_argument("--suite", default=",".join(SUITES), help="micro,macro,scaling")
+    parser.add_argument("--quick", action="store_true", help="bỏ mức 1M entry, giảm số op")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="results/benchmark.json")
+    parser.add_argument("--baseline", help="JSON baseline để so sánh, exit code 1 nếu có regression")
+    parser.add_argument("--current", help="chỉ so sánh file JSON này với baseline, không chạy benchmark")
+    parser.add_argument("--threshold", type=float, default=0.10, help="mức xấu đi tối thiểu (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        suites = [s for s in args.suite.split(",") if s]
+        unknown = set(suites) - set(SUITES)
+        if unknown:
+            parser.error(f"unknown suite: {', '.join(sorted(unknown))}")
+        print(f"🚀 Chạy benchmark: {', '.join(suites)}{' (quick)' if args.quick else ''}")
+        current = run_suites(suites, quick=args.quick, seed=args.seed)
+        out_dir = os.path.dirname(args.out)
+        if out_dir and not os.path.exists(out_dir): os.makedirs(out_dir)
+        with open(args.out, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"✅ Đã lưu {len(current['results'])} kết quả vào '{args.out}'")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions, improvements = compare(baseline, current, args.threshold)
+    print(f"\nSo với baseline {args.baseline} ({baseline.get('meta', {}).get('git_commit')}), "
+          f"ngưỡng {args.threshold:.0%}:")
+    if improvements:
+        print(f"⬆️  {len(improvements)} cải thiện:\n{format_rows(improvements)}")
+    if regressions:
+        print(f"❌ {len(regressions)} regression:\n{format_rows(regressions)}")
+        return 1
+    print("✅ Không có regression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
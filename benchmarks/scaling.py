@@ -0,0 +1,58 @@
+import time
+import random
+import threading
+from cache.lru_cache import LRUCache
+from cache.sharded_cache import ShardedCache
+from cache.thread_safe_wrapper import ThreadSafeCache
+from .common import summarize_rates
+
+THREAD_COUNTS = [1, 2, 4, 8]
+OPS_PER_THREAD = 50_000
+NUM_KEYS = 10_000
+VALUE_SIZE = 1024
+PUT_RATIO = 0.05
+CAPACITY_MB = 8      # ~8k item: có cả hit, miss và evict
+
+CACHES = {
+    "ThreadSafe-LRU": lambda: ThreadSafeCache(LRUCache(CAPACITY_MB)),
+    "Sharded-16": lambda: ShardedCache(CAPACITY_MB, num_shards=16)
+}
+
+
+def _run_threads(cache, num_threads, ops, seed):
+    keys = [f"seg_{i:05d}.dat" for i in range(NUM_KEYS)]
+    value = b"x" * VALUE_SIZE
+    # Sinh sẵn chuỗi op cho từng thread (cố định theo seed)
+    plans = []
+    for t in range(num_threads):
+        rnd = random.Random(seed * 1000 + t)
+        plans.append([(rnd.random() < PUT_RATIO, k) for k in rnd.choices(keys, k=ops)])
+    barrier = threading.Barrier(num_threads + 1)
+
+    def worker(plan):
+        get, put = cache.get, cache.put
+        barrier.wait()
+        for is_put, k in plan:
+            if is_put:
+                put(k, value)
+            else:
+                get(k)
+
+    threads = [threading.Thread(target=worker, args=(p,)) for p in plans]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    return num_threads * ops / (time.perf_counter() - t0)
+
+
+def run(thread_counts=None, ops=OPS_PER_THREAD, seed=42, repeat=3, log=print):
+    results = {}
+    for name, factory in CACHES.items():
+        for n in thread_counts or THREAD_COUNTS:
+            log(f"   ▶ scaling {name} x{n} thread")
+            rates = [_run_threads(factory(), n, ops, seed) for _ in range(repeat)]
+            results[f"scaling/{name}/{n}t"] = summarize_rates(rates)
+    return results
@@ -0,0 +1,51 @@
+class CountMinSketch:
+    # Bảng chia đôi toàn bộ counter bằng bytearray.translate (chạy trong C)
+    _HALVE = bytes(i >> 1 for i in range(256))
+
+    def __init__(self, width=1024, depth=4, max_count=15, sample_size=None):
+        """
+        Count-Min Sketch ước lượng tần suất truy cập với bộ nhớ cố định
+        (width * depth byte), dùng cho admission của W-TinyLFU.
+        - Counter bão hòa ở max_count (TinyLFU dùng counter 4 bit -> 15)
+        - Sau sample_size lần increment thì chia đôi tất cả counter (aging),
+          để tần suất cũ phai dần. Mặc định sample_size = 10 * width.
+        """
+        # width làm tròn lên lũy thừa của 2 để lấy index bằng phép AND
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.mask = self.width - 1
+        self.depth = depth
+        self.max_count = max_count
+        self.sample_size = sample_size or 10 * self.width
+        self.rows = [bytearray(self.width) for _ in range(depth)]
+        self.additions = 0
+        self.resets = 0
+
+    def _indexes(self, key):
+        # Double hashing: depth index từ 1 giá trị hash
+        h = hash(key)
+        h2 = ((h >> 32) ^ (h * 0x9E3779B1)) | 1
+        mask = self.mask
+        return [(h + i * h2) & mask for i in range(self.depth)]
+
+    def increment(self, key):
+        idx = self._indexes(key)
+        # Conservative update: chỉ tăng các counter đang bằng giá trị nhỏ nhất
+        current = min(row[i] for row, i in zip(self.rows, idx))
+        if current < self.max_count:
+            for row, i in zip(self.rows, idx):
+                if row[i] == current:
+                    row[i] = current + 1
+
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.reset()
+
+    def estimate(self, key):
+        return min(row[i] for row, i in zip(self.rows, self._indexes(key)))
+
+    def reset(self):
+        """Chia đôi mọi counter"""
+        for row in self.rows:
+            row[:] = row.translate(self._HALVE)
+        self.additions //= 2
+        self.resets += 1
@@ -1,57 +1,173 @@
 import os
+import time
 import shutil
+from collections import OrderedDict
+from urllib.parse import quote, unquote
+
+# File tạm nằm trong thư mục con riêng: tên file của key không bao giờ bắt đầu bằng '.'
+TMP_DIR = ".tmp"
+
+
+def _file_name(key):
+    """
+    Key -> tên file an toàn trong cache_dir: '/' được mã hóa (vd 'vid_000096/seg_0000.dat'),
+    '.' đầu tên cũng vậy nên '..', '.', '.tmp' không thoát ra / trùng thư mục khác
+    """
+    name = quote(key, safe='')
+    if name.startswith('.'):
+        name = '%2E' + name[1:]
+    return name
+
 
 class DiskCache:
-    def __init__(self, cache_dir="/tmp/media_cache_project"):
+    def __init__(self, cache_dir="/tmp/media_cache_project", capacity_mb=None, policy="lru"):
         """
         Khởi tạo Cache lưu trên ổ cứng.
         Mặc định lưu tại /tmp/media_cache_project
+
+        capacity_mb: giới hạn dung lượng (None = không giới hạn)
+        policy: "lru", "fifo" hoặc hàm policy(index) -> key cần xóa,
+                với index là OrderedDict key -> [size, last_access]
+        Index nằm trong RAM: miss được trả lời mà không cần syscall nào.
+        Key (str) được mã hóa thành tên file bằng _file_name, key không phải str không được cache.
         """
         self.cache_dir = cache_dir
-        # Tạo thư mục nếu chưa tồn tại
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-            
+        self.capacity_bytes = capacity_mb * 1024 * 1024 if capacity_mb is not None else None
+        self.policy = policy
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.index = OrderedDict()  # key -> [size, last_access], đầu = cũ nhất
+        self.current_size_bytes = 0
+
         self.hits = 0
         self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+        self._enforce_capacity(0)
+
+    def _load_index(self):
+        """Dựng lại index sau khi restart: 1 lần quét os.scandir"""
+        # File ghi dở khi crash
+        shutil.rmtree(os.path.join(self.cache_dir, TMP_DIR), ignore_errors=True)
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                entries.append((st.st_mtime, unquote(entry.name), st.st_size))
+
+        # Dùng mtime làm thời điểm truy cập gần nhất -> thứ tự LRU xấp xỉ
+        entries.sort()
+        for mtime, name, size in entries:
+            self.index[name] = [size, mtime]
+            self.current_size_bytes += size
+
+    def _pick_victim(self):
+        if callable(self.policy):
+            return self.policy(self.index)
+        return next(iter(self.index))  # lru/fifo: đều xóa phần tử đầu hàng đợi
+
+    def _remove(self, key):
+        size, _ = self.index.pop(key)
+        self.current_size_bytes -= size
+        try:
+            os.remove(os.path.join(self.cache_dir, _file_name(key)))
+        except FileNotFoundError:
+            pass
+
+    def _enforce_capacity(self, incoming):
+        if self.capacity_bytes is None:
+            return
+        while self.index and self.current_size_bytes + incoming > self.capacity_bytes:
+            self._remove(self._pick_victim())
+            self.evictions += 1
 
     def get(self, key):
         """Đọc file từ ổ cứng"""
-        path = os.path.join(self.cache_dir, key)
-        
-        if os.path.exists(path):
-            self.hits += 1
-            try:
-                with open(path, 'rb') as f:
-                    return f.read()
-            except Exception:
-                return None
-        
-        self.misses += 1
-        return None
+        entry = self.index.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        path = os.path.join(self.cache_dir, _file_name(key))
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            # File bị xóa từ bên ngoài: đồng bộ lại index
+            self.current_size_bytes -= entry[0]
+            del self.index[key]
+            self.misses += 1
+            return None
+        except Exception:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        entry[1] = time.time()
+        if self.policy == "lru":
+            self.index.move_to_end(key)
+        return data
 
     def put(self, key, value):
         """Ghi file xuống ổ cứng"""
-        # --- QUAN TRỌNG: Tự động tạo lại thư mục nếu nó bị xóa ---
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-        # ---------------------------------------------------------
+        size = len(value)
+        if self.capacity_bytes is not None and size > self.capacity_bytes:
+            return
+        if not isinstance(key, str):
+            return
+
+        if key in self.index:
+            old_size, _ = self.index.pop(key)
+            self.current_size_bytes -= old_size
+        self._enforce_capacity(size)
 
-        path = os.path.join(self.cache_dir, key)
+        # Ghi ra file tạm rồi rename: crash giữa chừng không để lại file hỏng
+        name = _file_name(key)
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = os.path.join(self.cache_dir, TMP_DIR, name)
         try:
-            with open(path, 'wb') as f:
+            try:
+                f = open(tmp_path, 'wb')
+            except FileNotFoundError:
+                # --- QUAN TRỌNG: Tự động tạo lại thư mục nếu nó bị xóa ---
+                os.makedirs(os.path.join(self.cache_dir, TMP_DIR), exist_ok=True)
+                f = open(tmp_path, 'wb')
+            with f:
                 f.write(value)
+            os.replace(tmp_path, path)
         except Exception as e:
             print(f"Error writing disk cache: {e}")
+            # Entry cũ đã bỏ khỏi index: xóa luôn file cũ để không nằm lại ngoài index
+            for stale in (tmp_path, path):
+                try: os.remove(stale)
+                except OSError: pass
+            return
+
+        self.index[key] = [size, time.time()]
+        self.current_size_bytes += size
+
+    def delete(self, key):
+        if key in self.index:
+            self._remove(key)
 
     def clear(self):
         """Xóa toàn bộ cache trên đĩa"""
         if os.path.exists(self.cache_dir):
             shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.index.clear()
+        self.current_size_bytes = 0
 
     def get_stats(self):
+        total = self.hits + self.misses
         return {
             "type": "DiskPersistence",
             "hits": self.hits,
-            "misses": self.misses
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits / total) if total > 0 else 0,
+            "entries": len(self.index),
+            "current_size_mb": self.current_size_bytes / (1024*1024)
         }
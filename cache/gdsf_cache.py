@@ -0,0 +1,127 @@
+import heapq
+from collections import OrderedDict
+
+
+class GDSFCache:
+    def __init__(self, capacity_mb, mode="hit", default_cost=1.0, max_tracked_costs=65536,
+                 cost_alpha=0.3, on_evict=None):
+        """
+        GreedyDual-Size-Frequency: 1 budget byte chung cho cả thumbnail và segment.
+            H(key) = L + freq * cost / size      (mode="hit":  tối đa hit ratio)
+            H(key) = L + freq * cost             (mode="byte": tối đa byte hit ratio)
+        L = H của item bị evict gần nhất (aging: item mới dần vượt item cũ).
+        cost = latency origin đo được cho key (record_cost), làm mượt bằng EWMA.
+        Evict item có H nhỏ nhất: heap + lazy invalidation -> O(log n).
+        """
+        if mode not in ("hit", "byte"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.capacity_bytes = capacity_mb * 1024 * 1024
+        self.current_size_bytes = 0
+        self.mode = mode
+        self.default_cost = default_cost
+        self.cost_alpha = cost_alpha
+        self.max_tracked_costs = max_tracked_costs
+        self.on_evict = on_evict
+
+        self.entries = {}            # key -> [value, freq, H, version]
+        self.heap = []               # (H, version, key), có thể chứa bản ghi cũ
+        self.costs = OrderedDict()   # key -> cost (giây), giới hạn số key theo dõi
+        self.L = 0.0
+        self._version = 0
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_hit = 0
+        self.bytes_requested = 0
+
+    def record_cost(self, key, cost):
+        """Ghi nhận chi phí lấy key từ origin (vd latency đọc đĩa, giây)"""
+        old = self.costs.pop(key, None)
+        if old is not None:
+            cost = old + self.cost_alpha * (cost - old)
+        self.costs[key] = cost
+        while len(self.costs) > self.max_tracked_costs:
+            self.costs.popitem(last=False)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self._reprioritize(key, entry)
+
+    def _priority(self, key, size, freq):
+        cost = self.costs.get(key, self.default_cost)
+        if self.mode == "byte":
+            return self.L + freq * cost
+        return self.L + freq * cost / max(1, size)
+
+    def _reprioritize(self, key, entry):
+        self._version += 1
+        entry[2] = self._priority(key, len(entry[0]), entry[1])
+        entry[3] = self._version
+        heapq.heappush(self.heap, (entry[2], self._version, key))
+        # Dọn heap khi có quá nhiều bản ghi cũ
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self.heap = [(e[2], e[3], k) for k, e in self.entries.items()]
+            heapq.heapify(self.heap)
+
+    def _evict_one(self):
+        while self.heap:
+            h, version, key = heapq.heappop(self.heap)
+            entry = self.entries.get(key)
+            if entry is None or entry[3] != version:
+                continue  # bản ghi cũ
+            del self.entries[key]
+            self.current_size_bytes -= len(entry[0])
+            self.L = h
+            self.evictions += 1
+            if self.on_evict:
+                self.on_evict(key, entry[0])
+            return
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        entry[1] += 1
+        self._reprioritize(key, entry)
+        size = len(entry[0])
+        self.bytes_hit += size
+        self.bytes_requested += size
+        return entry[0]
+
+    def put(self, key, value, cost=None):
+        if cost is not None:
+            self.record_cost(key, cost)
+        size = len(value)
+        if size > self.capacity_bytes:
+            return
+        self.bytes_requested += size  # put sau miss: byte phải lấy từ origin
+
+        # Tạm gỡ key ra khỏi entries để không tự evict chính nó khi đang cập nhật
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_size_bytes -= len(entry[0])
+            entry[0] = value
+            entry[1] += 1
+        else:
+            entry = [value, 1, 0.0, 0]
+        while self.current_size_bytes + size > self.capacity_bytes and self.entries:
+            self._evict_one()
+        self.entries[key] = entry
+        self.current_size_bytes += size
+        self._reprioritize(key, entry)
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            "type": f"GDSF-{self.mode}",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits / total) if total > 0 else 0,
+            "byte_hit_ratio": (self.bytes_hit / self.bytes_requested) if self.bytes_requested else 0,
+            "current_size_mb": self.current_size_bytes / (1024*1024)
+        }
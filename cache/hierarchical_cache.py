@@ -0,0 +1,120 @@
+import time
+from .lru_cache import LRUCache
+from .disk_cache import DiskCache
+
+
+class _TierStats:
+    __slots__ = ("hits", "lookups", "time_s")
+
+    def __init__(self):
+        self.hits = 0
+        self.lookups = 0
+        self.time_s = 0.0
+
+    def to_dict(self):
+        return {
+            "hits": self.hits,
+            "lookups": self.lookups,
+            "hit_ratio": (self.hits / self.lookups) if self.lookups else 0,
+            "avg_latency_ms": (self.time_s / self.lookups * 1000) if self.lookups else 0
+        }
+
+
+class HierarchicalCache:
+    def __init__(self, ram_mb, disk_mb, disk_dir="/tmp/media_cache_l2", mode="exclusive",
+                 disk_cache=None):
+        """
+        Cache 2 tầng RAM -> đĩa local:
+        - Item bị evict khỏi RAM được hạ xuống đĩa (demotion) thay vì mất luôn
+        - Hit ở tầng đĩa thì đưa ngược lên RAM (promotion)
+        mode="exclusive": 1 key chỉ nằm ở 1 tầng (tổng dung lượng = RAM + đĩa)
+        mode="inclusive": put ghi cả 2 tầng, đĩa luôn chứa bản sao của RAM
+        Item lớn hơn cả tầng RAM: chỉ nằm trên đĩa (put ghi thẳng xuống, hit không promote)
+        disk_cache: tầng đĩa tùy chọn (vd WriteBehindCache(LogStructuredDiskCache(...))),
+                    mặc định DiskCache(disk_dir, capacity_mb=disk_mb)
+        """
+        if mode not in ("exclusive", "inclusive"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.mode = mode
+        self.ram = LRUCache(capacity_mb=ram_mb, on_evict=self._demote)
+        self.disk = disk_cache if disk_cache is not None else DiskCache(disk_dir, capacity_mb=disk_mb)
+
+        self.ram_stats = _TierStats()
+        self.disk_stats = _TierStats()
+        self.promotions = 0
+        self.demotions = 0
+
+    def get(self, key):
+        t0 = time.perf_counter()
+        val = self.ram.get(key)
+        t1 = time.perf_counter()
+        self.ram_stats.lookups += 1
+        self.ram_stats.time_s += t1 - t0
+        if val is not None:
+            self.ram_stats.hits += 1
+            return val
+
+        # Key không phải str (vd chunk (segment, idx)) chỉ sống trên RAM
+        if not isinstance(key, str):
+            return None
+
+        val = self.disk.get(key)
+        self.disk_stats.lookups += 1
+        self.disk_stats.time_s += time.perf_counter() - t1
+        if val is None:
+            return None
+
+        self.disk_stats.hits += 1
+        if len(val) > self.ram.capacity_bytes:
+            return val      # RAM không chứa nổi: giữ nguyên trên đĩa
+        # Promotion: exclusive thì xóa khỏi đĩa trước, tránh demote lại ngay chính nó
+        if self.mode == "exclusive":
+            self.disk.delete(key)
+        self.promotions += 1
+        self.ram.put(key, val)
+        return val
+
+    def put(self, key, value):
+        if len(value) > self.ram.capacity_bytes:
+            # LRUCache bỏ qua im lặng (không on_evict): ghi thẳng xuống đĩa, bỏ bản cũ trên RAM
+            self.ram.delete(key)
+            if isinstance(key, str):
+                self.disk.put(key, value)
+            return
+        self.ram.put(key, value)
+        if self.mode == "inclusive" and isinstance(key, str):
+            self.disk.put(key, value)
+
+    def _demote(self, key, value):
+        # Inclusive: đĩa đã có bản sao từ lúc put
+        if self.mode == "exclusive" and isinstance(key, str):
+            self.disk.put(key, value)
+            self.demotions += 1
+
+    @property
+    def current_size_bytes(self):
+        return self.ram.current_size_bytes
+
+    @property
+    def capacity_bytes(self):
+        return self.ram.capacity_bytes
+
+    def clear(self):
+        self.ram = LRUCache(capacity_mb=self.ram.capacity_bytes / (1024*1024), on_evict=self._demote)
+        self.disk.clear()
+
+    def get_stats(self):
+        hits = self.ram_stats.hits + self.disk_stats.hits
+        lookups = self.ram_stats.lookups
+        return {
+            "type": f"Hierarchical-{self.mode}",
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_ratio": (hits / lookups) if lookups else 0,
+            "promotions": self.promotions,
+            "demotions": self.demotions,
+            "tiers": {
+                "ram": dict(self.ram_stats.to_dict(), current_size_mb=self.ram.current_size_bytes / (1024*1024)),
+                "disk": dict(self.disk_stats.to_dict(), current_size_mb=self.disk.get_stats().get('current_size_mb', 0))
+            }
+        }
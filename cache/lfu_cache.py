@@ -1,40 +1,165 @@
+from collections import OrderedDict
+
+
+class _FreqNode:
+    """Một bucket tần suất: chứa các key có cùng freq, thứ tự LRU bên trong"""
+    __slots__ = ("freq", "items", "prev", "next")
+
+    def __init__(self, freq):
+        self.freq = freq
+        self.items = OrderedDict()  # key -> data (đầu = LRU, cuối = MRU)
+        self.prev = None
+        self.next = None
+
+
 class LFUCache:
-    def __init__(self, capacity_mb):
+    def __init__(self, capacity_mb, aging_interval=None, on_evict=None):
+        """
+        LFU O(1): danh sách liên kết các bucket tần suất (tăng dần),
+        mỗi bucket là một OrderedDict để phá hòa theo LRU.
+
+        aging_interval: sau mỗi N lần truy cập thì chia đôi toàn bộ freq,
+        để các key "viral" cũ không chiếm cache mãi mãi. None = tắt aging.
+        Nên đặt N >= số key trong cache để chi phí vẫn là O(1) khấu hao.
+        on_evict(key, value): gọi khi 1 item bị đẩy ra
+        """
+        self.on_evict = on_evict
         self.capacity_bytes = capacity_mb * 1024 * 1024
-        self.current_size = 0
-        self.cache = {} # key -> data
-        self.freq = {}  # key -> count
+        self.current_size_bytes = 0
+        self.aging_interval = aging_interval
+
+        self.cache = {}  # key -> data
+        self.nodes = {}  # key -> _FreqNode đang chứa key
+
+        # Sentinel: head.next là bucket có freq nhỏ nhất (victim nằm ở đây)
+        self.head = _FreqNode(0)
+        self.head.next = self.head
+        self.head.prev = self.head
+
+        # Stats
         self.hits = 0
         self.misses = 0
+        self.evictions = 0
+        self.agings = 0
+        self._ops_since_aging = 0
+
+    # --- Quản lý danh sách bucket ---
+
+    def _insert_after(self, node, freq):
+        new = _FreqNode(freq)
+        new.prev = node
+        new.next = node.next
+        node.next.prev = new
+        node.next = new
+        return new
+
+    def _unlink(self, node):
+        node.prev.next = node.next
+        node.next.prev = node.prev
+
+    def _touch(self, key):
+        """Tăng freq của key lên 1: chuyển sang bucket kế tiếp"""
+        node = self.nodes[key]
+        value = node.items.pop(key)
+        nxt = node.next
+        if nxt is self.head or nxt.freq != node.freq + 1:
+            nxt = self._insert_after(node, node.freq + 1)
+        nxt.items[key] = value
+        self.nodes[key] = nxt
+        if not node.items:
+            self._unlink(node)
+
+    def _evict_one(self):
+        node = self.head.next
+        key, value = node.items.popitem(last=False)  # LRU trong bucket freq thấp nhất
+        if not node.items:
+            self._unlink(node)
+        del self.nodes[key]
+        del self.cache[key]
+        self.current_size_bytes -= len(value)
+        self.evictions += 1
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def _maybe_age(self):
+        if not self.aging_interval:
+            return
+        self._ops_since_aging += 1
+        if self._ops_since_aging < self.aging_interval:
+            return
+        self._ops_since_aging = 0
+        self.agings += 1
+
+        # Chia đôi freq. Phép chia giữ nguyên thứ tự nên chỉ cần gộp các bucket liền kề
+        node = self.head.next
+        prev = self.head
+        while node is not self.head:
+            nxt = node.next
+            new_freq = max(1, node.freq // 2)
+            if prev is not self.head and prev.freq == new_freq:
+                for key, value in node.items.items():
+                    prev.items[key] = value
+                    self.nodes[key] = prev
+                self._unlink(node)
+            else:
+                node.freq = new_freq
+                prev = node
+            node = nxt
+
+    # --- API giống LRUCache ---
 
     def get(self, key):
-        if key in self.cache:
-            self.hits += 1
-            self.freq[key] += 1
-            return self.cache[key]
-        self.misses += 1
-        return None
+        if key not in self.cache:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touch(key)
+        self._maybe_age()
+        return self.cache[key]
 
     def put(self, key, value):
         size = len(value)
-        if size > self.capacity_bytes: return
+        if size > self.capacity_bytes:
+            return
 
         if key in self.cache:
-            self.current_size -= len(self.cache[key])
+            self.current_size_bytes -= len(self.cache[key])
             self.cache[key] = value
-            self.freq[key] += 1
-            self.current_size += size
+            self.nodes[key].items[key] = value
+            self._touch(key)
+            self.current_size_bytes += size
+            # Giá trị mới có thể lớn hơn giá trị cũ
+            while self.current_size_bytes > self.capacity_bytes:
+                self._evict_one()
         else:
-            while self.current_size + size > self.capacity_bytes:
-                # Tìm key có freq thấp nhất để xóa (Simple LFU)
-                victim = min(self.freq, key=self.freq.get)
-                self.current_size -= len(self.cache[victim])
-                del self.cache[victim]
-                del self.freq[victim]
-            
+            while self.current_size_bytes + size > self.capacity_bytes:
+                if not self.cache: break
+                self._evict_one()
+
+            # Key mới luôn có freq = 1 -> nằm ngay sau head
+            node = self.head.next
+            if node is self.head or node.freq != 1:
+                node = self._insert_after(self.head, 1)
+            node.items[key] = value
+            self.nodes[key] = node
             self.cache[key] = value
-            self.freq[key] = 1
-            self.current_size += size
+            self.current_size_bytes += size
+
+        self._maybe_age()
+
+    def frequency(self, key):
+        node = self.nodes.get(key)
+        return node.freq if node else 0
 
     def get_stats(self):
-        return {"type": "LFU", "hits": self.hits}
+        total = self.hits + self.misses
+        hit_ratio = (self.hits / total) if total > 0 else 0
+        return {
+            "type": "LFU",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": hit_ratio,
+            "current_size_mb": self.current_size_bytes / (1024*1024)
+        }
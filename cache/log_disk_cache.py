@@ -0,0 +1,313 @@
+import os
+import zlib
+import struct
+import shutil
+
+# Bản ghi index trong journal/checkpoint: op, key_len, file_id, offset, length, crc32 + key
+_RECORD = struct.Struct("<BHIQII")
+OP_PUT = 1
+OP_DEL = 2
+
+JOURNAL_NAME = "index.journal"
+CHECKPOINT_NAME = "index.ckpt"
+
+
+class LogStructuredDiskCache:
+    def __init__(self, cache_dir="/tmp/media_cache_log", capacity_mb=None, segment_mb=64,
+                 compact_ratio=0.5, checkpoint_every=100_000, sync=False):
+        """
+        DiskCache dạng log-structured: mọi value được ghi nối (append) vào các file
+        segment lớn thay vì 1 file / key. Index trong RAM:
+            key -> (file_id, offset, length, crc32)
+        - Mỗi thay đổi index được ghi vào journal nhỏ; restart = đọc checkpoint + replay journal
+          (không phải quét dữ liệu)
+        - Segment cũ có tỉ lệ dữ liệu chết >= compact_ratio thì được compact
+          (copy phần còn sống sang segment đang ghi rồi xóa file)
+        - Vượt capacity_mb thì bỏ segment cũ nhất (FIFO theo log). segment_mb được kẹp
+          <= capacity_mb / 4 để mỗi lần evict chỉ bỏ ~1/4 cache; segment đang ghi cũng được
+          đóng lại (roll) để evict nếu vẫn vượt capacity
+        - Đọc bằng os.pread tại offset đã lưu
+        sync=True: fsync sau mỗi put (bền hơn, chậm hơn)
+        """
+        self.cache_dir = cache_dir
+        self.capacity_bytes = capacity_mb * 1024 * 1024 if capacity_mb is not None else None
+        self.segment_bytes = segment_mb * 1024 * 1024
+        if self.capacity_bytes is not None:
+            self.segment_bytes = max(1, min(self.segment_bytes, self.capacity_bytes // 4))
+        self.compact_ratio = compact_ratio
+        self.checkpoint_every = checkpoint_every
+        self.sync = sync
+
+        self.index = {}          # key -> (file_id, offset, length, crc)
+        self.seg_size = {}       # file_id -> tổng byte đã ghi
+        self.seg_live = {}       # file_id -> byte còn được index trỏ tới
+        self.seg_keys = {}       # file_id -> set key còn sống trong segment (compact/evict không quét index)
+        self._read_fds = {}      # file_id -> fd để pread
+        self._active_id = None
+        self._active_fd = None
+        self._journal = None
+        self._journal_records = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compactions = 0
+        self.corrupted = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._recover()
+
+    # --- Đường dẫn ---
+
+    def _seg_path(self, file_id):
+        return os.path.join(self.cache_dir, f"seg_{file_id:08d}.log")
+
+    def _journal_path(self):
+        return os.path.join(self.cache_dir, JOURNAL_NAME)
+
+    def _checkpoint_path(self):
+        return os.path.join(self.cache_dir, CHECKPOINT_NAME)
+
+    # --- Recovery / journal ---
+
+    @staticmethod
+    def _read_records(path):
+        """Đọc các bản ghi index; dừng ở bản ghi cuối bị ghi dở (crash)"""
+        try:
+            with open(path, 'rb') as f:
+                buf = f.read()
+        except FileNotFoundError:
+            return
+        pos = 0
+        while pos + _RECORD.size <= len(buf):
+            op, klen, file_id, offset, length, crc = _RECORD.unpack_from(buf, pos)
+            end = pos + _RECORD.size + klen
+            if end > len(buf):
+                break
+            key = buf[pos + _RECORD.size:end].decode('utf-8')
+            yield op, key, file_id, offset, length, crc
+            pos = end
+
+    def _apply(self, op, key, file_id=0, offset=0, length=0, crc=0):
+        old = self.index.pop(key, None)
+        if old is not None and old[0] in self.seg_live:
+            self.seg_live[old[0]] -= old[2]
+            self.seg_keys[old[0]].discard(key)
+        if op == OP_PUT and file_id in self.seg_size:
+            self.index[key] = (file_id, offset, length, crc)
+            self.seg_live[file_id] += length
+            self.seg_keys[file_id].add(key)
+
+    def _recover(self):
+        # Segment nào đang có trên đĩa
+        for name in os.listdir(self.cache_dir):
+            if name.startswith("seg_") and name.endswith(".log"):
+                file_id = int(name[4:-4])
+                size = os.path.getsize(os.path.join(self.cache_dir, name))
+                if size == 0:
+                    os.remove(os.path.join(self.cache_dir, name))  # Segment rỗng từ lần chạy trước
+                    continue
+                self.seg_size[file_id] = size
+                self.seg_live[file_id] = 0
+                self.seg_keys[file_id] = set()
+
+        for path in (self._checkpoint_path(), self._journal_path()):
+            for op, key, file_id, offset, length, crc in self._read_records(path):
+                # Bỏ bản ghi trỏ ra ngoài phần dữ liệu đã thực sự ghi xuống
+                if op == OP_PUT and offset + length > self.seg_size.get(file_id, -1):
+                    continue
+                self._apply(op, key, file_id, offset, length, crc)
+                if path == self._journal_path():
+                    self._journal_records += 1
+
+        self._journal = open(self._journal_path(), 'ab')
+        self._open_active(max(self.seg_size, default=-1) + 1)
+        if self._journal_records >= self.checkpoint_every:
+            self._checkpoint()
+
+    def _log(self, op, key, file_id=0, offset=0, length=0, crc=0):
+        kb = key.encode('utf-8')
+        self._journal.write(_RECORD.pack(op, len(kb), file_id, offset, length, crc) + kb)
+        self._journal.flush()
+        if self.sync:
+            os.fsync(self._journal.fileno())
+        self._journal_records += 1
+        if self._journal_records >= self.checkpoint_every:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        """Ghi snapshot index rồi làm rỗng journal: restart chỉ cần đọc ít dữ liệu"""
+        tmp = self._checkpoint_path() + ".tmp"
+        with open(tmp, 'wb') as f:
+            for key, (file_id, offset, length, crc) in self.index.items():
+                kb = key.encode('utf-8')
+                f.write(_RECORD.pack(OP_PUT, len(kb), file_id, offset, length, crc) + kb)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._checkpoint_path())
+        self._journal.close()
+        self._journal = open(self._journal_path(), 'wb')
+        self._journal_records = 0
+
+    # --- Segment ---
+
+    def _open_active(self, file_id):
+        if self._active_fd is not None:
+            os.close(self._active_fd)
+        self._active_id = file_id
+        self._active_fd = os.open(self._seg_path(file_id), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self.seg_size.setdefault(file_id, 0)
+        self.seg_live.setdefault(file_id, 0)
+        self.seg_keys.setdefault(file_id, set())
+
+    def _read_fd(self, file_id):
+        fd = self._read_fds.get(file_id)
+        if fd is None:
+            fd = os.open(self._seg_path(file_id), os.O_RDONLY)
+            self._read_fds[file_id] = fd
+        return fd
+
+    def _drop_segment(self, file_id):
+        fd = self._read_fds.pop(file_id, None)
+        if fd is not None:
+            os.close(fd)
+        del self.seg_size[file_id]
+        del self.seg_live[file_id]
+        del self.seg_keys[file_id]
+        try:
+            os.remove(self._seg_path(file_id))
+        except FileNotFoundError:
+            pass
+
+    def _append(self, value):
+        if self.seg_size[self._active_id] + len(value) > self.segment_bytes and self.seg_size[self._active_id] > 0:
+            self._open_active(self._active_id + 1)
+        offset = self.seg_size[self._active_id]
+        os.write(self._active_fd, value)
+        if self.sync:
+            os.fsync(self._active_fd)
+        self.seg_size[self._active_id] += len(value)
+        return self._active_id, offset
+
+    def _compact(self):
+        """Compact 1 segment cũ có nhiều dữ liệu chết nhất (nếu vượt ngưỡng)"""
+        best, best_ratio = None, self.compact_ratio
+        for file_id, size in self.seg_size.items():
+            if file_id == self._active_id or size == 0:
+                continue
+            dead_ratio = 1 - self.seg_live[file_id] / size
+            if dead_ratio >= best_ratio:
+                best, best_ratio = file_id, dead_ratio
+        if best is None:
+            return
+
+        fd = self._read_fd(best)
+        live = [(k, self.index[k]) for k in self.seg_keys[best]]
+        for key, (_, offset, length, crc) in live:
+            value = os.pread(fd, length, offset)
+            file_id, new_offset = self._append(value)
+            self._apply(OP_PUT, key, file_id, new_offset, length, crc)
+            self._log(OP_PUT, key, file_id, new_offset, length, crc)
+        self._drop_segment(best)
+        self.compactions += 1
+
+    def _disk_bytes(self):
+        return sum(self.seg_size.values())
+
+    def _enforce_capacity(self):
+        if self.capacity_bytes is None:
+            return
+        while self._disk_bytes() > self.capacity_bytes:
+            oldest = min(self.seg_size)
+            if oldest == self._active_id:
+                if self.seg_size[oldest] == 0:
+                    break
+                # Chỉ còn segment đang ghi: đóng lại, mở segment mới rồi evict nó
+                self._open_active(self._active_id + 1)
+            for key in list(self.seg_keys[oldest]):
+                self._apply(OP_DEL, key)
+                self._log(OP_DEL, key)
+                self.evictions += 1
+            self._drop_segment(oldest)
+
+    # --- API giống DiskCache ---
+
+    def get(self, key):
+        entry = self.index.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        file_id, offset, length, crc = entry
+        try:
+            data = os.pread(self._read_fd(file_id), length, offset)
+        except OSError:
+            data = None
+        if data is None or len(data) != length or zlib.crc32(data) != crc:
+            # Dữ liệu hỏng (crash giữa lúc ghi, đĩa lỗi...): bỏ key
+            self.corrupted += 1
+            self._apply(OP_DEL, key)
+            self._log(OP_DEL, key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return data
+
+    def put(self, key, value):
+        size = len(value)
+        if self.capacity_bytes is not None and size > self.capacity_bytes:
+            return
+        crc = zlib.crc32(value)
+        file_id, offset = self._append(value)
+        self._apply(OP_PUT, key, file_id, offset, size, crc)
+        self._log(OP_PUT, key, file_id, offset, size, crc)
+
+        self._compact()
+        self._enforce_capacity()
+
+    def delete(self, key):
+        if key in self.index:
+            self._apply(OP_DEL, key)
+            self._log(OP_DEL, key)
+
+    def close(self):
+        for fd in self._read_fds.values():
+            os.close(fd)
+        self._read_fds.clear()
+        if self._active_fd is not None:
+            os.close(self._active_fd)
+            self._active_fd = None
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def clear(self):
+        """Xóa toàn bộ cache: chỉ vài file segment lớn nên rất nhanh"""
+        self.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.index.clear()
+        self.seg_size.clear()
+        self.seg_live.clear()
+        self.seg_keys.clear()
+        self._journal_records = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._journal = open(self._journal_path(), 'ab')
+        self._open_active(0)
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        disk = self._disk_bytes()
+        live = sum(self.seg_live.values())
+        return {
+            "type": "LogStructuredDisk",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits / total) if total > 0 else 0,
+            "entries": len(self.index),
+            "segments": len(self.seg_size),
+            "compactions": self.compactions,
+            "current_size_mb": live / (1024*1024),
+            "dead_mb": (disk - live) / (1024*1024)
+        }
@@ -1,7 +1,9 @@
 from collections import OrderedDict
 
 class LRUCache:
-    def __init__(self, capacity_mb):
+    def __init__(self, capacity_mb, on_evict=None):
+        # on_evict(key, value): gọi khi 1 item bị đẩy ra (vd: hạ xuống tầng đĩa)
+        self.on_evict = on_evict
         # Chuyển đổi MB sang Bytes
         self.capacity_bytes = capacity_mb * 1024 * 1024
         self.current_size_bytes = 0
@@ -37,14 +39,32 @@ class LRUCache:
             while self.current_size_bytes + size > self.capacity_bytes:
                 # Xóa phần tử cũ nhất (đầu hàng đợi)
                 if not self.cache: break
-                _, evicted_val = self.cache.popitem(last=False)
+                evicted_key, evicted_val = self.cache.popitem(last=False)
                 self.current_size_bytes -= len(evicted_val)
                 self.evictions += 1
+                if self.on_evict:
+                    self.on_evict(evicted_key, evicted_val)
         
         # Thêm mới
         self.cache[key] = value
         self.current_size_bytes += size
 
+    def delete(self, key):
+        """Bỏ key (không gọi on_evict)"""
+        value = self.cache.pop(key, None)
+        if value is not None:
+            self.current_size_bytes -= len(value)
+
+    def resize(self, capacity_bytes):
+        """Đổi dung lượng lúc đang chạy; nếu thu nhỏ thì evict tới khi vừa"""
+        self.capacity_bytes = capacity_bytes
+        while self.current_size_bytes > self.capacity_bytes and self.cache:
+            evicted_key, evicted_val = self.cache.popitem(last=False)
+            self.current_size_bytes -= len(evicted_val)
+            self.evictions += 1
+            if self.on_evict:
+                self.on_evict(evicted_key, evicted_val)
+
     def get_stats(self):
         total = self.hits + self.misses
         hit_ratio = (self.hits / total) if total > 0 else 0
@@ -0,0 +1,66 @@
+import threading
+from .lru_cache import LRUCache
+
+
+class ShardedCache:
+    def __init__(self, capacity_mb, num_shards=16, cache_cls=LRUCache, max_item_mb=None):
+        """
+        Cache chia shard (lock striping): mỗi key được hash vào 1 trong N shard,
+        mỗi shard là một LRUCache/LFUCache riêng với lock riêng.
+        Budget byte được chia đều cho các shard: item lớn hơn capacity_mb / num_shards
+        không cache được (đếm vào stats 'rejected').
+        max_item_mb: kích thước item lớn nhất cần cache được -> giảm num_shards để mỗi shard
+        chứa được ít nhất 1 item như vậy (raise ValueError nếu lớn hơn cả capacity_mb).
+        """
+        if max_item_mb is not None:
+            if max_item_mb > capacity_mb:
+                raise ValueError(f"max_item_mb={max_item_mb} is larger than capacity_mb={capacity_mb}")
+            num_shards = max(1, min(num_shards, int(capacity_mb // max_item_mb)))
+        self.num_shards = num_shards
+        self.capacity_bytes = capacity_mb * 1024 * 1024
+        shard_mb = capacity_mb / num_shards
+        self.shard_bytes = self.capacity_bytes / num_shards
+        self.shards = [cache_cls(capacity_mb=shard_mb) for _ in range(num_shards)]
+        self.locks = [threading.Lock() for _ in range(num_shards)]
+        self.rejected = [0] * num_shards  # put bị bỏ vì item lớn hơn 1 shard
+
+    def _index(self, key):
+        return hash(key) % self.num_shards
+
+    def get(self, key):
+        i = self._index(key)
+        with self.locks[i]:
+            return self.shards[i].get(key)
+
+    def put(self, key, value):
+        i = self._index(key)
+        with self.locks[i]:
+            if len(value) > self.shard_bytes:
+                self.rejected[i] += 1
+            self.shards[i].put(key, value)
+
+    @property
+    def current_size_bytes(self):
+        return sum(s.current_size_bytes for s in self.shards)
+
+    def get_stats(self):
+        # Lấy stats từng shard (mỗi shard khóa riêng, không khóa toàn cục)
+        per_shard = []
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                per_shard.append(shard.get_stats())
+
+        hits = sum(s['hits'] for s in per_shard)
+        misses = sum(s.get('misses', 0) for s in per_shard)
+        total = hits + misses
+        return {
+            "type": f"Sharded-{per_shard[0]['type']}",
+            "shards": self.num_shards,
+            "hits": hits,
+            "misses": misses,
+            "evictions": sum(s.get('evictions', 0) for s in per_shard),
+            "hit_ratio": (hits / total) if total > 0 else 0,
+            "rejected": sum(self.rejected),
+            "max_item_mb": self.shard_bytes / (1024*1024),
+            "current_size_mb": sum(s.get('current_size_mb', 0) for s in per_shard)
+        }
@@ -0,0 +1,305 @@
+import os
+import hashlib
+import multiprocessing
+from multiprocessing import shared_memory
+
+STATS_FIELDS = 3      # mỗi stripe: byte đang dùng, số item, số lần evict
+
+
+class _SizeClass:
+    """1 vùng slot cố định slot_size byte: bảng set-associative + payload"""
+
+    def __init__(self, slot_size, num_sets, ways):
+        self.slot_size = slot_size
+        self.num_sets = num_sets
+        self.ways = ways
+        self.entries = num_sets * ways
+
+
+class SharedMemoryCache:
+    def __init__(self, capacity_mb, slot_kb=(16, 128), shares=(0.25, 0.75), ways=8,
+                 num_stripes=64, max_key_len=96, name=None, mp_context=None):
+        """
+        Cache dùng chung giữa nhiều process qua multiprocessing.shared_memory:
+        - Mỗi size class (slot_kb) chiếm shares phần capacity, chia thành slot cố định,
+          bảng hash set-associative (ways slot mỗi set): key -> set theo blake2b 64 bit,
+          item nằm trong slot của class nhỏ nhất đủ chứa (lớn hơn slot lớn nhất: không cache)
+        - Metadata dạng mảng song song trong shared memory: tag (hash), version, độ dài,
+          bit CLOCK, key bytes; payload ở vùng riêng, offset = index slot * slot_size
+        - Ghi: khóa theo stripe (num_stripes multiprocessing.Lock, set -> stripe),
+          evict trong set bằng CLOCK (kim riêng mỗi set)
+        - Đọc không khóa (seqlock): version lẻ = đang ghi; copy payload rồi so version,
+          đổi thì đọc lại, thử vài lần không được thì khóa stripe
+        get() trả về bytes (copy): slot có thể bị process khác ghi đè ngay sau đó.
+        Truyền object cho multiprocessing.Process (fork hoặc spawn) để worker dùng chung;
+        mp_context: context tạo lock, phải trùng context tạo worker (vd get_context("spawn")).
+        process tạo ra (name=None) sở hữu vùng nhớ và unlink khi close().
+        hits/misses đếm riêng từng process, byte/item/evictions là của cả cache.
+        """
+        self.capacity_bytes = capacity_mb * 1024 * 1024
+        self.params = {"capacity_mb": capacity_mb, "slot_kb": tuple(slot_kb), "shares": tuple(shares),
+                       "ways": ways, "num_stripes": num_stripes, "max_key_len": max_key_len}
+        self.classes = []
+        for kb, share in zip(slot_kb, shares):
+            slot_size = kb * 1024
+            num_sets = max(1, int(self.capacity_bytes * share) // slot_size // ways)
+            self.classes.append(_SizeClass(slot_size, num_sets, ways))
+        self.max_value = self.classes[-1].slot_size
+        self.num_stripes = num_stripes
+        self.max_key_len = max_key_len
+
+        size = self._layout()
+        # Worker fork ra cũng có bản copy object: chỉ đúng process đã tạo mới là chủ
+        self.owner_pid = os.getpid() if name is None else None
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            ctx = mp_context or multiprocessing
+            self.locks = [ctx.Lock() for _ in range(num_stripes)]
+        else:
+            self.shm = _attach(name)
+        self._map()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _layout(self):
+        """Tính offset các vùng; vùng 8 byte đặt trước để giữ alignment"""
+        offset = self.num_stripes * STATS_FIELDS * 8
+        for c in self.classes:
+            c.off_tags = offset; offset += c.entries * 8
+            c.off_versions = offset; offset += c.entries * 4
+            c.off_lengths = offset; offset += c.entries * 4
+            c.off_key_lens = offset; offset += c.entries * 2
+            c.off_refs = offset; offset += c.entries
+            c.off_hands = offset; offset += c.num_sets
+            c.off_keys = offset; offset += c.entries * self.max_key_len
+            offset = (offset + 7) // 8 * 8
+        for c in self.classes:
+            c.off_payload = offset
+            offset += c.entries * c.slot_size
+        return offset
+
+    def _map(self):
+        buf = self.shm.buf
+        self._views = []
+
+        def view(start, nbytes, fmt):
+            v = buf[start:start + nbytes].cast(fmt)
+            self._views.append(v)
+            return v
+
+        self.stats = view(0, self.num_stripes * STATS_FIELDS * 8, 'q')
+        for c in self.classes:
+            c.tags = view(c.off_tags, c.entries * 8, 'Q')
+            c.versions = view(c.off_versions, c.entries * 4, 'I')
+            c.lengths = view(c.off_lengths, c.entries * 4, 'I')
+            c.key_lens = view(c.off_key_lens, c.entries * 2, 'H')
+            c.refs = view(c.off_refs, c.entries, 'B')
+            c.hands = view(c.off_hands, c.num_sets, 'B')
+            c.keys = view(c.off_keys, c.entries * self.max_key_len, 'B')
+            c.payload = view(c.off_payload, c.entries * c.slot_size, 'B')
+
+    # --- pickle: worker spawn gắn lại vào cùng vùng shared memory ---
+
+    def __getstate__(self):
+        return {"params": self.params, "name": self.shm.name, "locks": self.locks}
+
+    def __setstate__(self, state):
+        self.__init__(**state["params"], name=state["name"])
+        self.locks = state["locks"]
+
+    # --- Hash / tìm slot ---
+
+    def _hash(self, key):
+        kb = key.encode() if isinstance(key, str) else bytes(key)
+        h = int.from_bytes(hashlib.blake2b(kb, digest_size=8).digest(), "little")
+        return kb, h | 1          # tag 0 = slot trống
+
+    def _stripe(self, ci, s):
+        return (ci * 7919 + s) % self.num_stripes
+
+    def _find(self, c, s, kb, h):
+        """Index slot chứa key trong set s, hoặc -1"""
+        base = s * c.ways
+        row = c.tags[base:base + c.ways].tolist()
+        w = -1
+        while True:
+            try:
+                w = row.index(h, w + 1)
+            except ValueError:
+                return -1
+            e = base + w
+            if c.key_lens[e] == len(kb):
+                k0 = e * self.max_key_len
+                if c.keys[k0:k0 + len(kb)] == kb:
+                    return e
+
+    def _read(self, c, e, h):
+        """Copy payload slot e nếu tag vẫn là h -> bytes, hoặc None (key đã được _find so khớp)"""
+        n = c.lengths[e]
+        if c.tags[e] != h or n > c.slot_size:
+            return None       # slot đã đổi chủ / đang ghi dở
+        p0 = e * c.slot_size
+        return bytes(c.payload[p0:p0 + n])
+
+    # --- API ---
+
+    def get(self, key):
+        kb, h = self._hash(key)
+        for ci, c in enumerate(self.classes):
+            s = h % c.num_sets
+            e = self._find(c, s, kb, h)
+            if e < 0:
+                continue
+            data = None
+            for _ in range(4):
+                v1 = c.versions[e]
+                if v1 & 1:
+                    continue
+                data = self._read(c, e, h)
+                if c.versions[e] == v1:
+                    break
+                data = None
+            else:
+                # Writer ghi liên tục: đọc dưới lock
+                with self.locks[self._stripe(ci, s)]:
+                    data = self._read(c, e, h)
+            if data is not None:
+                c.refs[e] = 1
+                self.hits += 1
+                return data
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        size = len(value)
+        kb, h = self._hash(key)
+        if size > self.max_value or len(kb) > self.max_key_len:
+            self.delete(key)          # không cache được bản mới: bỏ bản cũ để không trả dữ liệu cũ
+            return
+        target = next(ci for ci, c in enumerate(self.classes) if size <= c.slot_size)
+        # Key đã có ở class khác (kích thước đổi) -> xóa bản cũ
+        for ci, c in enumerate(self.classes):
+            if ci != target:
+                self._delete(ci, c, kb, h)
+
+        c = self.classes[target]
+        s = h % c.num_sets
+        st = self._stripe(target, s) * STATS_FIELDS
+        with self.locks[self._stripe(target, s)]:
+            e = self._find(c, s, kb, h)
+            if e >= 0:
+                self.stats[st] -= c.lengths[e]
+            else:
+                e = self._victim(c, s)
+                if c.tags[e]:
+                    self.stats[st] -= c.lengths[e]
+                    self.stats[st + 2] += 1
+                else:
+                    self.stats[st + 1] += 1
+            self._write(c, e, kb, h, value)
+            self.stats[st] += size
+
+    def delete(self, key):
+        kb, h = self._hash(key)
+        return any([self._delete(ci, c, kb, h) for ci, c in enumerate(self.classes)])
+
+    def _delete(self, ci, c, kb, h):
+        s = h % c.num_sets
+        if self._find(c, s, kb, h) < 0:
+            return False
+        st = self._stripe(ci, s)
+        with self.locks[st]:
+            e = self._find(c, s, kb, h)
+            if e < 0:
+                return False
+            c.versions[e] = (c.versions[e] + 1) & 0xFFFFFFFF
+            c.tags[e] = 0
+            c.versions[e] = (c.versions[e] + 1) & 0xFFFFFFFF
+            self.stats[st * STATS_FIELDS] -= c.lengths[e]
+            self.stats[st * STATS_FIELDS + 1] -= 1
+        return True
+
+    def _victim(self, c, s):
+        """Slot trống đầu tiên trong set, hết thì quay kim CLOCK của set"""
+        base = s * c.ways
+        row = c.tags[base:base + c.ways].tolist()
+        if 0 in row:
+            return base + row.index(0)
+        hand = c.hands[s]
+        while True:
+            e = base + hand
+            hand = (hand + 1) % c.ways
+            if c.refs[e]:
+                c.refs[e] = 0
+            else:
+                c.hands[s] = hand
+                return e
+
+    def _write(self, c, e, kb, h, value):
+        """Ghi slot dưới lock stripe: version lẻ trong lúc ghi để reader biết mà đọc lại"""
+        c.versions[e] = (c.versions[e] + 1) & 0xFFFFFFFF
+        c.tags[e] = h
+        c.key_lens[e] = len(kb)
+        k0 = e * self.max_key_len
+        c.keys[k0:k0 + len(kb)] = kb
+        c.lengths[e] = len(value)
+        p0 = e * c.slot_size
+        c.payload[p0:p0 + len(value)] = value
+        c.refs[e] = 0
+        c.versions[e] = (c.versions[e] + 1) & 0xFFFFFFFF
+
+    @property
+    def current_size_bytes(self):
+        return sum(self.stats[i] for i in range(0, len(self.stats), STATS_FIELDS))
+
+    def clear(self):
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            for c in self.classes:
+                for e, tag in enumerate(c.tags.tolist()):
+                    if tag:
+                        c.versions[e] = (c.versions[e] + 1) & 0xFFFFFFFF
+                        c.tags[e] = 0
+                        c.versions[e] = (c.versions[e] + 1) & 0xFFFFFFFF
+            for i in range(len(self.stats)):
+                self.stats[i] = 0
+        finally:
+            for lock in self.locks:
+                lock.release()
+
+    def close(self):
+        """Bỏ map vùng nhớ; process tạo ra còn unlink để hệ thống thu hồi"""
+        for v in self._views:
+            v.release()
+        self._views = []
+        for c in self.classes:
+            c.tags = c.versions = c.lengths = c.key_lens = c.refs = c.hands = c.keys = c.payload = None
+        self.stats = None
+        self.shm.close()
+        if self.owner_pid == os.getpid():
+            self.shm.unlink()
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        stats = self.stats.tolist()
+        return {
+            "type": "SharedMemory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": sum(stats[2::STATS_FIELDS]),
+            "hit_ratio": (self.hits / total) if total > 0 else 0,
+            "current_size_mb": sum(stats[0::STATS_FIELDS]) / (1024*1024),
+            "items": sum(stats[1::STATS_FIELDS]),
+            "shm_mb": self.shm.size / (1024*1024),
+            "slots": {c.slot_size // 1024: c.entries for c in self.classes}
+        }
+
+
+def _attach(name):
+    """Gắn vào vùng đã có; Python 3.13+ tắt resource tracker để process phụ không unlink nhầm"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,246 @@
+import os
+import mmap
+from array import array
+from bisect import bisect_left
+
+def process_rss_bytes():
+    """RSS hiện tại của process (Linux: /proc/self/statm), nơi khác dùng peak RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, IndexError, ValueError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if os.uname().sysname == "Darwin" else rss * 1024
+
+
+class _SlabClass:
+    __slots__ = ("chunk_size", "per_page", "pages", "holes", "live_pages", "free", "lengths", "ref",
+                 "keys", "hand", "count")
+
+    def __init__(self, chunk_size, page_size):
+        self.chunk_size = chunk_size
+        self.per_page = page_size // chunk_size
+        self.pages = []            # vị trí trong class -> số page trong arena (-1 = đã bị lấy đi)
+        self.holes = []            # các vị trí = -1, dùng lại khi class được cấp page mới
+        self.live_pages = 0        # số page class đang giữ
+        self.free = []             # slot trống
+        # Metadata dạng mảng song song, index = slot (vị trí page * per_page + i)
+        self.lengths = array('I')
+        self.ref = bytearray()     # bit CLOCK: 1 = được đọc từ lần quét trước
+        self.keys = []
+        self.hand = 0              # kim CLOCK
+        self.count = 0
+
+
+class SlabCache:
+    def __init__(self, capacity_mb, page_kb=1024, min_chunk=64, growth_factor=1.08,
+                 use_mmap=True, on_evict=None, max_item_kb=None, copy_on_get=False):
+        """
+        Cache lưu payload trong 1 arena cấp phát sẵn (anonymous mmap hoặc bytearray),
+        chia page theo size class như memcached:
+        - Size class: min_chunk, *growth_factor, ... tới page_kb. Item lớn hơn 1 page
+          (max_item_bytes, mặc định 1MB) KHÔNG được cache, đếm vào stats 'rejected'.
+          Truyền max_item_kb (vd cỡ segment lớn nhất) để báo lỗi ngay khi page_kb quá nhỏ.
+        - Page (page_kb) được gán cho class khi cần; hết page thì evict LRU trong class,
+          class chưa có page nào thì lấy 1 page của class đang giữ nhiều page nhất
+        - Evict trong class theo CLOCK (xấp xỉ LRU): hit chỉ bật 1 byte ref, không sửa danh sách
+        - Metadata: dict key -> slot + các array song song (length, ref, key) mỗi class,
+          không có object bytes / node linked list cho từng item
+        - get() trả về memoryview read-only trỏ thẳng vào arena (không copy). View chỉ đúng
+          tới lần put/delete kế tiếp trên cache (ở bất kỳ thread nào): slot có thể được cấp
+          lại cho item khác. Cần giữ lâu hơn (vd gửi socket sau khi nhả lock) thì dùng
+          get(key, copy=True) hoặc copy_on_get=True để nhận bytes.
+        current_size_bytes/capacity_bytes tính theo byte payload như LRUCache.
+        """
+        self._params = (capacity_mb, page_kb, min_chunk, growth_factor, use_mmap)
+        self.max_item_kb = max_item_kb
+        self.copy_on_get = copy_on_get
+        self.capacity_bytes = capacity_mb * 1024 * 1024
+        self.page_size = min(page_kb * 1024, max(mmap.PAGESIZE, int(self.capacity_bytes)))
+        if max_item_kb is not None and max_item_kb * 1024 > self.page_size:
+            raise ValueError(f"max_item_kb={max_item_kb} lớn hơn page ({self.page_size // 1024}KB): "
+                             f"tăng page_kb để cache được item lớn")
+        self.max_item_bytes = self.page_size
+        self.num_pages = max(1, int(self.capacity_bytes // self.page_size))
+        self.on_evict = on_evict
+        self.current_size_bytes = 0
+
+        arena_bytes = self.num_pages * self.page_size
+        # Anonymous mmap: RAM chỉ thực sự được cấp khi page được ghi lần đầu
+        self.arena = mmap.mmap(-1, arena_bytes) if use_mmap else bytearray(arena_bytes)
+        self.view = memoryview(self.arena)
+        self.ro_view = self.view.toreadonly()
+        self.free_pages = list(range(self.num_pages - 1, -1, -1))
+
+        sizes = []
+        size = min_chunk
+        while size < self.page_size:
+            sizes.append(size)
+            size = max(size + 8, int(size * growth_factor) // 8 * 8)  # align 8 byte
+        sizes.append(self.page_size)
+        self.class_sizes = sizes
+        self.classes = [_SlabClass(s, self.page_size) for s in sizes]
+        self.index = {}            # key -> (class << 32) | slot
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.page_moves = 0
+        self.rejected = 0           # put bị bỏ vì item lớn hơn max_item_bytes
+
+    def _offset(self, c, slot):
+        return c.pages[slot // c.per_page] * self.page_size + (slot % c.per_page) * c.chunk_size
+
+    # --- API ---
+
+    def get(self, key, copy=None):
+        """copy=None: theo copy_on_get"""
+        loc = self.index.get(key)
+        if loc is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        c = self.classes[loc >> 32]
+        slot = loc & 0xFFFFFFFF
+        c.ref[slot] = 1
+        off = self._offset(c, slot)
+        view = self.ro_view[off:off + c.lengths[slot]]
+        if copy if copy is not None else self.copy_on_get:
+            return bytes(view)
+        return view
+
+    def put(self, key, value):
+        size = len(value)
+        if size > self.page_size or size > self.capacity_bytes:
+            self.rejected += 1
+            self.delete(key)          # không giữ bản cũ của key
+            return
+        if key in self.index:
+            self.delete(key)
+
+        ci = bisect_left(self.class_sizes, size)
+        c = self.classes[ci]
+        slot = self._alloc(ci, c)
+        off = self._offset(c, slot)
+        self.view[off:off + size] = value      # 1 lần memcpy vào arena
+        c.lengths[slot] = size
+        c.keys[slot] = key
+        c.ref[slot] = 0
+        c.count += 1
+        self.index[key] = (ci << 32) | slot
+        self.current_size_bytes += size
+
+    def delete(self, key):
+        loc = self.index.pop(key, None)
+        if loc is None:
+            return False
+        c = self.classes[loc >> 32]
+        self._release(c, loc & 0xFFFFFFFF)
+        return True
+
+    def _release(self, c, slot):
+        """Trả slot về free list"""
+        self.current_size_bytes -= c.lengths[slot]
+        c.keys[slot] = None
+        c.count -= 1
+        c.free.append(slot)
+
+    def _evict_slot(self, c, slot):
+        key = c.keys[slot]
+        value = None
+        if self.on_evict:
+            off = self._offset(c, slot)
+            value = bytes(self.view[off:off + c.lengths[slot]])   # slot sắp bị ghi đè -> copy
+        del self.index[key]
+        self._release(c, slot)
+        self.evictions += 1
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def _alloc(self, ci, c):
+        if not c.free:
+            if self.free_pages:
+                self._add_page(c, self.free_pages.pop())
+            elif c.count:
+                self._evict_slot(c, self._clock_victim(c))
+            else:
+                self._add_page(c, self._steal_page(ci))
+        return c.free.pop()
+
+    def _add_page(self, c, page):
+        c.live_pages += 1
+        if c.holes:
+            pos = c.holes.pop()         # dùng lại vị trí page đã bị lấy đi
+            c.pages[pos] = page
+        else:
+            pos = len(c.pages)
+            c.pages.append(page)
+            c.lengths.extend([0] * c.per_page)
+            c.ref.extend(bytes(c.per_page))
+            c.keys.extend([None] * c.per_page)
+        base = pos * c.per_page
+        # Slot nhỏ nhất được cấp trước
+        c.free.extend(range(base + c.per_page - 1, base - 1, -1))
+
+    def _clock_victim(self, c):
+        """Quay kim CLOCK tới slot có item mà ref = 0 (slot có ref = 1 được tha 1 vòng)"""
+        keys, ref = c.keys, c.ref
+        n = len(keys)
+        hand = c.hand
+        while True:
+            if hand >= n:
+                hand = 0
+            if keys[hand] is not None:
+                if not ref[hand]:
+                    c.hand = hand + 1
+                    return hand
+                ref[hand] = 0
+            hand += 1
+
+    def _steal_page(self, ci):
+        """Class ci chưa có page, arena đã hết: lấy page tại kim CLOCK của class giữ nhiều page nhất"""
+        victim = max((c for i, c in enumerate(self.classes) if i != ci), key=lambda c: c.live_pages)
+        pos = self._clock_victim(victim) // victim.per_page if victim.count else \
+            next(i for i, p in enumerate(victim.pages) if p >= 0)
+        base = pos * victim.per_page
+        for slot in range(base, base + victim.per_page):
+            if victim.keys[slot] is not None:
+                self._evict_slot(victim, slot)
+        lo, hi = base, base + victim.per_page
+        victim.free = [s for s in victim.free if not lo <= s < hi]
+        page = victim.pages[pos]
+        victim.pages[pos] = -1
+        victim.holes.append(pos)
+        victim.live_pages -= 1
+        self.page_moves += 1
+        return page
+
+    def clear(self):
+        self.__init__(*self._params, on_evict=self.on_evict, max_item_kb=self.max_item_kb,
+                      copy_on_get=self.copy_on_get)
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        rss = process_rss_bytes()
+        used_pages = self.num_pages - len(self.free_pages)
+        return {
+            "type": "Slab",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits / total) if total > 0 else 0,
+            "current_size_mb": self.current_size_bytes / (1024*1024),
+            "items": len(self.index),
+            "arena_mb": self.num_pages * self.page_size / (1024*1024),
+            "pages_used": used_pages,
+            "page_moves": self.page_moves,
+            "rejected": self.rejected,
+            "max_item_kb": self.max_item_bytes // 1024,
+            # Byte chunk đã cấp / byte payload: phần lãng phí do làm tròn lên size class
+            "slab_overhead": (sum(c.count * c.chunk_size for c in self.classes) / self.current_size_bytes)
+                             if self.current_size_bytes else 0,
+            "rss_mb": rss / (1024*1024),
+            "rss_per_cached_byte": (rss / self.current_size_bytes) if self.current_size_bytes else 0
+        }
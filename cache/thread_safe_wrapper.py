@@ -13,6 +13,12 @@ class ThreadSafeCache:
         with self.lock:
             self.base_cache.put(key, value)
 
+    def record_cost(self, key, cost):
+        # Chỉ chuyển tiếp nếu cache bên trong là cost-aware (GDSFCache)
+        if hasattr(self.base_cache, 'record_cost'):
+            with self.lock:
+                self.base_cache.record_cost(key, cost)
+
     def get_stats(self):
         with self.lock:
             return self.base_cache.get_stats()
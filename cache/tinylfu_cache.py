@@ -0,0 +1,180 @@
+from collections import OrderedDict
+from .count_min_sketch import CountMinSketch
+
+# Segment của item trong cache
+WINDOW = 0
+PROBATION = 1
+PROTECTED = 2
+
+
+class WTinyLFUCache:
+    def __init__(self, capacity_mb, window_pct=1, protected_pct=80, expected_items=None,
+                 on_evict=None):
+        """
+        W-TinyLFU (như Caffeine):
+        - Window LRU nhỏ (window_pct% dung lượng) nhận mọi item mới
+        - Main SLRU = probation + protected (protected_pct% của main)
+        - Item rơi khỏi window chỉ được vào main nếu tần suất (ước lượng bằng
+          Count-Min Sketch) lớn hơn victim của probation -> one-hit-wonder bị chặn lại
+        expected_items: số item dự kiến để chọn kích thước sketch
+                        (mặc định: capacity / 16KB)
+        """
+        self.capacity_bytes = capacity_mb * 1024 * 1024
+        self.window_capacity = self.capacity_bytes * window_pct // 100
+        self.main_capacity = self.capacity_bytes - self.window_capacity
+        self.protected_capacity = self.main_capacity * protected_pct // 100
+        self.on_evict = on_evict
+
+        if expected_items is None:
+            expected_items = max(1024, int(self.capacity_bytes // (16 * 1024)))
+        self.sketch = CountMinSketch(width=expected_items)
+
+        self.window = OrderedDict()     # key -> value, đầu = LRU
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.where = {}                 # key -> WINDOW / PROBATION / PROTECTED
+        self.window_bytes = 0
+        self.probation_bytes = 0
+        self.protected_bytes = 0
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0   # candidate thua victim, không được admit
+
+    @property
+    def current_size_bytes(self):
+        return self.window_bytes + self.probation_bytes + self.protected_bytes
+
+    def get(self, key):
+        self.sketch.increment(key)
+        seg = self.where.get(key)
+        if seg is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if seg == WINDOW:
+            self.window.move_to_end(key)
+            return self.window[key]
+        if seg == PROTECTED:
+            self.protected.move_to_end(key)
+            return self.protected[key]
+
+        # Hit ở probation -> lên protected
+        value = self.probation.pop(key)
+        self.probation_bytes -= len(value)
+        self.protected[key] = value
+        self.protected_bytes += len(value)
+        self.where[key] = PROTECTED
+        # Protected đầy thì đẩy LRU của protected về lại probation
+        while self.protected_bytes > self.protected_capacity and len(self.protected) > 1:
+            k, v = self.protected.popitem(last=False)
+            self.protected_bytes -= len(v)
+            self.probation[k] = v
+            self.probation_bytes += len(v)
+            self.where[k] = PROBATION
+        return value
+
+    def put(self, key, value):
+        size = len(value)
+        if size > self.capacity_bytes:
+            return
+
+        seg = self.where.get(key)
+        if seg is not None:
+            # Cập nhật tại chỗ
+            table = (self.window, self.probation, self.protected)[seg]
+            old = len(table[key])
+            table[key] = value
+            table.move_to_end(key)
+            if seg == WINDOW: self.window_bytes += size - old
+            elif seg == PROBATION: self.probation_bytes += size - old
+            else: self.protected_bytes += size - old
+        else:
+            self.window[key] = value
+            self.window_bytes += size
+            self.where[key] = WINDOW
+
+        # Window tràn -> các item LRU của window làm candidate vào main
+        while self.window_bytes > self.window_capacity and self.window:
+            k, v = self.window.popitem(last=False)
+            self.window_bytes -= len(v)
+            del self.where[k]
+            self._admit(k, v)
+
+        # Protected có thể tràn sau khi cập nhật giá trị lớn hơn
+        while self.protected_bytes > self.protected_capacity and len(self.protected) > 1:
+            k, v = self.protected.popitem(last=False)
+            self.protected_bytes -= len(v)
+            self.probation[k] = v
+            self.probation_bytes += len(v)
+            self.where[k] = PROBATION
+        self._evict_main_overflow()
+
+    def _admit(self, key, value):
+        size = len(value)
+        main_bytes = self.probation_bytes + self.protected_bytes
+        if main_bytes + size > self.main_capacity:
+            cand_freq = self.sketch.estimate(key)
+            # Phải thắng từng victim cần đẩy ra để có đủ chỗ
+            victims = []
+            freed = 0
+            for vk, vv in self._victims():
+                if main_bytes - freed + size <= self.main_capacity:
+                    break
+                if cand_freq <= self.sketch.estimate(vk):
+                    self.rejections += 1
+                    self._evicted(key, value)
+                    return
+                victims.append(vk)
+                freed += len(vv)
+            if main_bytes - freed + size > self.main_capacity:
+                # Main không đủ chỗ dù xóa hết (item quá to)
+                self.rejections += 1
+                self._evicted(key, value)
+                return
+            for vk in victims:
+                self._remove_main(vk)
+
+        self.probation[key] = value
+        self.probation_bytes += size
+        self.where[key] = PROBATION
+
+    def _victims(self):
+        """Thứ tự victim: LRU của probation trước, rồi tới LRU của protected"""
+        yield from self.probation.items()
+        yield from self.protected.items()
+
+    def _remove_main(self, key):
+        if self.where.pop(key) == PROBATION:
+            value = self.probation.pop(key)
+            self.probation_bytes -= len(value)
+        else:
+            value = self.protected.pop(key)
+            self.protected_bytes -= len(value)
+        self._evicted(key, value)
+
+    def _evict_main_overflow(self):
+        while self.probation_bytes + self.protected_bytes > self.main_capacity:
+            victim = next(iter(self.probation or self.protected))
+            self._remove_main(victim)
+
+    def _evicted(self, key, value):
+        self.evictions += 1
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        hit_ratio = (self.hits / total) if total > 0 else 0
+        return {
+            "type": "W-TinyLFU",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "rejections": self.rejections,
+            "hit_ratio": hit_ratio,
+            "current_size_mb": self.current_size_bytes / (1024*1024)
+        }
@@ -1,26 +1,114 @@
+import time
+from collections import OrderedDict, deque
 from .lru_cache import LRUCache
 
 class TwoTierCache:
-    def __init__(self, small_mb, large_mb, threshold_kb=50):
+    def __init__(self, small_mb, large_mb, threshold_kb=50, adaptive=False, min_share=0.1,
+                 ghost_share=0.1, step_share=1/256):
+        """
+        adaptive=True: tự chia lại dung lượng giữa 2 tầng lúc đang chạy.
+        Mỗi tầng có 1 ghost list (key + size của item vừa bị evict, không giữ dữ liệu),
+        cả 2 ghost cùng phủ ghost_share tổng dung lượng.
+        Miss trúng ghost của tầng nào nghĩa là thêm chừng đó byte cho tầng đó thì đã hit
+        -> chuyển step_share tổng dung lượng từ tầng kia sang (kiểu ARC).
+        Ghost 2 bên phủ cùng số byte nên tỉ lệ ghost hit = lợi ích biên trên mỗi byte,
+        split dừng lại khi 2 bên bằng nhau.
+        Mỗi tầng luôn giữ ít nhất min_share tổng dung lượng.
+        """
         self.threshold_bytes = threshold_kb * 1024
-        self.small_cache = LRUCache(capacity_mb=small_mb)
-        self.large_cache = LRUCache(capacity_mb=large_mb)
+        self.adaptive = adaptive
+        evict_small = self._ghost_small if adaptive else None
+        evict_large = self._ghost_large if adaptive else None
+        self.small_cache = LRUCache(capacity_mb=small_mb, on_evict=evict_small)
+        self.large_cache = LRUCache(capacity_mb=large_mb, on_evict=evict_large)
+
+        self.total_bytes = self.small_cache.capacity_bytes + self.large_cache.capacity_bytes
+        self.min_bytes = self.total_bytes * min_share
+        self.ghost_limit = self.total_bytes * ghost_share
+        self.step_bytes = max(1, int(self.total_bytes * step_share))
+        self.small_ghost = OrderedDict()  # key -> size
+        self.large_ghost = OrderedDict()
+        self.small_ghost_bytes = 0
+        self.large_ghost_bytes = 0
+
+        self.rebalances = 0
+        self.rebalance_events = deque(maxlen=32)
 
     def get(self, key):
         val = self.small_cache.get(key)
         if val: return val
-        return self.large_cache.get(key)
+        val = self.large_cache.get(key)
+        if val is None and self.adaptive:
+            self._check_ghosts(key)
+        return val
 
     def put(self, key, value):
+        if self.adaptive:
+            self._forget(key)
         if len(value) < self.threshold_bytes:
             self.small_cache.put(key, value)
         else:
             self.large_cache.put(key, value)
 
+    # --- Adaptive ---
+
+    def _ghost_small(self, key, value):
+        self.small_ghost[key] = len(value)
+        self.small_ghost_bytes += len(value)
+        while self.small_ghost_bytes > self.ghost_limit:
+            _, size = self.small_ghost.popitem(last=False)
+            self.small_ghost_bytes -= size
+
+    def _ghost_large(self, key, value):
+        self.large_ghost[key] = len(value)
+        self.large_ghost_bytes += len(value)
+        while self.large_ghost_bytes > self.ghost_limit:
+            _, size = self.large_ghost.popitem(last=False)
+            self.large_ghost_bytes -= size
+
+    def _forget(self, key):
+        size = self.small_ghost.pop(key, None)
+        if size is not None:
+            self.small_ghost_bytes -= size
+        size = self.large_ghost.pop(key, None)
+        if size is not None:
+            self.large_ghost_bytes -= size
+
+    def _check_ghosts(self, key):
+        if key in self.small_ghost:
+            self._move_capacity(self.large_cache, self.small_cache, "large->small")
+        elif key in self.large_ghost:
+            self._move_capacity(self.small_cache, self.large_cache, "small->large")
+
+    def _move_capacity(self, donor, receiver, direction):
+        nbytes = min(self.step_bytes, donor.capacity_bytes - self.min_bytes)
+        if nbytes <= 0:
+            return
+        receiver.resize(receiver.capacity_bytes + nbytes)
+        # Tầng bị thu nhỏ chỉ evict đúng phần byte vừa chuyển đi -> không dừng request lâu
+        donor.resize(donor.capacity_bytes - nbytes)
+        self.rebalances += 1
+        self.rebalance_events.append({
+            "time": time.time(),
+            "direction": direction,
+            "bytes": nbytes,
+            "small_mb": self.small_cache.capacity_bytes / (1024*1024)
+        })
+
     def get_stats(self):
         s = self.small_cache.get_stats()
         l = self.large_cache.get_stats()
-        return {
+        stats = {
             "type": "Two-Tier",
             "hits": s['hits'] + l['hits']
         }
+        if self.adaptive:
+            stats.update({
+                "split": {
+                    "small_mb": self.small_cache.capacity_bytes / (1024*1024),
+                    "large_mb": self.large_cache.capacity_bytes / (1024*1024)
+                },
+                "rebalances": self.rebalances,
+                "rebalance_events": list(self.rebalance_events)
+            })
+        return stats
@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict
+
+
+class WriteBehindCache:
+    def __init__(self, base_cache, max_pending=1024, max_pending_mb=64, batch_size=64):
+        """
+        Wrapper write-behind cho DiskCache / LogStructuredDiskCache:
+        put() chỉ ghi vào hàng đợi trong RAM, 1 thread nền gom batch và ghi xuống đĩa.
+        - get() đọc được cả các key chưa flush (từ hàng đợi)
+        - Hàng đợi đầy (max_pending item hoặc max_pending_mb) thì put() bị chặn (backpressure)
+        - flush(): chờ tới khi mọi put trước đó đã xuống đĩa (put đến sau không làm nó chờ thêm);
+          close(): flush rồi dừng thread
+        - Thread nền chỉ giữ io_lock trong từng lần ghi 1 item: get() key đã flush không phải
+          chờ cả batch
+        """
+        self.base_cache = base_cache
+        self.max_pending = max_pending
+        self.max_pending_bytes = max_pending_mb * 1024 * 1024
+        self.batch_size = batch_size
+
+        self.pending = OrderedDict()  # key -> value chờ ghi (thứ tự FIFO)
+        self.seqs = {}                # key -> số thứ tự put của value trong pending
+        self.flushing = {}            # key -> value của batch đang ghi
+        self.pending_bytes = 0
+        self.cond = threading.Condition()
+        self.io_lock = threading.Lock()  # base_cache không thread-safe
+        self.stopped = False
+        self._seq = 0                 # số thứ tự của put gần nhất
+        self._done_seq = 0            # mọi put có số thứ tự <= giá trị này đã xong
+
+        self.stats = {'flushed': 0, 'batches': 0, 'backpressure_waits': 0, 'write_errors': 0}
+
+        self.flusher = threading.Thread(target=self._flush_loop, name="write-behind", daemon=True)
+        self.flusher.start()
+
+    def get(self, key):
+        with self.cond:
+            value = self.pending.get(key)
+            if value is None:
+                value = self.flushing.get(key)
+            if value is not None:
+                return value
+        # Không còn trong RAM -> đã được ghi xuống base_cache
+        with self.io_lock:
+            return self.base_cache.get(key)
+
+    def put(self, key, value):
+        size = len(value)
+        with self.cond:
+            if self.stopped:
+                raise RuntimeError("WriteBehindCache is closed")
+            while self.pending and (len(self.pending) >= self.max_pending or
+                                    self.pending_bytes + size > self.max_pending_bytes):
+                self.stats['backpressure_waits'] += 1
+                self.cond.wait()
+
+            old = self.pending.pop(key, None)
+            if old is not None:
+                self.pending_bytes -= len(old)
+            self.pending[key] = value
+            self.pending_bytes += size
+            self._seq += 1
+            self.seqs[key] = self._seq
+            self.cond.notify_all()
+
+    def _flush_loop(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.stopped:
+                    self.cond.wait()
+                if not self.pending and self.stopped:
+                    return
+                batch = []
+                batch_seq = self._done_seq
+                while self.pending and len(batch) < self.batch_size:
+                    key, value = self.pending.popitem(last=False)
+                    self.pending_bytes -= len(value)
+                    batch_seq = self.seqs.pop(key)    # pending theo FIFO nên tăng dần
+                    self.flushing[key] = value
+                    batch.append((key, value))
+                # Đã có chỗ trống trong hàng đợi
+                self.cond.notify_all()
+
+            for key, value in batch:
+                # io_lock theo từng item: get() đọc đĩa chen vào giữa batch được
+                with self.io_lock:
+                    with self.cond:
+                        # delete() trong lúc chờ đã bỏ key khỏi flushing -> không ghi lại
+                        live = self.flushing.get(key) is value
+                    if not live:
+                        continue
+                    try:
+                        self.base_cache.put(key, value)
+                    except Exception:
+                        self.stats['write_errors'] += 1
+
+            with self.cond:
+                for key, value in batch:
+                    if self.flushing.get(key) is value:
+                        del self.flushing[key]
+                self._done_seq = batch_seq
+                self.stats['flushed'] += len(batch)
+                self.stats['batches'] += 1
+                self.cond.notify_all()
+
+    def delete(self, key):
+        with self.cond:
+            old = self.pending.pop(key, None)
+            if old is not None:
+                self.pending_bytes -= len(old)
+                self.seqs.pop(key, None)
+                self.cond.notify_all()
+            # Key trong batch đang ghi mà chưa tới lượt: thread nền sẽ bỏ qua
+            self.flushing.pop(key, None)
+        # Key đang được ghi dở thì io_lock chờ lần ghi đó xong rồi mới xóa
+        with self.io_lock:
+            self.base_cache.delete(key)
+
+    def flush(self):
+        """Barrier: trả về khi mọi put() trước đó đã được ghi xuống base_cache"""
+        with self.cond:
+            target = self._seq
+            while self._done_seq < target and (self.pending or self.flushing):
+                self.cond.wait()
+
+    def close(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        self.flusher.join()
+        if hasattr(self.base_cache, 'close'):
+            self.base_cache.close()
+
+    def clear(self):
+        with self.cond:
+            self.pending.clear()
+            self.seqs.clear()
+            self.pending_bytes = 0
+            self.cond.notify_all()
+        self.flush()
+        with self.io_lock:
+            self.base_cache.clear()
+
+    def get_stats(self):
+        with self.io_lock:
+            stats = self.base_cache.get_stats()
+        with self.cond:
+            stats = dict(stats, write_behind=dict(self.stats, pending=len(self.pending),
+                                                  pending_mb=self.pending_bytes / (1024*1024)))
+        return stats
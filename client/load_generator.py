@@ -0,0 +1,189 @@
+import time
+import queue
+import random
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit, quote
+from server.latency_histogram import LatencyHistogram
+
+
+class SequentialViewer:
+    def __init__(self, rnd, num_segments=500, zipf_alpha=0.9, watch_len=20, range_ratio=0.0,
+                 range_kb=64, segment_kb=100):
+        """
+        Hành vi 1 viewer: chọn điểm bắt đầu theo Zipf, xem tuần tự watch_len segment
+        (seg_XXXX.dat như data/ của generate_data.py) rồi chọn điểm khác.
+        range_ratio: tỉ lệ request là Range (range_kb, vị trí ngẫu nhiên trong segment_kb)
+                     thay vì cả segment.
+        """
+        self.rnd = rnd
+        self.num_segments = num_segments
+        self.cum_weights = []
+        total = 0.0
+        for i in range(num_segments):
+            total += 1 / (i + 1) ** zipf_alpha
+            self.cum_weights.append(total)
+        self.watch_len = watch_len
+        self.range_ratio = range_ratio
+        self.range_bytes = range_kb * 1024
+        self.max_range_start = max(0, segment_kb * 1024 - self.range_bytes)
+        self.pos = None
+        self.left = 0
+
+    def next_request(self):
+        """-> (segment_id, header Range hoặc None)"""
+        if self.left <= 0:
+            self.pos = self.rnd.choices(range(self.num_segments), cum_weights=self.cum_weights)[0]
+            self.left = self.watch_len
+        else:
+            self.pos = (self.pos + 1) % self.num_segments
+        self.left -= 1
+        rng = None
+        if self.rnd.random() < self.range_ratio:
+            start = self.rnd.randint(0, self.max_range_start)
+            rng = f"bytes={start}-{start + self.range_bytes - 1}"
+        return f"seg_{self.pos:04d}.dat", rng
+
+
+class LoadGenerator:
+    def __init__(self, url, rate=200.0, viewers=16, duration=10.0, seed=1, viewer_factory=None,
+                 timeout=10.0):
+        """
+        Load generator open-loop qua HTTP (keep-alive):
+        - Request đến theo Poisson với tốc độ rate req/s, KHÔNG phụ thuộc server trả lời nhanh hay chậm
+        - viewers: số viewer ảo, mỗi viewer 1 kết nối + 1 thread + hành vi xem riêng
+          (viewer_factory(rnd) -> object có next_request(), mặc định SequentialViewer)
+        - Latency được sửa coordinated omission: tính từ thời điểm request LẼ RA được gửi
+          (theo lịch Poisson), nên thời gian chờ khi mọi viewer đang bận cũng được tính.
+          Latency chưa sửa (từ lúc gửi thật) được báo riêng để so sánh.
+        """
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.rate = rate
+        self.viewers = viewers
+        self.duration = duration
+        self.seed = seed
+        self.timeout = timeout
+        self.viewer_factory = viewer_factory or (lambda rnd: SequentialViewer(rnd))
+
+        self.corrected = LatencyHistogram()
+        self.uncorrected = LatencyHistogram()
+        self.lock = threading.Lock()
+        self.stats = {"scheduled": 0, "completed": 0, "errors": 0, "bytes": 0, "max_backlog": 0}
+        self.status = {}
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _worker(self, idx, schedule):
+        viewer = self.viewer_factory(random.Random(self.seed * 1000 + idx))
+        conn = self._connect()
+        while True:
+            intended = schedule.get()
+            if intended is None:
+                break
+            # Chưa tới giờ (viewer rảnh sớm) -> đợi đúng lịch
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            seg, rng = viewer.next_request()
+            sent = time.perf_counter()
+            try:
+                conn.request("GET", "/segments/" + quote(seg), headers={"Range": rng} if rng else {})
+                resp = conn.getresponse()
+                body = resp.read()
+                status = resp.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = self._connect()
+                with self.lock:
+                    self.stats["errors"] += 1
+                continue
+            done = time.perf_counter()
+            self.corrected.record((done - intended) * 1000)
+            self.uncorrected.record((done - sent) * 1000)
+            with self.lock:
+                self.stats["completed"] += 1
+                self.stats["bytes"] += len(body)
+                self.status[status] = self.status.get(status, 0) + 1
+        conn.close()
+
+    def run(self):
+        schedule = queue.Queue()
+        threads = [threading.Thread(target=self._worker, args=(i, schedule), daemon=True)
+                   for i in range(self.viewers)]
+        for t in threads:
+            t.start()
+
+        # Lịch Poisson: khoảng cách giữa 2 request ~ Exp(rate)
+        rnd = random.Random(self.seed)
+        start = time.perf_counter()
+        t_next = start
+        while True:
+            t_next += rnd.expovariate(self.rate)
+            if t_next - start >= self.duration:
+                break
+            delay = t_next - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            schedule.put(t_next)
+            self.stats["scheduled"] += 1
+            backlog = schedule.qsize()
+            if backlog > self.stats["max_backlog"]:
+                self.stats["max_backlog"] = backlog
+        for _ in threads:
+            schedule.put(None)
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        with self.lock:
+            stats = dict(self.stats)
+            status = dict(self.status)
+        return {
+            "target_rate": self.rate,
+            "achieved_rate": stats["completed"] / elapsed if elapsed > 0 else 0,
+            "viewers": self.viewers,
+            "elapsed_s": elapsed,
+            "scheduled": stats["scheduled"],
+            "completed": stats["completed"],
+            "errors": stats["errors"],
+            "max_backlog": stats["max_backlog"],
+            "mb_received": stats["bytes"] / (1024 * 1024),
+            "status": status,
+            "latency": self.corrected.snapshot(),
+            "latency_uncorrected": self.uncorrected.snapshot()
+        }
+
+
+def format_report(r):
+    lines = [f"Rate: {r['achieved_rate']:.0f}/{r['target_rate']:.0f} req/s, {r['viewers']} viewer, "
+             f"{r['completed']} ok, {r['errors']} lỗi, backlog max {r['max_backlog']}, "
+             f"{r['mb_received']:.1f}MB, status {r['status']}"]
+    for name in ("latency", "latency_uncorrected"):
+        lat = r[name]
+        if lat.get('count'):
+            lines.append(f"{name:<20} avg {lat['avg']:.2f} | p50 {lat['p50']:.2f} | p99 {lat['p99']:.2f} | "
+                         f"p99.9 {lat['p999']:.2f} | max {lat['max']:.2f} ms")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python3 -m client.load_generator --url http://127.0.0.1:8080 --rate 500
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--rate", type=float, default=200)
+    parser.add_argument("--viewers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--segments", type=int, default=500)
+    parser.add_argument("--range-ratio", type=float, default=0.0)
+    args = parser.parse_args()
+
+    gen = LoadGenerator(args.url, rate=args.rate, viewers=args.viewers, duration=args.duration,
+                        viewer_factory=lambda rnd: SequentialViewer(rnd, num_segments=args.segments,
+                                                                    range_ratio=args.range_ratio))
+    print(format_report(gen.run()))
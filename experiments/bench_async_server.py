@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import random
+import asyncio
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from server.media_server import MediaServer
+from server.async_media_server import AsyncMediaServer
+from cache.lru_cache import LRUCache
+from cache.thread_safe_wrapper import ThreadSafeCache
+
+# === CẤU HÌNH BENCHMARK ===
+CLIENT_COUNTS = [50, 500, 5000]
+ASYNC_ONLY_CLIENTS = [10000]     # Threaded server không chạy nổi mức này
+REQUESTS_PER_CLIENT = 10
+NUM_SEGMENTS = 500
+HOT_SEGMENTS = 100               # 80% request rơi vào 100 segment hot
+CACHE_MB = 50
+DISK_LATENCY = 0.05
+
+
+def make_trace(client_id):
+    rnd = random.Random(client_id)
+    trace = []
+    for _ in range(REQUESTS_PER_CLIENT):
+        if rnd.random() < 0.8:
+            i = rnd.randrange(HOT_SEGMENTS)
+        else:
+            i = rnd.randrange(HOT_SEGMENTS, NUM_SEGMENTS)
+        trace.append(f"seg_{i:04d}.dat")
+    return trace
+
+
+def run_threaded(num_clients):
+    server = MediaServer("data", cache=ThreadSafeCache(LRUCache(capacity_mb=CACHE_MB)),
+                         disk_latency=DISK_LATENCY)
+    traces = [make_trace(c) for c in range(num_clients)]
+
+    def client(trace):
+        for seg in trace:
+            server.get_segment(seg)
+
+    threads = [threading.Thread(target=client, args=(t,)) for t in traces]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    dt = time.perf_counter() - t0
+    return num_clients * REQUESTS_PER_CLIENT / dt, server.get_metrics()
+
+
+def run_async(num_clients):
+    async def main():
+        server = AsyncMediaServer("data", cache=LRUCache(capacity_mb=CACHE_MB),
+                                  disk_latency=DISK_LATENCY)
+        traces = [make_trace(c) for c in range(num_clients)]
+
+        async def client(trace):
+            for seg in trace:
+                await server.get_segment(seg)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(t) for t in traces))
+        dt = time.perf_counter() - t0
+        await server.close()
+        return num_clients * REQUESTS_PER_CLIENT / dt, server.get_metrics()
+
+    return asyncio.run(main())
+
+
+def print_row(name, clients, rps, m):
+    print(f"{name:<9} | {clients:>7} | {rps:>10,.0f} | {m['p50_latency']:>8.3f} | "
+          f"{m['p99_latency']:>8.2f} | {m['hit_ratio']*100:>5.1f}%")
+
+
+def run_benchmark():
+    print("=== Threaded MediaServer vs AsyncMediaServer ===")
+    print(f"{'Server':<9} | {'Clients':>7} | {'Req/s':>10} | {'p50 ms':>8} | {'p99 ms':>8} | {'Hit':>6}")
+    print("-" * 65)
+    for n in CLIENT_COUNTS:
+        rps, m = run_threaded(n)
+        print_row("Threaded", n, rps, m)
+        rps, m = run_async(n)
+        print_row("Async", n, rps, m)
+    for n in ASYNC_ONLY_CLIENTS:
+        rps, m = run_async(n)
+        print_row("Async", n, rps, m)
+
+
+if __name__ == "__main__":
+    if not os.path.exists("data"):
+        import subprocess
+        subprocess.run(["python3", "generate_data.py"])
+    run_benchmark()
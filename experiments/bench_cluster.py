@@ -0,0 +1,65 @@
+import sys
+import os
+import random
+import argparse
+import threading
+from itertools import accumulate
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from server.cluster import LocalCluster
+from generate_data import DATA_DIR, NUM_SEGMENTS
+
+# === CẤU HÌNH BENCHMARK ===
+NUM_NODES = 3
+CACHE_MB = 15                 # mỗi node ~150 segment 100KB
+REPLICA_MB = 5
+HOT_THRESHOLD = 5
+CLIENTS_PER_NODE = 4
+REQUESTS_PER_CLIENT = 400
+DISK_LATENCY = 0.01           # origin chậm: 10ms
+
+MODES = {
+    "Độc lập": dict(peering=False),
+    "Cluster": dict(),
+    "Cluster+hot": dict(replica_mb=REPLICA_MB, hot_threshold=HOT_THRESHOLD),
+}
+
+
+def run(mode_kwargs, seed):
+    cum = list(accumulate(1 / (i + 1) ** 0.9 for i in range(NUM_SEGMENTS)))
+    with LocalCluster(DATA_DIR, num_nodes=NUM_NODES, cache_mb=CACHE_MB, disk_latency=DISK_LATENCY,
+                      **mode_kwargs) as cluster:
+        # Mỗi client gắn với 1 node (như load balancer chia viewer cho các node)
+        def client(node, rnd):
+            for i in rnd.choices(range(NUM_SEGMENTS), cum_weights=cum, k=REQUESTS_PER_CLIENT):
+                node.get_segment(f"seg_{i:04d}.dat")
+
+        threads = [threading.Thread(target=client, args=(node, random.Random(seed * 100 + j)))
+                   for node in cluster.nodes for j in range(CLIENTS_PER_NODE)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return cluster.get_metrics()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if not os.path.exists(DATA_DIR):
+        sys.exit("⚠️ Chưa có data/, chạy generate_data.py trước")
+
+    print(f"🧪 {NUM_NODES} node loopback, cache {CACHE_MB}MB/node, origin {DISK_LATENCY * 1000:.0f}ms, "
+          f"{NUM_NODES * CLIENTS_PER_NODE} client x {REQUESTS_PER_CLIENT} request")
+    print(f"{'Chế độ':<12} | {'origin':>6} | {'offload':>7} | {'hỏi peer':>8} | {'peer hit':>8} | "
+          f"{'hit tại node':>12} | {'p99 ms':>7}")
+    print("-" * 80)
+    for name, kwargs in MODES.items():
+        m = run(kwargs, args.seed)
+        nodes = m['nodes']
+        local_hit = sum(n['hit_ratio'] * n['requests'] for n in nodes) / m['requests']
+        p99 = max(n.get('p99_latency', 0) for n in nodes)
+        print(f"{name:<12} | {m['origin_reads']:>6} | {m['origin_offload'] * 100:>6.1f}% | "
+              f"{m['forwarded_ratio'] * 100:>7.1f}% | {m['peer_hit_ratio'] * 100:>7.1f}% | "
+              f"{local_hit * 100:>11.1f}% | {p99:>7.2f}")
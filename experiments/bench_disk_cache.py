@@ -0,0 +1,71 @@
+import sys
+import os
+import time
+import random
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.disk_cache import DiskCache
+
+# === CẤU HÌNH BENCHMARK ===
+# python3 experiments/bench_disk_cache.py [số file ...]
+FILE_COUNTS = [int(a) for a in sys.argv[1:]] or [100_000, 1_000_000]
+VALUE_SIZE = 512            # Thumbnail nhỏ
+OPS = 20000                 # Số thao tác đo latency mỗi loại
+
+
+def populate(cache_dir, count):
+    """Tạo sẵn file trực tiếp (không qua DiskCache) để không tính vào thời gian đo"""
+    value = os.urandom(VALUE_SIZE)
+    for i in range(count):
+        with open(os.path.join(cache_dir, f"obj_{i:08d}"), 'wb') as f:
+            f.write(value)
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def time_ops(fn, keys):
+    lats = []
+    for k in keys:
+        t0 = time.perf_counter()
+        fn(k)
+        lats.append((time.perf_counter() - t0) * 1e6)
+    return sum(lats) / len(lats), percentile(lats, 99)
+
+
+def run_benchmark():
+    print("=== DiskCache: startup + latency mỗi thao tác (µs) ===")
+    print(f"{'Files':>9} | {'Startup s':>9} | {'Hit avg/p99':>13} | {'Miss avg/p99':>13} | {'Put+evict avg/p99':>17}")
+    print("-" * 74)
+    value = os.urandom(VALUE_SIZE)
+    for count in FILE_COUNTS:
+        cache_dir = tempfile.mkdtemp(prefix="bench_disk_cache_")
+        try:
+            populate(cache_dir, count)
+
+            # Startup: dựng index bằng 1 lần scandir
+            t0 = time.perf_counter()
+            cache = DiskCache(cache_dir, capacity_mb=count * VALUE_SIZE / (1024 * 1024))
+            startup = time.perf_counter() - t0
+
+            rnd = random.Random(0)
+            hit_keys = [f"obj_{rnd.randrange(count):08d}" for _ in range(OPS)]
+            miss_keys = [f"missing_{i}" for i in range(OPS)]
+            put_keys = [f"new_{i:08d}" for i in range(OPS)]
+
+            hit = time_ops(cache.get, hit_keys)
+            miss = time_ops(cache.get, miss_keys)
+            put = time_ops(lambda k: cache.put(k, value), put_keys)
+
+            print(f"{count:>9,} | {startup:>9.2f} | {hit[0]:>6.1f}/{hit[1]:>6.1f} | "
+                  f"{miss[0]:>6.2f}/{miss[1]:>6.2f} | {put[0]:>8.1f}/{put[1]:>8.1f}")
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,58 @@
+import sys
+import os
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.lru_cache import LRUCache
+from cache.two_tier_cache import TwoTierCache
+from cache.gdsf_cache import GDSFCache
+
+# === CẤU HÌNH BENCHMARK ===
+# Workload hỗn hợp: nhiều thumbnail nhỏ + segment lớn, chung 1 budget
+NUM_THUMBS = 3000           # thumbnail 10KB
+NUM_SEGMENTS = 2000         # segment 2MB
+TRACE_LENGTH = 100000
+CACHE_MB = 200
+
+
+def origin_cost(size):
+    """Latency origin giả lập: 50ms cố định + thời gian truyền (200MB/s)"""
+    return 0.05 + size / 200e6
+
+
+def make_trace():
+    rnd = random.Random(3)
+    objects = [(f"thumb_{i:05d}", 10 * 1024) for i in range(NUM_THUMBS)] + \
+              [(f"seg_{i:05d}", 2 * 1024 * 1024) for i in range(NUM_SEGMENTS)]
+    weights = [1 / (i + 1) ** 0.8 for i in range(len(objects))]
+    rnd.shuffle(weights)
+    return rnd.choices(objects, weights=weights, k=TRACE_LENGTH)
+
+
+def run(name, cache, trace):
+    payloads = {}
+    hits = bytes_hit = bytes_total = 0
+    origin_time = 0.0
+    for key, size in trace:
+        bytes_total += size
+        if cache.get(key) is not None:
+            hits += 1
+            bytes_hit += size
+            continue
+        cost = origin_cost(size)
+        origin_time += cost
+        if hasattr(cache, 'record_cost'):
+            cache.record_cost(key, cost)
+        cache.put(key, payloads.setdefault(size, b"x" * size))
+    print(f"{name:<16} | {hits / len(trace) * 100:>6.1f}% | {bytes_hit / bytes_total * 100:>9.1f}% | {origin_time:>9.0f}")
+
+
+if __name__ == "__main__":
+    trace = make_trace()
+    print(f"=== {CACHE_MB}MB cache, {NUM_THUMBS} thumbnail 10KB + {NUM_SEGMENTS} segment 2MB ===")
+    print(f"{'Cache':<16} | {'Hit':>7} | {'Byte hit':>10} | {'Origin s':>9}")
+    print("-" * 52)
+    run("LRU", LRUCache(CACHE_MB), trace)
+    run("TwoTier 20/180", TwoTierCache(20, CACHE_MB - 20), trace)
+    run("GDSF hit", GDSFCache(CACHE_MB, mode="hit"), trace)
+    run("GDSF byte", GDSFCache(CACHE_MB, mode="byte"), trace)
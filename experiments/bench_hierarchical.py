@@ -0,0 +1,53 @@
+import sys
+import os
+import random
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from server.media_server import MediaServer
+from cache.lru_cache import LRUCache
+from cache.hierarchical_cache import HierarchicalCache
+
+# === CẤU HÌNH BENCHMARK ===
+RAM_MB = 5                  # RAM chỉ chứa ~50 segment
+DISK_MB = 40                # Đĩa local chứa ~400 segment
+NUM_SEGMENTS = 500
+TRACE_LENGTH = 3000
+DISK_LATENCY = 0.01         # Origin 10ms cho benchmark chạy nhanh
+
+
+def make_trace():
+    rnd = random.Random(42)
+    # Zipf-like: working set lớn hơn RAM nhiều lần
+    weights = [1 / (i + 1) ** 0.8 for i in range(NUM_SEGMENTS)]
+    ids = rnd.choices(range(NUM_SEGMENTS), weights=weights, k=TRACE_LENGTH)
+    return [f"seg_{i:04d}.dat" for i in ids]
+
+
+def run(name, cache):
+    server = MediaServer("data", cache=cache, disk_latency=DISK_LATENCY)
+    for seg in make_trace():
+        server.get_segment(seg)
+    m = server.get_metrics()
+    print(f"{name:<22} | {m['hit_ratio']*100:>6.1f}% | {m['avg_latency']:>8.2f} | "
+          f"{m['p95_latency']:>8.2f} | {m['bytes_disk']:>9.1f}")
+    for tier, t in m.get('tiers', {}).items():
+        print(f"   └ {tier:<18} | {t['hit_ratio']*100:>6.1f}% | {t['avg_latency_ms']:>8.3f} (lookup)")
+
+
+if __name__ == "__main__":
+    if not os.path.exists("data"):
+        import subprocess
+        subprocess.run(["python3", "generate_data.py"])
+
+    print(f"=== RAM {RAM_MB}MB vs RAM {RAM_MB}MB + Disk {DISK_MB}MB (origin {DISK_LATENCY*1000:.0f}ms) ===")
+    print(f"{'Cache':<22} | {'Hit':>7} | {'Avg ms':>8} | {'P95 ms':>8} | {'Origin MB':>9}")
+    print("-" * 66)
+    run("LRU RAM only", LRUCache(capacity_mb=RAM_MB))
+    for mode in ("exclusive", "inclusive"):
+        disk_dir = tempfile.mkdtemp(prefix="bench_l2_")
+        try:
+            run(f"Hierarchical {mode}", HierarchicalCache(RAM_MB, DISK_MB, disk_dir=disk_dir, mode=mode))
+        finally:
+            shutil.rmtree(disk_dir, ignore_errors=True)
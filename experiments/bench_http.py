@@ -0,0 +1,68 @@
+import sys
+import os
+import http.client
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from server.media_server import MediaServer
+from server.origin import MmapOrigin
+from server.http_server import MediaHTTPServer
+from cache.lru_cache import LRUCache
+from cache.thread_safe_wrapper import ThreadSafeCache
+from client.load_generator import LoadGenerator, SequentialViewer, format_report
+
+# === CẤU HÌNH BENCHMARK ===
+# Tất cả chạy qua loopback: latency gồm cả socket, parse HTTP và copy trong kernel
+DATA_DIR = "data"
+RATES = [200, 800]          # req/s (open-loop Poisson)
+VIEWERS = 16
+DURATION = 5                # giây mỗi lần chạy
+CACHE_MB = 100
+
+
+def check_protocol(url):
+    """Kiểm tra nhanh: keep-alive, Range 206, 416, 404"""
+    host, port = url.split("//")[1].split(":")
+    conn = http.client.HTTPConnection(host, int(port))
+    expected = open(os.path.join(DATA_DIR, "seg_0001.dat"), "rb").read()
+
+    conn.request("GET", "/segments/seg_0001.dat")
+    r = conn.getresponse()
+    full = r.read()
+    sock = conn.sock
+    conn.request("GET", "/segments/seg_0001.dat", headers={"Range": "bytes=1000-1999"})
+    r2 = conn.getresponse()
+    part = r2.read()
+    same_conn = conn.sock is sock
+    conn.request("GET", "/segments/seg_0001.dat", headers={"Range": f"bytes={len(expected)}-"})
+    r3 = conn.getresponse(); r3.read()
+    conn.request("GET", "/segments/nope.dat")
+    r4 = conn.getresponse(); r4.read()
+    conn.close()
+
+    ok = (r.status == 200 and full == expected and r2.status == 206 and part == expected[1000:2000]
+          and r2.getheader("Content-Range") == f"bytes 1000-1999/{len(expected)}"
+          and same_conn and r3.status == 416 and r4.status == 404)
+    print(f"{'✅' if ok else '❌'} Protocol: 200 ({len(full)}B), 206 {r2.getheader('Content-Range')}, "
+          f"keep-alive={same_conn}, 416={r3.status}, 404={r4.status}")
+
+
+def run(name, cache):
+    media = MediaServer(DATA_DIR, cache=cache, disk_latency=0, origin=MmapOrigin(DATA_DIR))
+    with MediaHTTPServer(media) as server:
+        check_protocol(server.url)
+        for rate in RATES:
+            gen = LoadGenerator(server.url, rate=rate, viewers=VIEWERS, duration=DURATION,
+                                viewer_factory=lambda rnd: SequentialViewer(rnd, range_ratio=0.2))
+            print(f"\n--- {name}, {rate} req/s ---")
+            print(format_report(gen.run()))
+        m = media.get_metrics()
+        print(f"Server: hit ratio {m['hit_ratio']:.2f}, p99 trong server {m['p99_latency']:.2f} ms")
+    media.close()
+
+
+if __name__ == "__main__":
+    if not os.path.exists(DATA_DIR):
+        import subprocess
+        subprocess.run(["python3", "generate_data.py"])
+    run(f"LRU {CACHE_MB}MB (memoryview / sendmsg)", ThreadSafeCache(LRUCache(CACHE_MB)))
+    run("Không cache (sendfile)", None)
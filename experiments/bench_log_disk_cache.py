@@ -0,0 +1,57 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.disk_cache import DiskCache
+from cache.log_disk_cache import LogStructuredDiskCache
+
+# === CẤU HÌNH BENCHMARK ===
+# python3 experiments/bench_log_disk_cache.py [số object]
+NUM_OBJECTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+THUMB_SIZE = 2 * 1024       # Thumbnail 2KB
+
+
+def bench(name, make_cache):
+    cache_dir = tempfile.mkdtemp(prefix="bench_log_")
+    try:
+        value = os.urandom(THUMB_SIZE)
+        cache = make_cache(cache_dir)
+
+        t0 = time.perf_counter()
+        for i in range(NUM_OBJECTS):
+            cache.put(f"thumb_{i:08d}", value)
+        write_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for i in range(0, NUM_OBJECTS, 7):
+            cache.get(f"thumb_{i:08d}")
+        read_s = time.perf_counter() - t0
+        reads = len(range(0, NUM_OBJECTS, 7))
+
+        if hasattr(cache, 'close'):
+            cache.close()
+        t0 = time.perf_counter()
+        cache = make_cache(cache_dir)      # Restart: dựng lại index
+        recover_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        cache.clear()
+        clear_s = time.perf_counter() - t0
+        if hasattr(cache, 'close'):
+            cache.close()
+
+        print(f"{name:<14} | {NUM_OBJECTS / write_s:>10,.0f} | {reads / read_s:>10,.0f} | "
+              f"{recover_s:>9.2f} | {clear_s:>8.2f}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print(f"=== {NUM_OBJECTS:,} thumbnail {THUMB_SIZE // 1024}KB: file-per-key vs log-structured ===")
+    print(f"{'Backend':<14} | {'Put/s':>10} | {'Get/s':>10} | {'Restart s':>9} | {'Clear s':>8}")
+    print("-" * 64)
+    bench("DiskCache", lambda d: DiskCache(d))
+    bench("LogStructured", lambda d: LogStructuredDiskCache(d))
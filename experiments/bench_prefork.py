@@ -0,0 +1,97 @@
+import sys
+import os
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from itertools import accumulate
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from server.hash_ring import HashRing
+from server.media_server import MediaServer
+from server.prefork_server import PreforkMediaServer
+from cache.lru_cache import LRUCache
+from cache.thread_safe_wrapper import ThreadSafeCache
+from generate_data import DATA_DIR, NUM_SEGMENTS
+
+# === CẤU HÌNH BENCHMARK ===
+NUM_KEYS = 100_000
+CACHE_MB = 20                 # ~200 segment 100KB: có cả hit và miss
+CLIENTS = 16
+REQUESTS_PER_CLIENT = 500
+DISK_LATENCY = 0.002
+WORKER_COUNTS = [1, 2, 4]
+
+
+def ring_report():
+    """Tỉ lệ key bị chuyển khi thêm/bớt node và độ lệch tải theo số vnode"""
+    keys = [f"vid_{i:06d}/seg_{i % 1800:04d}.dat" for i in range(NUM_KEYS)]
+    print(f"🔁 Consistent hashing trên {NUM_KEYS:,} key")
+    print(f"{'vnodes':>6} | {'N':>2} | {'thêm 1 node':>11} | {'bớt 1 node':>10} | {'lý tưởng':>8} | {'tải max/avg':>11}")
+    for vnodes in (1, 16, 160):
+        for n in (4, 8):
+            ring = HashRing(range(n), vnodes=vnodes)
+            before = [ring.get_node(k) for k in keys]
+            load = Counter(before)
+            ring.add_node(n)
+            added = sum(a != ring.get_node(k) for a, k in zip(before, keys)) / NUM_KEYS
+            ring.remove_node(n)
+            ring.remove_node(0)
+            removed = sum(a != ring.get_node(k) for a, k in zip(before, keys)) / NUM_KEYS
+            imbalance = max(load.values()) / (NUM_KEYS / n)
+            print(f"{vnodes:>6} | {n:>2} | {added * 100:>10.1f}% | {removed * 100:>9.1f}% | "
+                  f"{100 / (n + 1):>4.1f}/{100 / n:.1f}% | {imbalance:>11.2f}")
+
+
+def run_clients(media, seed):
+    cum = list(accumulate(1 / (i + 1) ** 0.9 for i in range(NUM_SEGMENTS)))
+    plans = []
+    for c in range(CLIENTS):
+        rnd = random.Random(seed * 100 + c)
+        plans.append([f"seg_{i:04d}.dat" for i in rnd.choices(range(NUM_SEGMENTS), cum_weights=cum,
+                                                               k=REQUESTS_PER_CLIENT)])
+
+    def client(plan):
+        for seg in plan:
+            media.get_segment(seg)
+
+    threads = [threading.Thread(target=client, args=(p,)) for p in plans]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return CLIENTS * REQUESTS_PER_CLIENT / (time.perf_counter() - t0)
+
+
+def throughput_report():
+    print(f"\n🚀 {CLIENTS} client thread x {REQUESTS_PER_CLIENT} request, cache tổng {CACHE_MB}MB, "
+          f"disk {DISK_LATENCY * 1000:.0f}ms, {os.cpu_count()} CPU")
+    print(f"{'Chế độ':<12} | {'req/s':>8} | {'hit':>6} | {'p99 ms':>7} | tải từng worker (hit)")
+    media = MediaServer(DATA_DIR, cache=ThreadSafeCache(LRUCache(CACHE_MB)), disk_latency=DISK_LATENCY)
+    rate = run_clients(media, 1)
+    m = media.get_metrics()
+    print(f"{'1 process':<12} | {rate:>8,.0f} | {m['hit_ratio'] * 100:>5.1f}% | {m['p99_latency']:>7.2f} |")
+    media.close()
+
+    for n in WORKER_COUNTS:
+        media = PreforkMediaServer(DATA_DIR, num_workers=n, cache_mb=CACHE_MB, disk_latency=DISK_LATENCY)
+        rate = run_clients(media, 1)
+        m = media.get_metrics()
+        loads = ", ".join(f"{w['load_share'] * 100:.0f}% ({w['hit_ratio'] * 100:.0f}%)" for w in m['workers'])
+        print(f"{f'prefork x{n}':<12} | {rate:>8,.0f} | {m['hit_ratio'] * 100:>5.1f}% | "
+              f"{m['p99_latency']:>7.2f} | {loads}")
+        media.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ring-only", action="store_true")
+    args = parser.parse_args()
+    ring_report()
+    if not args.ring_only:
+        if not os.path.exists(DATA_DIR):
+            print("⚠️ Chưa có data/, chạy generate_data.py trước")
+        else:
+            throughput_report()
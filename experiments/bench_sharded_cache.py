@@ -0,0 +1,77 @@
+import sys
+import os
+import time
+import random
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.lru_cache import LRUCache
+from cache.lfu_cache import LFUCache
+from cache.thread_safe_wrapper import ThreadSafeCache
+from cache.sharded_cache import ShardedCache
+
+# === CẤU HÌNH BENCHMARK ===
+THREAD_COUNTS = [1, 2, 4, 8, 16, 32, 64]
+OPS_PER_THREAD = 20000
+NUM_KEYS = 1000
+VALUE_SIZE = 1024          # 1KB mỗi item
+PUT_RATIO = 0.05           # 5% là put (insert chậm hơn get)
+CAPACITY_MB = 50
+INSERT_DELAY = 0.0005      # Kịch bản 2: put bị chặn 0.5ms (giả lập insert chậm, nhả GIL)
+
+
+class SlowInsertLRU(LRUCache):
+    """LRU có put chậm: trong lúc put, lock của shard/wrapper bị giữ"""
+    def put(self, key, value):
+        time.sleep(INSERT_DELAY)
+        super().put(key, value)
+
+
+def make_caches(cache_cls):
+    return {
+        "ThreadSafe": ThreadSafeCache(cache_cls(capacity_mb=CAPACITY_MB)),
+        "Sharded-16": ShardedCache(CAPACITY_MB, num_shards=16, cache_cls=cache_cls),
+    }
+
+
+def run_threads(cache, num_threads):
+    keys = [f"seg_{i:04d}.dat" for i in range(NUM_KEYS)]
+    value = b"x" * VALUE_SIZE
+    for k in keys:
+        cache.put(k, value)
+
+    barrier = threading.Barrier(num_threads + 1)
+
+    def worker(seed):
+        rnd = random.Random(seed)
+        get, put = cache.get, cache.put
+        barrier.wait()
+        for _ in range(OPS_PER_THREAD):
+            k = keys[rnd.randrange(NUM_KEYS)]
+            if rnd.random() < PUT_RATIO:
+                put(k, value)
+            else:
+                get(k)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    for t in threads: t.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for t in threads: t.join()
+    dt = time.perf_counter() - t0
+    return num_threads * OPS_PER_THREAD / dt
+
+
+def run_benchmark():
+    for cache_cls in (LRUCache, LFUCache, SlowInsertLRU):
+        print(f"\n=== {cache_cls.__name__}: throughput (ops/s) vs số thread ===")
+        print(f"{'Threads':<8} | {'ThreadSafe':>12} | {'Sharded-16':>12} | {'Speedup':>7}")
+        print("-" * 50)
+        for n in THREAD_COUNTS:
+            res = {name: run_threads(c, n) for name, c in make_caches(cache_cls).items()}
+            speedup = res["Sharded-16"] / res["ThreadSafe"]
+            print(f"{n:<8} | {res['ThreadSafe']:>12,.0f} | {res['Sharded-16']:>12,.0f} | {speedup:>6.2f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import random
+import argparse
+import multiprocessing as mp
+from itertools import accumulate
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.shared_memory_cache import SharedMemoryCache
+from cache.lru_cache import LRUCache
+
+# === CẤU HÌNH BENCHMARK ===
+PROCESS_COUNTS = [1, 2, 4, 8]
+NUM_KEYS = 20_000             # thumbnail 10KB -> ~200MB dữ liệu
+VALUE_KB = 10
+CAPACITY_MB = 64              # tổng RAM cho cache, chia đều nếu mỗi process cache riêng
+OPS_PER_PROCESS = 40_000
+ZIPF_ALPHA = 0.9
+MISS_US = 200                 # thời gian lấy từ origin khi miss (sleep, không tốn CPU)
+
+
+def worker(cache_factory, shared, seed, ops, miss_us, barrier, results):
+    # Cache riêng được tạo trong process con (mỗi worker 1 LRUCache riêng)
+    cache = shared if shared is not None else cache_factory()
+    rnd = random.Random(seed)
+    cum = list(accumulate(1 / (i + 1) ** ZIPF_ALPHA for i in range(NUM_KEYS)))
+    keys = [f"vid_{i:06d}/thumb.jpg" for i in rnd.choices(range(NUM_KEYS), cum_weights=cum, k=ops)]
+    value = b"x" * (VALUE_KB * 1024)
+    hits = 0
+    barrier.wait()
+    t0 = time.perf_counter()
+    for key in keys:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            if miss_us:
+                time.sleep(miss_us / 1e6)
+            cache.put(key, value)
+    results.put((hits, ops, time.perf_counter() - t0))
+    if shared is not None:
+        shared.close()
+
+
+def run(mode, n, ops, miss_us):
+    shared = None
+    factory = None
+    if mode == "shared":
+        shared = SharedMemoryCache(CAPACITY_MB, slot_kb=(VALUE_KB,), shares=(1.0,))
+    else:
+        factory = _Private(CAPACITY_MB / n)
+    barrier = mp.Barrier(n + 1)
+    results = mp.Queue()
+    procs = [mp.Process(target=worker, args=(factory, shared, 1000 + i, ops, miss_us, barrier, results))
+             for i in range(n)]
+    for p in procs:
+        p.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    out = [results.get() for _ in procs]
+    elapsed = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+    if shared is not None:
+        shared.close()
+    hits = sum(o[0] for o in out)
+    total = sum(o[1] for o in out)
+    return total / elapsed, hits / total
+
+
+class _Private:
+    """Factory pickle được: mỗi worker tạo LRUCache(mb) riêng"""
+
+    def __init__(self, mb):
+        self.mb = mb
+
+    def __call__(self):
+        return LRUCache(self.mb)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=OPS_PER_PROCESS)
+    parser.add_argument("--miss-us", type=float, default=MISS_US)
+    parser.add_argument("--processes", type=int, nargs="+", default=PROCESS_COUNTS)
+    args = parser.parse_args()
+
+    print(f"🧪 {NUM_KEYS:,} key {VALUE_KB}KB Zipf {ZIPF_ALPHA}, tổng RAM cache {CAPACITY_MB}MB, "
+          f"miss {args.miss_us:.0f}us, {os.cpu_count()} CPU")
+    print(f"{'Process':>7} | {'Riêng: ops/s':>12} | {'hit':>6} | {'Chung: ops/s':>12} | {'hit':>6}")
+    print("-" * 56)
+    for n in args.processes:
+        p_rate, p_hit = run("private", n, args.ops, args.miss_us)
+        s_rate, s_hit = run("shared", n, args.ops, args.miss_us)
+        print(f"{n:>7} | {p_rate:>12,.0f} | {p_hit * 100:>5.1f}% | {s_rate:>12,.0f} | {s_hit * 100:>5.1f}%")
@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.slab_cache import SlabCache, process_rss_bytes
+from cache.lru_cache import LRUCache
+
+# === CẤU HÌNH BENCHMARK ===
+# Nhiều thumbnail nhỏ: overhead object Python chiếm phần lớn RAM với LRUCache
+NUM_ITEMS = 200_000
+SIZE_RANGE = (512, 2048)
+CAPACITY_MB = 512            # đủ chứa hết, so sánh RSS khi cache đầy item
+LOOKUPS = 500_000
+
+CACHES = {
+    "LRU": lambda mb: LRUCache(mb),
+    "Slab": lambda mb: SlabCache(mb),
+    # growth 1.25 như memcached mặc định: làm tròn lên size class tốn RAM hơn
+    "Slab-1.25": lambda mb: SlabCache(mb, growth_factor=1.25),
+}
+
+
+def run_one(name, num_items, lookups):
+    """Chạy trong process riêng để RSS không lẫn với cache khác"""
+    rnd = random.Random(1)
+    sizes = [rnd.randint(*SIZE_RANGE) for _ in range(num_items)]
+    base = process_rss_bytes()
+    cache = CACHES[name](CAPACITY_MB)
+
+    t0 = time.perf_counter()
+    for i, size in enumerate(sizes):
+        # Payload mới mỗi item như khi đọc từ origin (không dùng chung 1 object bytes)
+        cache.put(f"vid_{i:06d}/thumb.jpg", os.urandom(size))
+    put_s = time.perf_counter() - t0
+    rss = process_rss_bytes() - base
+
+    keys = [f"vid_{rnd.randrange(num_items):06d}/thumb.jpg" for _ in range(lookups)]
+    t0 = time.perf_counter()
+    for key in keys:
+        cache.get(key)
+    get_s = time.perf_counter() - t0
+
+    payload = cache.current_size_bytes
+    return {
+        "cache": name,
+        "items": num_items,
+        "payload_mb": payload / (1024 * 1024),
+        "rss_mb": rss / (1024 * 1024),
+        "rss_per_cached_byte": rss / payload if payload else 0,
+        "put_per_s": num_items / put_s,
+        "get_per_s": lookups / get_s,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=NUM_ITEMS)
+    parser.add_argument("--lookups", type=int, default=LOOKUPS)
+    parser.add_argument("--worker", choices=list(CACHES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_one(args.worker, args.items, args.lookups)))
+        sys.exit(0)
+
+    print(f"🧪 {args.items:,} thumbnail {SIZE_RANGE[0]}-{SIZE_RANGE[1]}B, mỗi cache 1 process riêng")
+    print(f"{'Cache':<9} | {'Payload':>9} | {'RSS tăng':>9} | {'RSS/byte':>8} | {'put/s':>9} | {'get/s':>9}")
+    print("-" * 69)
+    for name in CACHES:
+        out = subprocess.run([sys.executable, __file__, "--worker", name, "--items", str(args.items),
+                              "--lookups", str(args.lookups)],
+                             capture_output=True, text=True, check=True).stdout
+        r = json.loads(out)
+        print(f"{name:<9} | {r['payload_mb']:>7.1f}MB | {r['rss_mb']:>7.1f}MB | "
+              f"{r['rss_per_cached_byte']:>8.2f} | {r['put_per_s']:>9,.0f} | {r['get_per_s']:>9,.0f}")
@@ -0,0 +1,51 @@
+import sys
+import os
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.two_tier_cache import TwoTierCache
+
+# === CẤU HÌNH BENCHMARK ===
+# Ban ngày chủ yếu xem video (segment), buổi tối chủ yếu lướt thumbnail
+NUM_THUMBS = 600            # thumbnail 10KB  -> ~6MB
+NUM_SEGMENTS = 60           # segment 200KB   -> ~12MB
+PHASE_LENGTH = 40000
+PHASES = [0.2, 0.9]         # tỉ lệ request thumbnail mỗi pha
+SMALL_MB, LARGE_MB = 4, 8
+
+
+def make_trace():
+    rnd = random.Random(1)
+    trace = []
+    for thumb_share in PHASES:
+        for _ in range(PHASE_LENGTH):
+            if rnd.random() < thumb_share:
+                trace.append((f"thumb_{rnd.randrange(NUM_THUMBS):05d}", 10 * 1024))
+            else:
+                trace.append((f"seg_{rnd.randrange(NUM_SEGMENTS):05d}", 200 * 1024))
+    return trace
+
+
+def run(name, cache, trace):
+    payloads = {}
+    for p, start in enumerate(range(0, len(trace), PHASE_LENGTH)):
+        hits = 0
+        for key, size in trace[start:start + PHASE_LENGTH]:
+            if cache.get(key) is not None:
+                hits += 1
+            else:
+                cache.put(key, payloads.setdefault(size, b"x" * size))
+        split = cache.get_stats().get('split')
+        split_str = f"{split['small_mb']:.1f}/{split['large_mb']:.1f}" if split else f"{SMALL_MB}/{LARGE_MB}"
+        print(f"{name:<10} | {p:>4} | {hits / PHASE_LENGTH * 100:>6.1f}% | {split_str:>11}")
+    return cache
+
+
+if __name__ == "__main__":
+    trace = make_trace()
+    print(f"=== TwoTier {SMALL_MB}MB + {LARGE_MB}MB, tỉ lệ thumbnail theo pha: {PHASES} ===")
+    print(f"{'Mode':<10} | {'Pha':>4} | {'Hit':>7} | {'Small/Large':>11}")
+    print("-" * 42)
+    run("Fixed", TwoTierCache(SMALL_MB, LARGE_MB), trace)
+    cache = run("Adaptive", TwoTierCache(SMALL_MB, LARGE_MB, adaptive=True), trace)
+    print(f"\nRebalance: {cache.get_stats()['rebalances']} lần, gần nhất: {cache.get_stats()['rebalance_events'][-1]}")
@@ -0,0 +1,57 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.disk_cache import DiskCache
+from cache.write_behind import WriteBehindCache
+
+# === CẤU HÌNH BENCHMARK ===
+NUM_PUTS = 5000
+VALUE_SIZE = 100 * 1024     # Segment 100KB
+PUT_INTERVAL = 0.0005       # Tải ghi liên tục: 1 put mỗi 0.5ms (~200MB/s)
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def run(name, make_cache):
+    cache_dir = tempfile.mkdtemp(prefix="bench_wb_")
+    try:
+        cache = make_cache(cache_dir)
+        value = os.urandom(VALUE_SIZE)
+        lats = []
+        t_start = time.perf_counter()
+        for i in range(NUM_PUTS):
+            t0 = time.perf_counter()
+            cache.put(f"seg_{i:06d}.dat", value)
+            lats.append((time.perf_counter() - t0) * 1000)
+            # Giữ nhịp đều: bù thời gian put vào khoảng nghỉ
+            next_t = t_start + (i + 1) * PUT_INTERVAL
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        t0 = time.perf_counter()
+        if hasattr(cache, 'flush'):
+            cache.flush()
+        drain = (time.perf_counter() - t0) * 1000
+        if hasattr(cache, 'close'):
+            cache.close()
+
+        print(f"{name:<12} | {sum(lats) / len(lats):>8.3f} | {percentile(lats, 50):>8.3f} | "
+              f"{percentile(lats, 99):>8.3f} | {max(lats):>8.2f} | {drain:>8.1f}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print(f"=== {NUM_PUTS} put x {VALUE_SIZE // 1024}KB: latency put (ms) ===")
+    print(f"{'Mode':<12} | {'avg':>8} | {'p50':>8} | {'p99':>8} | {'max':>8} | {'flush ms':>8}")
+    print("-" * 68)
+    run("Sync", lambda d: DiskCache(d))
+    run("WriteBehind", lambda d: WriteBehindCache(DiskCache(d)))
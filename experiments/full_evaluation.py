@@ -7,17 +7,26 @@ import random
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from server.media_server import MediaServer
 from cache.lru_cache import LRUCache
+from cache.lfu_cache import LFUCache
+from cache.tinylfu_cache import WTinyLFUCache
+from generate_data import NUM_SEGMENTS
 
 # === CẤU HÌNH THỬ NGHIỆM ===
 CACHE_SIZES = [10, 50, 100, 200] # MB
 TRACE_LENGTH = 2000              # Số lượng request trong bài test
+POLICIES = {                     # Các thuật toán được so sánh
+    'LRU': LRUCache,
+    'LFU': LFUCache,
+    'W-TinyLFU': WTinyLFUCache
+}
 
 def generate_viral_trace():
     """Tạo trace có tính chất Viral (Temporal Locality)"""
     trace = []
-    # 20% file hot chiếm 80% request
-    hot_files = [f"seg_{i:04d}.dat" for i in range(200)] 
-    cold_files = [f"seg_{i:04d}.dat" for i in range(200, 1000)]
+    # 20% file hot chiếm 80% request, chỉ dùng id có trong data/ (không có miss FileNotFound)
+    num_hot = NUM_SEGMENTS // 5
+    hot_files = [f"seg_{i:04d}.dat" for i in range(num_hot)]
+    cold_files = [f"seg_{i:04d}.dat" for i in range(num_hot, NUM_SEGMENTS)]
     
     for _ in range(TRACE_LENGTH):
         if random.random() < 0.8:
@@ -29,59 +38,65 @@ def generate_viral_trace():
 def run_experiment():
     print("🚀 Bắt đầu đánh giá toàn diện (Section 10)...")
     
-    # Kết quả để vẽ biểu đồ
-    results = {
-        'sizes': CACHE_SIZES,
-        'hit_ratios': [],
-        'avg_latencies': [],
-        'p95_latencies': [],
-        'bytes_from_disk': [],
-        'bytes_from_cache': []
-    }
+    # Kết quả để vẽ biểu đồ: mỗi policy một bộ số liệu
+    results = {'sizes': CACHE_SIZES, 'policies': {}}
 
     trace = generate_viral_trace()
 
-    for size_mb in CACHE_SIZES:
-        print(f"   ▶ Đang chạy với Cache Size = {size_mb} MB...")
-        
-        # --- FIX LỖI TẠI ĐÂY ---
-        # Code cũ: cache = LRUCache(capacity_items=...) -> SAI
-        # Code mới: Truyền thẳng capacity_mb vào
-        cache = LRUCache(capacity_mb=size_mb)
-        # -----------------------
-        
-        server = MediaServer("data", cache=cache)
-        
-        # Chạy Trace
-        for seg_id in trace:
-            server.get_segment(seg_id)
+    for name, cache_cls in POLICIES.items():
+        res = {
+            'hit_ratios': [],
+            'avg_latencies': [],
+            'p95_latencies': [],
+            'bytes_from_disk': [],
+            'bytes_from_cache': []
+        }
+        for size_mb in CACHE_SIZES:
+            print(f"   ▶ Đang chạy {name} với Cache Size = {size_mb} MB...")
+            cache = cache_cls(capacity_mb=size_mb)
+            server = MediaServer("data", cache=cache)
             
-        # Lấy metrics
-        m = server.get_metrics()
-        results['hit_ratios'].append(m.get('hit_ratio', 0) * 100)
-        results['avg_latencies'].append(m.get('avg_latency', 0))
-        results['p95_latencies'].append(m.get('p95_latency', 0))
-        results['bytes_from_disk'].append(m.get('bytes_disk', 0))
-        results['bytes_from_cache'].append(m.get('bytes_cache', 0))
+            # Chạy Trace
+            for seg_id in trace:
+                server.get_segment(seg_id)
+                
+            # Lấy metrics
+            m = server.get_metrics()
+            res['hit_ratios'].append(m.get('hit_ratio', 0) * 100)
+            res['avg_latencies'].append(m.get('avg_latency', 0))
+            res['p95_latencies'].append(m.get('p95_latency', 0))
+            res['bytes_from_disk'].append(m.get('bytes_disk', 0))
+            res['bytes_from_cache'].append(m.get('bytes_cache', 0))
+        results['policies'][name] = res
+
+    # Bảng tóm tắt hit ratio
+    print(f"\n{'Policy':<10} | " + " | ".join(f"{s:>5}MB" for s in CACHE_SIZES))
+    for name, res in results['policies'].items():
+        print(f"{name:<10} | " + " | ".join(f"{h:>6.1f}%" for h in res['hit_ratios']))
 
     return results
 
 def plot_charts(res):
     print("📊 Đang vẽ biểu đồ...")
+    sizes = res['sizes']
+    policies = res['policies']
     
-    # 1. Hit Ratio vs Cache Size
+    # 1. Hit Ratio vs Cache Size (mỗi policy 1 đường)
     plt.figure(figsize=(10, 6))
-    plt.plot(res['sizes'], res['hit_ratios'], marker='o', color='g')
+    for name, r in policies.items():
+        plt.plot(sizes, r['hit_ratios'], marker='o', label=name)
     plt.title('Hit Ratio vs Cache Capacity')
     plt.xlabel('Cache Size (MB)')
     plt.ylabel('Hit Ratio (%)')
+    plt.legend()
     plt.grid(True)
     plt.savefig('results/1_hit_ratio.png')
     
     # 2. Latency (Avg & P95) vs Cache Size
     plt.figure(figsize=(10, 6))
-    plt.plot(res['sizes'], res['avg_latencies'], marker='o', label='Avg Latency')
-    plt.plot(res['sizes'], res['p95_latencies'], marker='x', linestyle='--', label='P95 Latency')
+    for name, r in policies.items():
+        line, = plt.plot(sizes, r['avg_latencies'], marker='o', label=f'{name} Avg')
+        plt.plot(sizes, r['p95_latencies'], marker='x', linestyle='--', color=line.get_color(), label=f'{name} P95')
     plt.title('Latency vs Cache Capacity')
     plt.xlabel('Cache Size (MB)')
     plt.ylabel('Latency (ms)')
@@ -89,12 +104,14 @@ def plot_charts(res):
     plt.grid(True)
     plt.savefig('results/2_latency.png')
 
-    # 3. Bytes Read Source (Origin vs Cache)
+    # 3. Bytes Read Source (Origin vs Cache): nhóm cột theo policy
     plt.figure(figsize=(10, 6))
-    indices = range(len(res['sizes']))
-    plt.bar(indices, res['bytes_from_disk'], width=0.4, label='From Disk', color='red')
-    plt.bar(indices, res['bytes_from_cache'], width=0.4, bottom=res['bytes_from_disk'], label='From Cache', color='blue')
-    plt.xticks(indices, res['sizes'])
+    width = 0.8 / len(policies)
+    for p_idx, (name, r) in enumerate(policies.items()):
+        xs = [i + p_idx * width for i in range(len(sizes))]
+        plt.bar(xs, r['bytes_from_disk'], width=width, label=f'{name} From Disk')
+        plt.bar(xs, r['bytes_from_cache'], width=width, bottom=r['bytes_from_disk'], alpha=0.4, label=f'{name} From Cache')
+    plt.xticks([i + width * (len(policies) - 1) / 2 for i in range(len(sizes))], sizes)
     plt.title('Data Source: Disk vs Cache')
     plt.xlabel('Cache Size (MB)')
     plt.ylabel('Total MB Transferred')
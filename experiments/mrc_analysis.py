@@ -0,0 +1,77 @@
+import sys
+import os
+import random
+import argparse
+import matplotlib.pyplot as plt
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.lru_cache import LRUCache
+from simulator.stack_distance import StackDistanceAnalyzer
+from simulator.trace_simulator import TraceSimulator
+
+# === CẤU HÌNH ===
+NUM_OBJECTS = 200000
+TARGET_MISS_RATIOS = [0.5, 0.4, 0.3]   # miss ratio mong muốn -> cần bao nhiêu RAM
+CHECK_SIZES = [100, 500, 1000, 2000]   # MB, đối chiếu với replay LRU thật
+
+
+def make_trace(length, seed=1):
+    """Trace Zipf, size mỗi object lấy ngẫu nhiên: thumbnail 10KB / segment 100KB / 300KB"""
+    rnd = random.Random(seed)
+    keys = [f"seg_{i:06d}.dat" for i in range(NUM_OBJECTS)]
+    sizes = {k: rnd.choice([10 * 1024, 100 * 1024, 300 * 1024]) for k in keys}
+    weights = [1 / (i + 1) ** 0.9 for i in range(NUM_OBJECTS)]
+    return rnd.choices(keys, weights=weights, k=length), sizes
+
+
+def load_trace(path):
+    """Access log dạng text: mỗi dòng '<key> <size>'"""
+    trace, sizes = [], {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2:
+                trace.append(parts[0])
+                sizes[parts[0]] = int(parts[1])
+    return trace, sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trace", help="file access log '<key> <size>' (mặc định: trace Zipf tổng hợp)")
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    parser.add_argument("--check", action="store_true", help="replay LRU ở CHECK_SIZES để đối chiếu")
+    args = parser.parse_args()
+
+    trace, sizes = load_trace(args.trace) if args.trace else make_trace(args.requests)
+    analyzer = StackDistanceAnalyzer(sample_rate=args.sample_rate).run(trace, sizes)
+    print(f"=== {len(trace):,} request, sample rate {args.sample_rate} -> {analyzer.get_stats()['sampled']:,} mẫu ===")
+
+    curve = analyzer.curve(points=200)
+    for target in TARGET_MISS_RATIOS:
+        ok = curve['miss_ratio'] <= target
+        need = f"{curve['capacities_mb'][ok.argmax()]:.0f}MB" if ok.any() else "không đạt"
+        print(f"Miss ratio <= {target:.0%}: cần {need}")
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(curve['capacities_mb'], curve['miss_ratio'] * 100, label='Miss ratio')
+    plt.plot(curve['capacities_mb'], curve['byte_miss_ratio'] * 100, linestyle='--', label='Byte miss ratio')
+
+    if args.check:
+        print(f"\n{'MB':>6} | {'Stack dist':>10} | {'LRU replay':>10}")
+        points = []
+        for mb in CHECK_SIZES:
+            m = TraceSimulator().run(LRUCache(mb), trace, sizes)
+            points.append((1 - m['hit_ratio']) * 100)
+            print(f"{mb:>6} | {analyzer.miss_ratio(mb) * 100:>9.1f}% | {points[-1]:>9.1f}%")
+        plt.scatter(CHECK_SIZES, points, color='red', zorder=3, label='LRU replay')
+
+    plt.title('LRU Miss Ratio Curve (stack distance, 1 pass)')
+    plt.xlabel('Cache Size (MB)')
+    plt.ylabel('Miss Ratio (%)')
+    plt.legend()
+    plt.grid(True)
+    if not os.path.exists("results"): os.makedirs("results")
+    plt.savefig('results/4_mrc.png')
+    print("✅ Đã lưu biểu đồ vào 'results/4_mrc.png'")
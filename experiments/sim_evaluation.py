@@ -0,0 +1,61 @@
+import sys
+import os
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache.lru_cache import LRUCache
+from cache.lfu_cache import LFUCache
+from cache.tinylfu_cache import WTinyLFUCache
+from cache.gdsf_cache import GDSFCache
+from simulator.trace_simulator import TraceSimulator
+from simulator.latency_models import ConstantLatency, LogNormalLatency
+from workload.trace_io import TraceReader
+
+# === CẤU HÌNH THỬ NGHIỆM ===
+# Giống full_evaluation.py nhưng chạy trên đồng hồ ảo -> trace hàng triệu request
+CACHE_SIZES = [10, 50, 100, 200]   # MB
+NUM_OBJECTS = 20000
+SEGMENT_SIZE_KB = 100
+POLICIES = {
+    'LRU': LRUCache,
+    'LFU': LFUCache,
+    'W-TinyLFU': WTinyLFUCache,
+    'GDSF': GDSFCache
+}
+
+
+def make_trace(length, seed=42):
+    """Trace Zipf (alpha=0.9) trên NUM_OBJECTS segment cùng size"""
+    rnd = random.Random(seed)
+    keys = [f"seg_{i:06d}.dat" for i in range(NUM_OBJECTS)]
+    weights = [1 / (i + 1) ** 0.9 for i in range(NUM_OBJECTS)]
+    rnd.shuffle(weights)
+    sizes = dict.fromkeys(keys, SEGMENT_SIZE_KB * 1024)
+    return rnd.choices(keys, weights=weights, k=length), sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--latency", choices=["constant", "lognormal"], default="lognormal")
+    parser.add_argument("--trace", help="trace nhị phân từ generate_data.py trace (đọc dạng stream)")
+    args = parser.parse_args()
+
+    if args.trace:
+        reader = TraceReader(args.trace)
+        sizes = None
+        print(f"=== Trace {args.trace}, origin {args.latency} ===")
+    else:
+        trace, sizes = make_trace(args.requests)
+        print(f"=== {args.requests:,} request, {NUM_OBJECTS} segment x {SEGMENT_SIZE_KB}KB, origin {args.latency} ===")
+    print(f"{'Policy':<10} | {'MB':>4} | {'Hit':>6} | {'Avg ms':>7} | {'P99 ms':>7} | {'Req/s':>9}")
+    print("-" * 60)
+    for name, cache_cls in POLICIES.items():
+        for size_mb in CACHE_SIZES:
+            model = ConstantLatency(50) if args.latency == "constant" else LogNormalLatency(50, seed=1)
+            if args.trace:
+                trace = reader.requests()   # mỗi lần chạy đọc lại file, không giữ trace trong RAM
+            m = TraceSimulator(model).run(cache_cls(capacity_mb=size_mb), trace, sizes=sizes)
+            print(f"{name:<10} | {size_mb:>4} | {m['hit_ratio'] * 100:>5.1f}% | {m['avg_latency']:>7.2f} | "
+                  f"{m['p99_latency']:>7.1f} | {m['requests_per_s']:>9,.0f}")
@@ -1,5 +1,6 @@
 import os
-import random
+import time
+import argparse
 
 DATA_DIR = "data"
 NUM_SEGMENTS = 500       # 500 đoạn video
@@ -14,5 +15,53 @@ def create_dummy_data():
             f.write(os.urandom(SEGMENT_SIZE_KB * 1024))
     print("✅ Xong!")
 
+def create_catalog(args):
+    from workload.catalog import Catalog
+    t0 = time.perf_counter()
+    catalog = Catalog(args.videos, seed=args.seed, median_segments=args.median_segments)
+    print(f"⏳ Đang tạo {catalog.num_objects:,} object ({args.videos:,} video, "
+          f"{catalog.total_bytes / 1024**3:.1f}GB, {args.fill}) tại '{args.out}'...")
+    count = catalog.materialize(args.out, fill=args.fill, workers=args.workers)
+    print(f"✅ Xong {count:,} file trong {time.perf_counter() - t0:.1f}s")
+
+def create_trace(args):
+    from workload.catalog import Catalog
+    from workload.sessions import SessionModel
+    from workload.trace_io import write_trace
+    catalog = Catalog.load(os.path.join(args.catalog, "catalog.json"))
+    model = SessionModel(catalog, seed=args.seed, sessions_per_hour=args.sessions_per_hour,
+                         duration_hours=args.hours, flash_crowds=args.flash_crowds)
+    t0 = time.perf_counter()
+    count = write_trace(args.out, model, max_requests=args.max_requests)
+    size_mb = os.path.getsize(args.out) / (1024 * 1024)
+    print(f"✅ Đã ghi {count:,} request ({size_mb:.1f}MB) vào '{args.out}' "
+          f"trong {time.perf_counter() - t0:.1f}s")
+
 if __name__ == "__main__":
-    create_dummy_data()
+    parser = argparse.ArgumentParser(description="Không có lệnh con: tạo data/ 500 segment 100KB như cũ")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("catalog", help="catalog nhiều video: segment size thay đổi + thumbnail")
+    p.add_argument("--videos", type=int, default=1000)
+    p.add_argument("--median-segments", type=int, default=100)
+    p.add_argument("--fill", choices=["sparse", "fallocate", "random"], default="sparse")
+    p.add_argument("--workers", type=int, default=None, help="số process ghi file (mặc định = số CPU)")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--out", default="data/catalog")
+
+    p = sub.add_parser("trace", help="trace nhị phân từ mô hình session")
+    p.add_argument("--catalog", default="data/catalog", help="thư mục có catalog.json")
+    p.add_argument("--sessions-per-hour", type=float, default=3600)
+    p.add_argument("--hours", type=float, default=24)
+    p.add_argument("--flash-crowds", type=int, default=3)
+    p.add_argument("--max-requests", type=int, default=None)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--out", default="data/trace.bin")
+
+    args = parser.parse_args()
+    if args.command == "catalog":
+        create_catalog(args)
+    elif args.command == "trace":
+        create_trace(args)
+    else:
+        create_dummy_data()
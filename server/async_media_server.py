@@ -0,0 +1,172 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from .latency_histogram import LatencyHistogram
+from .readahead import Readahead
+from .origin import FileOrigin
+
+
+class AsyncMediaServer:
+    def __init__(self, data_dir, cache=None, disk_latency=0.05, prefetch_enabled=False,
+                 io_workers=32, max_prefetch_tasks=256, readahead_max=16, readahead_budget_mb=8,
+                 origin=None):
+        """
+        Phiên bản asyncio của MediaServer: 1 event loop phục vụ hàng nghìn viewer.
+        - Đọc file origin chạy trên ThreadPoolExecutor có giới hạn (io_workers)
+        - Miss trùng key thì await chung 1 Future (coalescing)
+        - Prefetch chạy dưới dạng asyncio task (tối đa max_prefetch_tasks task cùng lúc)
+        Cache dùng lại các class cũ (LRUCache, LFUCache, ...): mọi thao tác cache
+        đều chạy trên event loop nên không cần lock.
+        """
+        self.data_dir = data_dir
+        self.origin = origin or FileOrigin(data_dir)
+        self.cache = cache
+        self.disk_latency = disk_latency
+        self.prefetch_enabled = prefetch_enabled
+        self.max_prefetch_tasks = max_prefetch_tasks
+        self.executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="origin-io")
+
+        # INSTRUMENTATION (giống MediaServer)
+        self.stats = {
+            'requests': 0,
+            'disk_reads': 0,
+            'bytes_disk': 0,
+            'bytes_cache': 0,
+            'coalesced': 0,
+            'prefetch_issued': 0,
+            'prefetch_skipped': 0
+        }
+        self.latency = LatencyHistogram()
+
+        self._inflight = {}         # segment_id -> Task đang đọc origin
+        self._prefetch_reads = set()  # Task đọc origin do prefetch khởi động (không tính disk_reads)
+        self._prefetch_tasks = {}   # segment_id -> Task prefetch
+        self.readahead = None
+        if prefetch_enabled:
+            self.readahead = Readahead(max_window=readahead_max,
+                                       session_budget_bytes=readahead_budget_mb * 1024 * 1024)
+
+    async def get_segment(self, segment_id, session=None):
+        self.stats['requests'] += 1
+        start_t = time.perf_counter()
+        data = None
+
+        # 1. Check Cache
+        if self.cache:
+            data = self.cache.get(segment_id)
+            if data:
+                self.stats['bytes_cache'] += len(data)
+
+        # 2. Miss -> đọc origin (hoặc chờ lần đọc đang chạy)
+        if not data:
+            data = await self._fetch(segment_id)
+
+        # 3. Prefetch
+        if self.prefetch_enabled and data:
+            self._trigger_prefetch(segment_id, session, len(data))
+
+        # 4. Record Latency
+        self.latency.record((time.perf_counter() - start_t) * 1000)
+        return data
+
+    async def _fetch(self, segment_id, prefetch=False):
+        task = self._inflight.get(segment_id)
+        joined_prefetch = False
+        if task is not None:
+            if not prefetch:
+                self.stats['coalesced'] += 1
+                joined_prefetch = task in self._prefetch_reads
+        else:
+            # Lần đọc là Task riêng: caller đầu tiên bị cancel (client ngắt, timeout)
+            # cũng không hủy lần đọc mà các caller khác đang chờ
+            task = asyncio.create_task(self._read_from_disk(segment_id, prefetch))
+            self._inflight[segment_id] = task
+            if prefetch:
+                self._prefetch_reads.add(task)
+            task.add_done_callback(lambda t, k=segment_id: self._read_done(k, t))
+        # shield: mọi caller (cả caller đầu) bị cancel chỉ hủy việc chờ của chính nó
+        data = await asyncio.shield(task)
+        if joined_prefetch and data:
+            # Chờ lần đọc của prefetch (không được tính): vẫn là 1 miss, giống MediaServer
+            self.stats['disk_reads'] += 1
+            self.stats['bytes_disk'] += len(data)
+        return data
+
+    def _read_done(self, segment_id, task):
+        if self._inflight.get(segment_id) is task:
+            del self._inflight[segment_id]
+        self._prefetch_reads.discard(task)
+        if not task.cancelled():
+            # Tránh cảnh báo "exception was never retrieved" khi mọi caller đã bị cancel
+            task.exception()
+
+    async def _read_from_disk(self, segment_id, prefetch=False):
+        # Giả lập độ trễ: không chiếm thread
+        await asyncio.sleep(self.disk_latency)
+
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(self.executor, self.origin.read, segment_id)
+        except FileNotFoundError:
+            return None
+
+        if not prefetch:
+            self.stats['disk_reads'] += 1
+            self.stats['bytes_disk'] += len(data)
+        if self.cache:
+            self.cache.put(segment_id, data)
+        return data
+
+    def _trigger_prefetch(self, current_id, session, segment_size):
+        if session is None:
+            # Mặc định mỗi task viewer là một session
+            session = id(asyncio.current_task())
+        targets, _ = self.readahead.on_access(session, current_id, segment_size, self.cache)
+        for next_id in targets:
+            if next_id in self._prefetch_tasks or next_id in self._inflight:
+                continue
+            if len(self._prefetch_tasks) >= self.max_prefetch_tasks:
+                self.stats['prefetch_skipped'] += 1
+                self.readahead.forget(session, next_id)   # gửi lại ở lần access sau
+                continue
+            self.stats['prefetch_issued'] += 1
+            task = asyncio.create_task(self._prefetch_task(next_id))
+            self._prefetch_tasks[next_id] = task
+            task.add_done_callback(lambda t, k=next_id: self._prefetch_tasks.pop(k, None))
+
+    async def _prefetch_task(self, segment_id):
+        if self.cache and not self.cache.get(segment_id):
+            try:
+                await self._fetch(segment_id, prefetch=True)
+            except Exception:
+                pass  # Prefetch lỗi thì bỏ qua
+
+    def get_metrics(self, interval=False):
+        lat = self.latency.interval_snapshot() if interval else self.latency.snapshot()
+        if not lat['count']: return {}
+
+        return {
+            'avg_latency': lat['avg'],
+            'p50_latency': lat['p50'],
+            'p90_latency': lat['p90'],
+            'p95_latency': lat['p95'],
+            'p99_latency': lat['p99'],
+            'p999_latency': lat['p999'],
+            'max_latency': lat['max'],
+            'bytes_disk': self.stats['bytes_disk'] / (1024*1024),
+            'bytes_cache': self.stats['bytes_cache'] / (1024*1024),
+            'coalesced_requests': self.stats['coalesced'],
+            'hit_ratio': 1.0 - (self.stats['disk_reads'] / self.stats['requests']) if self.stats['requests'] > 0 else 0,
+            'prefetch': {
+                'issued': self.stats['prefetch_issued'],
+                'skipped': self.stats['prefetch_skipped']
+            } if self.prefetch_enabled else {}
+        }
+
+    async def close(self):
+        """Hủy các prefetch đang chạy, chờ các lần đọc origin dở dang rồi dừng executor"""
+        for task in list(self._prefetch_tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._prefetch_tasks.values(), return_exceptions=True)
+        await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        self.executor.shutdown(wait=True)
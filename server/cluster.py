@@ -0,0 +1,432 @@
+import time
+import queue
+import socket
+import struct
+import threading
+import socketserver
+from .hash_ring import HashRing
+from .latency_histogram import LatencyHistogram
+from .single_flight import SingleFlight
+from .origin import FileOrigin
+from .http_server import _send_views
+
+# Request: độ dài key + key (utf-8). Response: có dữ liệu, cờ, độ dài + payload thô
+_REQUEST = struct.Struct("<H")
+_RESPONSE = struct.Struct("<BBI")
+FLAG_OWNER_HIT = 1      # owner phục vụ từ cache, không cần đọc origin
+FLAG_HOT = 2            # key đang hot: bên gọi nên giữ 1 bản sao
+FLAG_ERROR = 4          # owner lỗi khi phục vụ (vd đọc origin lỗi): bên gọi không đọc lại
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    pos = 0
+    while pos < n:
+        got = sock.recv_into(view[pos:])
+        if not got:
+            raise ConnectionError("peer đóng kết nối")
+        pos += got
+    return buf
+
+
+class _PeerClient:
+    """Kết nối TCP tới 1 peer, giữ pool socket rảnh để dùng lại (1 request / socket tại 1 thời điểm)"""
+
+    def __init__(self, address, timeout):
+        host, port = address.rsplit(":", 1)
+        self.addr = (host, int(port))
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+
+    def _connect(self):
+        sock = socket.create_connection(self.addr, timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def fetch(self, segment_id):
+        """-> (data hoặc None, cờ). Raise OSError nếu peer lỗi"""
+        try:
+            sock = self.idle.get_nowait()
+        except queue.Empty:
+            return self._request(self._connect(), segment_id)
+        try:
+            return self._request(sock, segment_id)
+        except ConnectionError:
+            pass
+        # Socket rảnh có thể đã bị peer đóng (restart / đóng kết nối rảnh): thử lại 1 lần trên kết nối mới
+        return self._request(self._connect(), segment_id)
+
+    def _request(self, sock, segment_id):
+        try:
+            key = segment_id.encode()
+            sock.sendall(_REQUEST.pack(len(key)) + key)
+            found, flags, length = _RESPONSE.unpack(_recv_exact(sock, _RESPONSE.size))
+            data = bytes(_recv_exact(sock, length)) if found else None
+        except BaseException:
+            sock.close()
+            raise
+        self.idle.put(sock)
+        return data, flags
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class _RPCHandler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        node = self.server.node
+        sock = self.request
+        while True:
+            try:
+                (n,) = _REQUEST.unpack(_recv_exact(sock, _REQUEST.size))
+                segment_id = _recv_exact(sock, n).decode()
+            except (ConnectionError, OSError):
+                return
+            try:
+                data, flags = node._serve_peer(segment_id)
+            except Exception:
+                # Lỗi của owner không được làm chết thread RPC: báo cờ lỗi cho bên gọi
+                node._count('serve_errors')
+                data, flags = None, FLAG_ERROR
+            header = _RESPONSE.pack(data is not None, flags, len(data) if data is not None else 0)
+            try:
+                # header + payload bằng sendmsg, không ghép buffer
+                _send_views(sock, [memoryview(header)] if data is None else [memoryview(header), memoryview(data)])
+            except OSError:
+                return
+
+
+class _RPCServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ClusterNode:
+    def __init__(self, data_dir, cache=None, host="127.0.0.1", port=0, disk_latency=0.05,
+                 origin=None, vnodes=160, replica_cache=None, hot_threshold=0, hot_window=10.0,
+                 rpc_timeout=2.0):
+        """
+        1 node trong cluster cache peer-to-peer:
+        - Mỗi segment có 1 owner theo HashRing(vnodes) trên địa chỉ các node ('host:port')
+        - Key của mình: cache -> miss thì đọc origin (SingleFlight: mỗi lúc chỉ 1 lần đọc /key,
+          kể cả khi nhiều peer cùng hỏi) rồi put vào cache
+        - Key của node khác: replica_cache -> hỏi owner qua TCP (RPC nhị phân nhỏ, giữ kết nối);
+          các request trùng key trên node này cũng gộp lại 1 RPC. Owner lỗi/không kết nối được
+          -> tự đọc origin (không cache).
+        - hot_threshold > 0: owner đếm request mỗi key theo cửa sổ hot_window giây, key có
+          >= hot_threshold request trong cửa sổ hiện tại/trước đó là hot -> node gọi giữ bản
+          sao trong replica_cache (nên cache nhỏ, vd LRU vài chục MB)
+        cache / replica_cache phải thread-safe (RPC server mỗi kết nối 1 thread).
+        start() rồi set_peers(địa chỉ mọi node, gồm cả node này).
+        """
+        self.data_dir = data_dir
+        self.origin = origin or FileOrigin(data_dir)
+        self.cache = cache
+        self.replica_cache = replica_cache
+        self.disk_latency = disk_latency
+        self.hot_threshold = hot_threshold
+        self.hot_window = hot_window
+        self.rpc_timeout = rpc_timeout
+
+        self.ring = HashRing(vnodes=vnodes)
+        self.peers = {}             # địa chỉ -> _PeerClient
+        self.flight = SingleFlight()        # đọc origin (owner)
+        self.peer_flight = SingleFlight()   # RPC tới owner
+
+        # Đếm request theo cửa sổ cho hot key (owner)
+        self._window_start = time.time()
+        self._counts = {}
+        self._prev_counts = {}
+
+        self.stats = {
+            'requests': 0,
+            'local_hits': 0,        # key của mình, có trong cache
+            'replica_hits': 0,      # key của node khác, có bản sao hot
+            'forwarded': 0,         # hỏi owner
+            'peer_hits': 0,         # owner trả về không cần đọc origin
+            'peer_errors': 0,
+            'replicated': 0,
+            'origin_reads': 0,      # lần đọc origin thật của node này (cả cho peer)
+            'origin_for_peers': 0,
+            'origin_caused': 0,     # request của node này dẫn tới 1 lần đọc origin (ở đâu cũng tính)
+            'served_for_peers': 0,
+            'serve_errors': 0,      # owner lỗi khi phục vụ peer (trả FLAG_ERROR)
+            'owner_errors': 0,      # owner trả FLAG_ERROR cho request của node này
+            'not_found': 0,         # segment không tồn tại ở origin (không có lần đọc nào)
+            'coalesced': 0
+        }
+        self.lock = threading.Lock()
+        self.latency = LatencyHistogram()
+
+        self._server = _RPCServer((host, port), _RPCHandler)
+        self._server.node = self
+        self._thread = None
+
+    @property
+    def address(self):
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name=f"cluster-rpc-{self.address}")
+        self._thread.start()
+        return self
+
+    def set_peers(self, addresses):
+        """Đặt danh sách node của cluster (gồm cả node này); thêm/bớt node chỉ chuyển ~1/N key"""
+        addresses = list(addresses)
+        with self.lock:
+            for addr in self.ring.nodes:
+                if addr not in addresses:
+                    self.ring.remove_node(addr)
+                    client = self.peers.pop(addr, None)
+                    if client:
+                        client.close()
+            for addr in addresses:
+                self.ring.add_node(addr)
+                if addr != self.address and addr not in self.peers:
+                    self.peers[addr] = _PeerClient(addr, self.rpc_timeout)
+
+    def owner(self, segment_id):
+        with self.lock:
+            return self.ring.get_node(segment_id)
+
+    def _count(self, key, value=1):
+        with self.lock:
+            self.stats[key] += value
+
+    # --- Phục vụ ---
+
+    def get_segment(self, segment_id, session=None, as_view=False):
+        start_t = time.time()
+        self._count('requests')
+        owner = self.owner(segment_id)
+        if owner is None or owner == self.address:
+            data, hit = self._get_owned(segment_id)
+            # data None + không hit: origin không có segment, không có lần đọc nào
+            self._count('local_hits' if hit else 'origin_caused' if data is not None else 'not_found')
+        else:
+            data = self._get_remote(segment_id, owner)
+        self.latency.record((time.time() - start_t) * 1000)
+        if as_view and data is not None and not isinstance(data, memoryview):
+            return memoryview(data)
+        return data
+
+    def get_range_views(self, segment_id, offset, length):
+        """Range: lấy cả segment (cache / owner) rồi cắt view"""
+        data = self.get_segment(segment_id, as_view=True)
+        if data is None:
+            return None
+        return [data[offset:offset + length]]
+
+    def segment_size(self, segment_id):
+        try:
+            return self.origin.size(segment_id)
+        except (OSError, ValueError):
+            return None
+
+    def _get_owned(self, segment_id):
+        """
+        -> (data, hit). hit = có trong cache. Request gộp chung lần đọc origin của request
+        khác thì hit=False (tính như 1 lần đọc đĩa, giống MediaServer)
+        """
+        token = self.flight.token()
+        data = self.cache.get(segment_id) if self.cache else None
+        if data is not None:
+            return data, True
+        (data, hit), shared = self.flight.do(segment_id, lambda: self._load_owned(segment_id, token))
+        if shared:
+            self._count('coalesced')
+        return data, hit
+
+    def _load_owned(self, segment_id, token):
+        """Chạy trong flight: flight khác của key vừa xong sau lần miss -> xem lại cache trước khi đọc origin"""
+        if self.cache and self.flight.finished_since(segment_id, token):
+            data = self.cache.get(segment_id)
+            if data is not None:
+                return data, True
+        return self._read_origin(segment_id, cache=True), False
+
+    def _get_remote(self, segment_id, owner):
+        if self.replica_cache is not None:
+            data = self.replica_cache.get(segment_id)
+            if data is not None:
+                self._count('replica_hits')
+                return data
+        (data, flags), shared = self.peer_flight.do(segment_id,
+                                                    lambda: self._forward(segment_id, owner))
+        if shared:
+            self._count('coalesced')
+        return data
+
+    def _forward(self, segment_id, owner):
+        with self.lock:
+            client = self.peers.get(owner)
+            self.stats['forwarded'] += 1
+        try:
+            if client is None:
+                raise ConnectionError(f"không biết peer {owner}")
+            data, flags = client.fetch(segment_id)
+        except OSError:
+            # Owner không trả lời: tự đọc origin, không cache (không phải key của mình)
+            self._count('peer_errors')
+            data = self._read_origin(segment_id, cache=False)
+            self._count('origin_caused' if data is not None else 'not_found')
+            return data, 0
+        with self.lock:
+            if flags & FLAG_ERROR:
+                # Owner đã thử và lỗi: đọc lại ở đây cũng lỗi y như vậy
+                self.stats['owner_errors'] += 1
+            elif flags & FLAG_OWNER_HIT:
+                self.stats['peer_hits'] += 1
+            elif data is not None:
+                self.stats['origin_caused'] += 1
+            else:
+                self.stats['not_found'] += 1
+        if data is not None and flags & FLAG_HOT and self.replica_cache is not None:
+            self.replica_cache.put(segment_id, data)
+            self._count('replicated')
+        return data, flags
+
+    def _serve_peer(self, segment_id):
+        """Handler RPC: peer hỏi 1 key mà node này là owner"""
+        self._count('served_for_peers')
+        data, hit = self._get_owned(segment_id)
+        if not hit and data is not None:
+            self._count('origin_for_peers')
+        flags = FLAG_OWNER_HIT if hit else 0
+        if data is not None and self._is_hot(segment_id):
+            flags |= FLAG_HOT
+        return data, flags
+
+    def _is_hot(self, segment_id):
+        if not self.hot_threshold:
+            return False
+        now = time.time()
+        with self.lock:
+            if now - self._window_start >= self.hot_window:
+                self._prev_counts, self._counts = self._counts, {}
+                self._window_start = now
+            count = self._counts.get(segment_id, 0) + 1
+            self._counts[segment_id] = count
+            return max(count, self._prev_counts.get(segment_id, 0)) >= self.hot_threshold
+
+    def _read_origin(self, segment_id, cache):
+        time.sleep(self.disk_latency)
+        try:
+            data = self.origin.read(segment_id)
+        except FileNotFoundError:
+            return None
+        self._count('origin_reads')
+        if cache and self.cache:
+            self.cache.put(segment_id, data)
+        return data
+
+    def get_metrics(self, interval=False):
+        lat = self.latency.interval_snapshot() if interval else self.latency.snapshot()
+        with self.lock:
+            s = dict(self.stats)
+        req = s['requests']
+        metrics = {
+            'node': self.address,
+            'requests': req,
+            'hit_ratio': (s['local_hits'] + s['replica_hits']) / req if req else 0,
+            'peer_hit_ratio': s['peer_hits'] / s['forwarded'] if s['forwarded'] else 0,
+            # Tỉ lệ request của node này không dẫn tới lần đọc origin nào (ở node nào cũng vậy)
+            'origin_offload': 1 - s['origin_caused'] / req if req else 0,
+            'stats': s
+        }
+        if lat['count']:
+            metrics.update({
+                'avg_latency': lat['avg'],
+                'p50_latency': lat['p50'],
+                'p99_latency': lat['p99'],
+                'max_latency': lat['max']
+            })
+        return metrics
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+        with self.lock:
+            for client in self.peers.values():
+                client.close()
+
+
+def default_cache_factory(capacity_mb):
+    from cache.lru_cache import LRUCache
+    from cache.thread_safe_wrapper import ThreadSafeCache
+    return ThreadSafeCache(LRUCache(capacity_mb))
+
+
+class LocalCluster:
+    def __init__(self, data_dir, num_nodes=3, cache_mb=100, replica_mb=0, peering=True,
+                 cache_factory=default_cache_factory, **node_kwargs):
+        """
+        num_nodes ClusterNode trên loopback trong process hiện tại (test / benchmark).
+        Mỗi node cache cache_mb; replica_mb > 0 thì thêm replica_cache cho hot key
+        (cần hot_threshold trong node_kwargs). peering=False: các node chạy độc lập (so sánh).
+        """
+        self.data_dir = data_dir
+        self.cache_mb = cache_mb
+        self.replica_mb = replica_mb
+        self.cache_factory = cache_factory
+        self.peering = peering
+        self.node_kwargs = node_kwargs
+        self.nodes = []
+        for _ in range(num_nodes):
+            self.add_node()
+
+    def _wire(self):
+        addresses = [n.address for n in self.nodes]
+        for n in self.nodes:
+            n.set_peers(addresses if self.peering else [n.address])
+
+    def add_node(self):
+        replica = self.cache_factory(self.replica_mb) if self.replica_mb else None
+        node = ClusterNode(self.data_dir, cache=self.cache_factory(self.cache_mb),
+                           replica_cache=replica, **self.node_kwargs).start()
+        self.nodes.append(node)
+        self._wire()
+        return node
+
+    def remove_node(self, node):
+        self.nodes.remove(node)
+        self._wire()
+        node.close()
+
+    def get_metrics(self):
+        per_node = [n.get_metrics() for n in self.nodes]
+        req = sum(m['stats']['requests'] for m in per_node)
+        forwarded = sum(m['stats']['forwarded'] for m in per_node)
+        origin = sum(m['stats']['origin_reads'] for m in per_node)
+        return {
+            'requests': req,
+            'origin_reads': origin,
+            'origin_offload': 1 - origin / req if req else 0,
+            'peer_hit_ratio': sum(m['stats']['peer_hits'] for m in per_node) / forwarded if forwarded else 0,
+            'forwarded_ratio': forwarded / req if req else 0,
+            'nodes': per_node
+        }
+
+    def close(self):
+        for n in self.nodes:
+            n.close()
+        self.nodes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
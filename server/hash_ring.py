@@ -0,0 +1,63 @@
+import hashlib
+from bisect import bisect, insort
+
+
+def _hash64(data):
+    """Hash 64 bit ổn định giữa các process (hash() của Python bị random hóa theo process)"""
+    if isinstance(data, str):
+        data = data.encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class HashRing:
+    def __init__(self, nodes=(), vnodes=160):
+        """
+        Consistent hashing với virtual node: mỗi node có vnodes điểm trên vòng 64 bit,
+        key thuộc node của điểm đầu tiên theo chiều kim đồng hồ.
+        Thêm/bớt 1 node trong N node chỉ chuyển ~1/N key; nhiều vnode -> tải đều hơn.
+        node: giá trị bất kỳ có str() ổn định (vd index worker, 'host:port').
+        """
+        self.vnodes = vnodes
+        self.points = []    # vị trí điểm (đã sắp xếp)
+        self.owners = {}    # vị trí -> node
+        self._nodes = []
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self):
+        return list(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, node):
+        return node in self._nodes
+
+    def add_node(self, node):
+        if node in self._nodes:
+            return
+        self._nodes.append(node)
+        for i in range(self.vnodes):
+            point = _hash64(f"{node}#{i}")
+            # Trùng điểm (rất hiếm) thì giữ node cũ
+            if point not in self.owners:
+                self.owners[point] = node
+                insort(self.points, point)
+
+    def remove_node(self, node):
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        for i in range(self.vnodes):
+            point = _hash64(f"{node}#{i}")
+            if self.owners.get(point) == node:
+                del self.owners[point]
+        self.points = [p for p in self.points if p in self.owners]
+
+    def get_node(self, key):
+        """Node sở hữu key, None nếu vòng rỗng"""
+        if not self.points:
+            return None
+        i = bisect(self.points, _hash64(key))
+        return self.owners[self.points[i % len(self.points)]]
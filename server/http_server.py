@@ -0,0 +1,227 @@
+import json
+import time
+import socket
+import argparse
+import mimetypes
+import threading
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SEGMENT_PREFIX = "/segments/"
+
+
+def parse_range(header, size):
+    """
+    'bytes=a-b' / 'bytes=a-' / 'bytes=-n' -> (start, end) với end không bao gồm.
+    Trả về None nếu không có / không hiểu được header (phục vụ cả file),
+    raise ValueError nếu range không thỏa mãn được (416).
+    Nhiều range ('bytes=0-1,5-6') không hỗ trợ -> phục vụ cả file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header[6:].strip().partition("-")
+    if not sep or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None   # header sai cú pháp: RFC 7233 cho phép bỏ qua
+    if first == "":
+        if not last or int(last) == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - int(last)), size
+    start = int(first)
+    end = int(last) + 1 if last else size
+    if start >= size or end <= start:
+        raise ValueError("unsatisfiable range")
+    return start, min(end, size)
+
+
+def _send_views(sock, views):
+    """Gửi list memoryview bằng sendmsg (scatter-gather, không ghép buffer), xử lý gửi thiếu"""
+    views = [v for v in views if len(v)]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if sent:
+            views[0] = views[0][sent:]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1: giữ kết nối (keep-alive) cho tới khi client đóng
+    protocol_version = "HTTP/1.1"
+    server_version = "MediaCache/1.0"
+
+    def setup(self):
+        super().setup()
+        # Response nhỏ (thumbnail) không bị Nagle giữ lại
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = json.dumps(self.server.media.get_metrics()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self._serve(head=False)
+
+    def _segment_id(self):
+        if not self.path.startswith(SEGMENT_PREFIX):
+            return None
+        seg = unquote(self.path[len(SEGMENT_PREFIX):].split("?", 1)[0])
+        # Không cho thoát ra ngoài thư mục data
+        if not seg or seg.startswith("/") or ".." in seg.split("/"):
+            return None
+        return seg
+
+    def _serve(self, head):
+        seg = self._segment_id()
+        media = self.server.media
+        try:
+            size = media.segment_size(seg) if seg else None
+        except (OSError, ValueError):
+            size = None     # vd tên có byte null, quá dài
+        if size is None:
+            self.send_error(404)
+            return
+        try:
+            rng = parse_range(self.headers.get("Range"), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = rng if rng else (0, size)
+        # Lấy payload trước khi gửi header: lỗi vẫn trả được 404/500 thay vì body cụt
+        f = payload = None
+        if not head:
+            try:
+                if media.cache is None and hasattr(media.origin, "path"):
+                    f = open(media.origin.path(seg), "rb")
+                    payload = f
+                elif rng:
+                    payload = media.get_range_views(seg, start, end - start)
+                else:
+                    payload = media.get_segment(seg, as_view=True)
+            except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+                payload = None
+            except Exception:
+                self.send_error(500)
+                return
+            if payload is None:
+                self.send_error(404)
+                return
+
+        try:
+            self.send_response(206 if rng else 200)
+            self.send_header("Content-Type", mimetypes.guess_type(seg)[0] or "application/octet-stream")
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(end - start))
+            if rng:
+                self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+            self.end_headers()
+            if head:
+                return
+
+            if f is not None:
+                # Không có cache: kernel copy thẳng page cache -> socket (sendfile), không qua Python
+                t0 = time.time()
+                self.connection.sendfile(f, start, end - start)
+                media.record_passthrough(end - start, (time.time() - t0) * 1000)
+            elif rng:
+                # Range: chunk trong cache gửi thẳng bằng sendmsg, không ghép
+                _send_views(self.connection, payload)
+            else:
+                # Cả segment: memoryview trỏ vào buffer trong cache, sendall không copy ra bytes mới
+                self.connection.sendall(payload)
+        finally:
+            if f is not None:
+                f.close()
+
+
+class MediaHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, media, host="127.0.0.1", port=0, verbose=False):
+        """
+        Front-end HTTP/1.1 cho MediaServer (loopback mặc định):
+        - GET/HEAD /segments/<segment_id>: keep-alive, hỗ trợ Range (1 range) -> 206
+        - GET /metrics: media.get_metrics() dạng JSON
+        Mỗi kết nối 1 thread. port=0: tự chọn cổng trống (xem .port / .url).
+        """
+        self.media = media
+        self.verbose = verbose
+        self._thread = None
+        super().__init__((host, port), _Handler)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.port}"
+
+    def start(self):
+        """Chạy serve_forever trong thread nền"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    # python3 -m server.http_server --data data --port 8080
+    from server.media_server import MediaServer
+    from server.origin import MmapOrigin
+    from cache.lru_cache import LRUCache
+    from cache.thread_safe_wrapper import ThreadSafeCache
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cache-mb", type=int, default=100, help="0 = không cache, phục vụ bằng sendfile")
+    parser.add_argument("--disk-latency", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=0, help="> 0: pre-fork N worker, cache chia theo consistent hash")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if args.workers:
+        from server.prefork_server import PreforkMediaServer
+        media = PreforkMediaServer(args.data, num_workers=args.workers, cache_mb=args.cache_mb,
+                                   disk_latency=args.disk_latency)
+    else:
+        cache = ThreadSafeCache(LRUCache(args.cache_mb)) if args.cache_mb else None
+        media = MediaServer(args.data, cache=cache, disk_latency=args.disk_latency, origin=MmapOrigin(args.data))
+    server = MediaHTTPServer(media, args.host, args.port, verbose=args.verbose)
+    print(f"🚀 Serving '{args.data}' tại {server.url}{SEGMENT_PREFIX}<segment_id>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        media.close()
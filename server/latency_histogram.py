@@ -0,0 +1,162 @@
+import weakref
+import threading
+
+# Số buffer tối thiểu trước khi gộp buffer của thread đã chết ngay lúc đăng ký thread mới
+FOLD_THRESHOLD = 64
+
+# Độ chính xác: 2^SUB_BITS sub-bucket mỗi "bậc" -> sai số tương đối < 1/64 (~1.6%)
+SUB_BITS = 7
+LINEAR_MAX = 1 << SUB_BITS
+MAX_VALUE_US = 3600 * 1000 * 1000  # 1 giờ, giá trị lớn hơn bị kẹp lại
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def _bucket_index(v):
+    """Giá trị (µs, int) -> bucket. Dưới 128µs thì tuyến tính, trên đó chia theo log2"""
+    if v < LINEAR_MAX:
+        return v
+    shift = v.bit_length() - SUB_BITS
+    return (shift << (SUB_BITS - 1)) + (v >> shift)
+
+
+def _bucket_value(idx):
+    """Giá trị đại diện (điểm giữa) của bucket, đơn vị µs"""
+    if idx < LINEAR_MAX:
+        return idx
+    shift = (idx >> (SUB_BITS - 1)) - 1
+    lower = (idx - (shift << (SUB_BITS - 1))) << shift
+    return lower + (1 << shift) / 2
+
+
+NUM_BUCKETS = _bucket_index(MAX_VALUE_US) + 1
+
+
+class _ThreadBuffer:
+    __slots__ = ("thread", "counts", "total", "max")
+
+    def __init__(self, thread):
+        self.thread = weakref.ref(thread)   # không giữ Thread đã chết sống theo buffer
+        self.counts = [0] * NUM_BUCKETS
+        self.total = 0.0   # tổng latency (ms) để tính avg
+        self.max = 0.0
+
+
+class LatencyHistogram:
+    def __init__(self):
+        """
+        Histogram latency dạng log-bucket (kiểu HDR): record O(1), bộ nhớ cố định.
+        Mỗi thread ghi vào buffer riêng (không cần lock trên hot path),
+        chỉ khi đọc số liệu mới gộp các buffer lại. Buffer của thread đã chết được gộp
+        vào retired khi đọc, hoặc khi số buffer vượt ngưỡng lúc có thread mới (server
+        1 thread / kết nối không bị phình bộ nhớ giữa 2 lần scrape).
+        """
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._buffers = []
+        self._fold_at = FOLD_THRESHOLD
+
+        # Số liệu của các thread đã kết thúc được gộp vào đây
+        self._retired_counts = [0] * NUM_BUCKETS
+        self._retired_total = 0.0
+        self._retired_max = 0.0
+
+        # Mốc của lần interval_snapshot() trước (reset-on-read)
+        self._base_counts = [0] * NUM_BUCKETS
+        self._base_total = 0.0
+
+    def _buffer(self):
+        buf = getattr(self._local, 'buf', None)
+        if buf is None:
+            buf = _ThreadBuffer(threading.current_thread())
+            self._local.buf = buf
+            with self._lock:
+                self._buffers.append(buf)
+                if len(self._buffers) > self._fold_at:
+                    self._fold_dead()
+                    self._fold_at = max(FOLD_THRESHOLD, 2 * len(self._buffers))
+        return buf
+
+    def record(self, latency_ms, count=1):
+        """Ghi count lần cùng 1 latency (count > 1: vd gộp các hit có latency hằng)"""
+        buf = self._buffer()
+        v = int(latency_ms * 1000)
+        if v < 0: v = 0
+        elif v > MAX_VALUE_US: v = MAX_VALUE_US
+        buf.counts[_bucket_index(v)] += count
+        buf.total += latency_ms * count
+        if latency_ms > buf.max:
+            buf.max = latency_ms
+
+    def _fold_dead(self):
+        """Chuyển buffer của các thread đã chết sang retired. Gọi khi đang giữ self._lock"""
+        alive = []
+        for buf in self._buffers:
+            thread = buf.thread()
+            if thread is not None and thread.is_alive():
+                alive.append(buf)
+            else:
+                # Thread đã chết: chuyển số liệu sang retired để không giữ buffer mãi
+                rc = self._retired_counts
+                for i, c in enumerate(buf.counts):
+                    if c: rc[i] += c
+                self._retired_total += buf.total
+                self._retired_max = max(self._retired_max, buf.max)
+        self._buffers = alive
+
+    def _collect(self):
+        """Gộp tất cả buffer -> (counts, total, max). Gọi khi đang giữ self._lock"""
+        self._fold_dead()
+        alive = self._buffers
+        counts = list(self._retired_counts)
+        total = self._retired_total
+        mx = self._retired_max
+        for buf in alive:
+            for i, c in enumerate(buf.counts):
+                if c: counts[i] += c
+            total += buf.total
+            mx = max(mx, buf.max)
+        return counts, total, mx
+
+    @staticmethod
+    def _summarize(counts, total, mx):
+        n = sum(counts)
+        if n == 0:
+            return {'count': 0}
+
+        result = {'count': n, 'avg': total / n, 'max': mx}
+        targets = [(p, max(1, -(-p * n // 100))) for p in PERCENTILES]
+        seen = 0
+        t = 0
+        for idx, c in enumerate(counts):
+            if not c: continue
+            seen += c
+            while t < len(targets) and seen >= targets[t][1]:
+                # Không vượt quá max thực tế (bucket cuối có thể rộng)
+                result[f"p{targets[t][0]:g}".replace('.', '')] = min(_bucket_value(idx) / 1000, mx)
+                t += 1
+            if t == len(targets): break
+        return result
+
+    def snapshot(self):
+        """Thống kê tích lũy từ lúc khởi tạo: count, avg, p50, p90, p95, p99, p999, max (ms)"""
+        with self._lock:
+            counts, total, mx = self._collect()
+        return self._summarize(counts, total, mx)
+
+    def interval_snapshot(self):
+        """Thống kê từ lần gọi interval_snapshot() trước (dùng cho scrape định kỳ)"""
+        with self._lock:
+            counts, total, total_max = self._collect()
+            delta = [c - b for c, b in zip(counts, self._base_counts)]
+            delta_total = total - self._base_total
+            self._base_counts = counts
+            self._base_total = total
+
+        # Max của interval lấy theo bucket cao nhất có dữ liệu
+        mx = 0.0
+        for idx in range(NUM_BUCKETS - 1, -1, -1):
+            if delta[idx]:
+                mx = min(_bucket_value(idx) / 1000, total_max)
+                break
+        return self._summarize(delta, delta_total, mx)
@@ -1,12 +1,33 @@
-import os
 import time
 import threading
-import numpy as np
+from collections import OrderedDict
+from .latency_histogram import LatencyHistogram
+from .single_flight import SingleFlight
+from .prefetcher import Prefetcher
+from .readahead import Readahead
+from .origin import FileOrigin
+
+# Số key prefetch "chưa dùng" tối đa được theo dõi (để tính useful/wasted)
+MAX_TRACKED_PREFETCHES = 4096
+# Tag của flight do prefetch chạy: request chính chờ theo nó vẫn tính là miss
+PREFETCH_FLIGHT = "prefetch"
+# Số segment tối đa được nhớ kích thước (cho range request), LRU
+MAX_TRACKED_SIZES = 4096
 
 class MediaServer:
-    def __init__(self, data_dir, cache=None, disk_latency=0.05, prefetch_enabled=False):
+    def __init__(self, data_dir, cache=None, disk_latency=0.05, prefetch_enabled=False,
+                 prefetch_workers=4, prefetch_queue=64, readahead_max=16,
+                 readahead_budget_mb=8, origin=None, chunk_kb=64):
+        """
+        origin: nơi đọc segment khi miss. Mặc định FileOrigin (bytes),
+        dùng MmapOrigin để lưu/trả memoryview không copy.
+        chunk_kb: kích thước chunk cho get_range (cache theo key (segment_id, chunk_idx))
+        """
         self.data_dir = data_dir
+        self.origin = origin or FileOrigin(data_dir)
         self.cache = cache
+        self.chunk_size = chunk_kb * 1024
+        self._sizes = OrderedDict()  # segment_id -> kích thước file (cho range request), LRU
         self.disk_latency = disk_latency
         self.prefetch_enabled = prefetch_enabled
         
@@ -16,12 +37,35 @@ class MediaServer:
             'disk_reads': 0,
             'bytes_disk': 0,
             'bytes_cache': 0,
-            'latencies': []
+            'coalesced': 0,
+            'range_requests': 0,
+            'prefetch_useful': 0,
+            'prefetch_wasted': 0
         }
+        # Histogram latency bộ nhớ cố định, ghi theo buffer từng thread (không cần lock)
+        self.latency = LatencyHistogram()
         # Thêm Lock để an toàn khi chạy đa luồng (Task 17.6)
         self.lock = threading.Lock()
+        # Gộp các miss trùng key: mỗi segment chỉ đọc origin 1 lần tại một thời điểm
+        self.flight = SingleFlight()
+
+        # Pool prefetch cố định (Task 17.5)
+        self.prefetcher = None
+        self.readahead = None
+        self._prefetched = OrderedDict()  # key đã prefetch vào cache nhưng chưa được request
+        if prefetch_enabled:
+            self.prefetcher = Prefetcher(self._prefetch_task, num_workers=prefetch_workers,
+                                         max_queue=prefetch_queue, on_drop=self._prefetch_dropped)
+            # Window đọc trước thích nghi theo từng session
+            self.readahead = Readahead(max_window=readahead_max,
+                                       session_budget_bytes=readahead_budget_mb * 1024 * 1024)
 
-    def get_segment(self, segment_id):
+    def get_segment(self, segment_id, session=None, as_view=False):
+        """
+        session: định danh viewer (client/session) cho readahead.
+        Mặc định mỗi client thread được coi là một session.
+        as_view: trả về memoryview trỏ thẳng vào buffer trong cache (không copy)
+        """
         with self.lock:
             self.stats['requests'] += 1
         
@@ -29,82 +73,308 @@ class MediaServer:
         data = None
 
         # 1. Check Cache
+        token = self.flight.token()
         if self.cache:
             data = self.cache.get(segment_id)
             if data:
                 with self.lock:
                     self.stats['bytes_cache'] += len(data)
 
-        # 2. Disk Read (Miss)
+        # Prefetch có được dùng không? Hit = useful, miss = đã bị evict trước khi dùng
+        if self.prefetcher:
+            with self.lock:
+                if self._prefetched.pop(segment_id, None):
+                    self.stats['prefetch_useful' if data else 'prefetch_wasted'] += 1
+
+        # 2. Disk Read (Miss) - chỉ request đầu tiên đọc đĩa, các request khác chờ kết quả
         if not data:
-            data = self._read_from_disk(segment_id)
+            data, shared = self.flight.do(segment_id, lambda: self._load(segment_id, token))
+            if shared:
+                with self.lock:
+                    self.stats['coalesced'] += 1
+                    if shared == PREFETCH_FLIGHT and data:
+                        # Chờ lần đọc của prefetch (không được tính): vẫn là 1 miss
+                        self.stats['disk_reads'] += 1
+                        self.stats['bytes_disk'] += len(data)
+                        self._prefetched.pop(segment_id, None)
 
         # 3. Prefetching Logic (Task 17.5)
         if self.prefetch_enabled and data:
-            self._trigger_prefetch(segment_id)
+            self._trigger_prefetch(segment_id, session, len(data))
 
         # 4. Record Latency
         latency = (time.time() - start_t) * 1000 # ms
-        with self.lock:
-            self.stats['latencies'].append(latency)
+        self.latency.record(latency)
         
+        if as_view and data is not None and not isinstance(data, memoryview):
+            return memoryview(data)
         return data
 
-    def _trigger_prefetch(self, current_id):
+    def get_range(self, segment_id, offset, length):
+        """
+        Range request kiểu HTTP (bytes=offset-(offset+length-1)).
+        Trả về memoryview: nếu range nằm gọn trong 1 chunk thì không copy,
+        nếu trải nhiều chunk thì copy đúng 1 lần vào buffer kết quả.
+        Trả về None nếu segment không tồn tại.
+        """
+        views = self.get_range_views(segment_id, offset, length)
+        if views is None:
+            return None
+        if len(views) == 1:
+            return views[0]
+        out = bytearray(sum(len(v) for v in views))
+        pos = 0
+        for v in views:
+            out[pos:pos + len(v)] = v
+            pos += len(v)
+        return memoryview(out)
+
+    def get_range_views(self, segment_id, offset, length):
+        """
+        Như get_range nhưng trả về list memoryview theo từng chunk (scatter-gather,
+        dùng được cho writev/sendmsg mà không cần ghép).
+        Chỉ đọc origin những chunk còn thiếu, các chunk thiếu liền kề gộp thành 1 lần đọc.
+        Raise ValueError nếu offset/length âm.
+        """
+        if offset < 0 or length < 0:
+            raise ValueError(f"negative range: offset={offset}, length={length}")
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['range_requests'] += 1
+        start_t = time.time()
+
+        size = self._segment_size(segment_id)
+        if size is None:
+            self.latency.record((time.time() - start_t) * 1000)
+            return None
+        end = min(offset + length, size)
+        if offset >= end:
+            self.latency.record((time.time() - start_t) * 1000)
+            return [memoryview(b'')]
+
+        C = self.chunk_size
+        first, last = offset // C, (end - 1) // C
+
+        # 1. Lấy các chunk đã có trong cache
+        chunks = {}
+        missing = []
+        cached_bytes = 0
+        for idx in range(first, last + 1):
+            chunk = self.cache.get((segment_id, idx)) if self.cache else None
+            if chunk is not None:
+                chunks[idx] = chunk
+                cached_bytes += len(chunk)
+            else:
+                missing.append(idx)
+        if cached_bytes:
+            with self.lock:
+                self.stats['bytes_cache'] += cached_bytes
+
+        # 2. Gộp các chunk thiếu liền kề thành từng run, mỗi run = 1 lần đọc origin (1 disk_read)
+        runs = []
+        for idx in missing:
+            if runs and runs[-1][1] == idx - 1:
+                runs[-1][1] = idx
+            else:
+                runs.append([idx, idx])
+        for a, b in runs:
+            key = (segment_id, a, b)
+            run, shared = self.flight.do(key, lambda: self._read_chunks(segment_id, a, b, size))
+            if shared:
+                with self.lock:
+                    self.stats['coalesced'] += 1
+            chunks.update(run)
+
+        # 3. Cắt phần cần thiết của chunk đầu/cuối (view, không copy)
+        views = []
+        for idx in range(first, last + 1):
+            v = memoryview(chunks[idx])
+            base = idx * C
+            lo = max(offset, base) - base
+            hi = min(end, base + len(v)) - base
+            views.append(v[lo:hi])
+
+        self.latency.record((time.time() - start_t) * 1000)
+        return views
+
+    def segment_size(self, segment_id):
+        """Kích thước segment (byte) theo origin, None nếu không tồn tại"""
+        return self._segment_size(segment_id)
+
+    def record_passthrough(self, nbytes, latency_ms):
+        """
+        Ghi nhận 1 request được front-end phục vụ thẳng từ origin (vd sendfile khi không có cache),
+        để get_metrics() vẫn tính đủ request / byte đĩa / latency.
+        """
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['disk_reads'] += 1
+            self.stats['bytes_disk'] += nbytes
+        self.latency.record(latency_ms)
+
+    def _segment_size(self, segment_id):
+        with self.lock:
+            size = self._sizes.get(segment_id)
+            if size is not None:
+                self._sizes.move_to_end(segment_id)
+                return size
         try:
-            # Parse: seg_0005.dat -> 5
-            curr_idx = int(current_id.split('_')[1].split('.')[0])
-            next_id = f"seg_{curr_idx + 1:04d}.dat"
-            
-            # Chạy thread ngầm
-            threading.Thread(target=self._prefetch_task, args=(next_id,)).start()
-        except (IndexError, ValueError):
-            pass
+            size = self.origin.size(segment_id)
+        except (OSError, ValueError):
+            return None
+        with self.lock:
+            self._sizes[segment_id] = size
+            if len(self._sizes) > MAX_TRACKED_SIZES:
+                self._sizes.popitem(last=False)
+        return size
+
+    def _read_chunks(self, segment_id, first, last, size):
+        """
+        Đọc chunk [first..last], mỗi chunk 1 lần read_range vào buffer riêng rồi put vào cache:
+        dữ liệu chỉ copy 1 lần (kernel -> buffer của chunk), evict 1 chunk giải phóng đúng chunk đó
+        """
+        time.sleep(self.disk_latency)
+        C = self.chunk_size
+        run = {}
+        nbytes = 0
+        for idx in range(first, last + 1):
+            lo = idx * C
+            run[idx] = self.origin.read_range(segment_id, lo, min(lo + C, size) - lo)
+            nbytes += len(run[idx])
+            if self.cache:
+                self.cache.put((segment_id, idx), run[idx])
+
+        with self.lock:
+            self.stats['disk_reads'] += 1
+            self.stats['bytes_disk'] += nbytes
+        return run
+
+    def _trigger_prefetch(self, current_id, session=None, segment_size=0):
+        if session is None:
+            session = threading.get_ident()
+
+        # seg_0005.dat -> prefetch seg_0006.dat ... seg_(5+window).dat
+        targets, window_ids = self.readahead.on_access(session, current_id, segment_size, self.cache)
+        if not window_ids:
+            return
+
+        # Viewer đã seek thì các job cũ ngoài window không còn ý nghĩa
+        self.prefetcher.cancel(session, keep=set(window_ids))
+        for next_id in targets:
+            self.prefetcher.submit(next_id, tag=session)
+
+    def _prefetch_dropped(self, segment_id, session):
+        # Job bị đẩy khỏi hàng đợi đầy: để readahead gửi lại ở lần access sau
+        self.readahead.forget(session, segment_id)
 
     def _prefetch_task(self, segment_id):
         """Hàm chạy ngầm: Load file vào Cache"""
         # Chỉ prefetch nếu Cache chưa có
+        token = self.flight.token()
         if self.cache and not self.cache.get(segment_id):
-            # Đọc đĩa (bypass thống kê request chính)
-            filepath = os.path.join(self.data_dir, segment_id)
-            if os.path.exists(filepath):
-                # Vẫn sleep để giả lập disk load
-                time.sleep(self.disk_latency) 
-                with open(filepath, 'rb') as f:
-                    data = f.read()
-                if self.cache:
-                    self.cache.put(segment_id, data)
-
-    def _read_from_disk(self, segment_id):
+            if self.origin.exists(segment_id):
+                # Đi chung single-flight với request chính: không bao giờ đọc đĩa 2 lần
+                self.flight.do(segment_id, lambda: self._load(segment_id, token, prefetch=True),
+                               tag=PREFETCH_FLIGHT)
+
+    def _mark_prefetched(self, segment_id):
+        with self.lock:
+            self._prefetched[segment_id] = True
+            if len(self._prefetched) > MAX_TRACKED_PREFETCHES:
+                # Quá lâu không ai request -> coi như lãng phí
+                self._prefetched.popitem(last=False)
+                self.stats['prefetch_wasted'] += 1
+
+    def _load(self, segment_id, token, prefetch=False):
+        """
+        Hàm chạy trong flight. Thread miss ngay trước khi flight trước put vào cache nhưng
+        tới sau khi flight đó kết thúc thì xem lại cache thay vì đọc đĩa lần 2. Chỉ tra lại
+        khi thật sự có flight của key kết thúc sau lần miss (token): get() đếm hit/miss
+        và cập nhật sketch admission nên không gọi thừa
+        """
+        data = None
+        if self.cache and self.flight.finished_since(segment_id, token):
+            data = self.cache.get(segment_id)
+        if data:
+            if not prefetch:
+                with self.lock:
+                    self.stats['bytes_cache'] += len(data)
+            return data
+        return self._read_from_disk(segment_id, prefetch)
+
+    def _read_from_disk(self, segment_id, prefetch=False):
         # Giả lập độ trễ
+        fetch_t = time.time()
         time.sleep(self.disk_latency)
         
-        filepath = os.path.join(self.data_dir, segment_id)
         try:
-            with open(filepath, 'rb') as f:
-                data = f.read()
+            data = self.origin.read(segment_id)
+
+            # Chi phí lấy từ origin cho cache cost-aware (GDSFCache)
+            if self.cache and hasattr(self.cache, 'record_cost'):
+                self.cache.record_cost(segment_id, time.time() - fetch_t)
                 
-            with self.lock:
-                self.stats['disk_reads'] += 1
-                self.stats['bytes_disk'] += len(data)
+            # Prefetch bypass thống kê request chính
+            if not prefetch:
+                size = len(data)
+                with self.lock:
+                    self.stats['disk_reads'] += 1
+                    self.stats['bytes_disk'] += size
                 
             # Put vào cache
             if self.cache: 
                 self.cache.put(segment_id, data)
+            if prefetch:
+                self._mark_prefetched(segment_id)
             return data
         except FileNotFoundError:
             return None
 
-    def get_metrics(self):
+    def get_metrics(self, interval=False):
+        """
+        interval=True: latency chỉ tính từ lần gọi get_metrics(interval=True) trước
+        (reset-on-read, dùng cho scrape định kỳ). Các counter khác luôn là tích lũy.
+        """
+        lat = self.latency.interval_snapshot() if interval else self.latency.snapshot()
+        if not lat['count']: return {}
+
+        # Cache nhiều tầng (HierarchicalCache) báo hit ratio / latency từng tầng
+        cache_stats = self.cache.get_stats() if self.cache else {}
+
         with self.lock:
-            lats = self.stats['latencies']
-            if not lats: return {}
-            
-            return {
-                'avg_latency': np.mean(lats),
-                'p95_latency': np.percentile(lats, 95),
+            metrics = {
+                'avg_latency': lat['avg'],
+                'p50_latency': lat['p50'],
+                'p90_latency': lat['p90'],
+                'p95_latency': lat['p95'],
+                'p99_latency': lat['p99'],
+                'p999_latency': lat['p999'],
+                'max_latency': lat['max'],
                 'bytes_disk': self.stats['bytes_disk'] / (1024*1024),
                 'bytes_cache': self.stats['bytes_cache'] / (1024*1024),
-                'hit_ratio': 1.0 - (self.stats['disk_reads'] / self.stats['requests']) if self.stats['requests'] > 0 else 0
+                'coalesced_requests': self.stats['coalesced'],
+                'hit_ratio': 1.0 - (self.stats['disk_reads'] / self.stats['requests']) if self.stats['requests'] > 0 else 0,
+                'prefetch': self._prefetch_metrics()
             }
+        if 'tiers' in cache_stats:
+            metrics['tiers'] = cache_stats['tiers']
+        return metrics
+
+    def _prefetch_metrics(self):
+        if not self.prefetcher:
+            return {}
+        p = self.prefetcher.get_stats()
+        return {
+            'issued': p['issued'],
+            'useful': self.stats['prefetch_useful'],
+            'wasted': self.stats['prefetch_wasted'],
+            'dropped': p['dropped'],
+            'cancelled': p['cancelled'],
+            'readahead': self.readahead.get_stats()
+        }
+
+    def close(self):
+        """Dừng các worker prefetch"""
+        if self.prefetcher:
+            self.prefetcher.shutdown()
 
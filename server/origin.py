@@ -0,0 +1,94 @@
+import os
+import mmap
+import stat
+import weakref
+import threading
+
+
+class FileOrigin:
+    def __init__(self, data_dir):
+        """Origin mặc định: mỗi lần đọc trả về 1 object bytes mới (f.read())"""
+        self.data_dir = data_dir
+
+    def path(self, segment_id):
+        return os.path.join(self.data_dir, segment_id)
+
+    def exists(self, segment_id):
+        return os.path.exists(self.path(segment_id))
+
+    def size(self, segment_id):
+        """Raise FileNotFoundError nếu không tồn tại hoặc không phải file thường (vd thư mục)"""
+        st = os.stat(self.path(segment_id))
+        if not stat.S_ISREG(st.st_mode):
+            raise FileNotFoundError(segment_id)
+        return st.st_size
+
+    def read(self, segment_id):
+        """Raise FileNotFoundError nếu segment không tồn tại"""
+        with open(self.path(segment_id), 'rb') as f:
+            return f.read()
+
+    def read_range(self, segment_id, offset, length):
+        """Chỉ đọc [offset, offset+length) bằng pread, không đọc cả file"""
+        fd = os.open(self.path(segment_id), os.O_RDONLY)
+        try:
+            return os.pread(fd, length, offset)
+        finally:
+            os.close(fd)
+
+
+class MmapOrigin(FileOrigin):
+    def __init__(self, data_dir, max_fd_maps=256):
+        """
+        Origin zero-copy: memory-map file và trả về memoryview.
+        Dữ liệu nằm trong page cache của kernel (file-backed), không copy vào heap Python.
+        Cắt sub-range bằng view[a:b] cũng không copy.
+        Python < 3.13 (không có trackfd) mỗi mmap giữ 1 fd dup: tối đa max_fd_maps mmap
+        cùng sống, quá thì đọc bằng pread (bytes) để cache nhiều segment không hết fd (EMFILE).
+        """
+        super().__init__(data_dir)
+        self.max_fd_maps = max_fd_maps
+        self._fd_maps = 0           # số mmap đang giữ fd (chỉ khi không có trackfd)
+        self._lock = threading.Lock()
+
+    def read(self, segment_id):
+        with open(self.path(segment_id), 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return memoryview(b'')  # mmap không map được file rỗng
+            if _HAS_TRACKFD:
+                # mmap vẫn sống sau khi đóng file; memoryview giữ tham chiếu tới mmap
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ, trackfd=False))
+            with self._lock:
+                use_map = self._fd_maps < self.max_fd_maps
+                if use_map:
+                    self._fd_maps += 1
+            if not use_map:
+                return memoryview(f.read())
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except OSError:
+                self._release_fd_map()
+                raise
+        # fd dup được đóng khi mmap bị thu hồi (cache evict, hết view)
+        weakref.finalize(mm, self._release_fd_map)
+        return memoryview(mm)
+
+    def _release_fd_map(self):
+        with self._lock:
+            self._fd_maps -= 1
+
+    def read_range(self, segment_id, offset, length):
+        # Range nhỏ: pread đúng phần cần, không map cả file cho mỗi lần đọc
+        return memoryview(super().read_range(segment_id, offset, length))
+
+
+def _has_trackfd():
+    try:
+        mmap.mmap(-1, 1, trackfd=False).close()
+        return True
+    except TypeError:
+        return False
+
+
+_HAS_TRACKFD = _has_trackfd()
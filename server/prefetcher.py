@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+
+
+class Prefetcher:
+    def __init__(self, fetch_fn, num_workers=4, max_queue=64, on_drop=None):
+        """
+        Pool prefetch cố định thay cho việc tạo 1 thread mới mỗi request.
+        - Hàng đợi có giới hạn, khi đầy thì bỏ job cũ nhất (drop-oldest)
+        - Không xếp hàng 2 lần cùng một key (de-dup)
+        - cancel(): hủy các job đang chờ của một viewer khi viewer đó seek đi chỗ khác
+        on_drop(key, tag): gọi khi 1 job bị drop-oldest (ngoài lock), vd để readahead gửi lại sau
+        """
+        self.fetch_fn = fetch_fn
+        self.on_drop = on_drop
+        self.max_queue = max_queue
+        self.pending = OrderedDict()  # key -> tag (viewer yêu cầu), theo thứ tự FIFO
+        self.running = set()
+        self.cond = threading.Condition()
+        self.stopped = False
+
+        self.stats = {
+            'issued': 0,     # đã thực sự chạy fetch_fn
+            'dropped': 0,    # bị đẩy ra khỏi hàng đợi đầy
+            'cancelled': 0,  # bị hủy vì viewer seek
+            'deduped': 0     # submit trùng key đang chờ/đang chạy
+        }
+
+        self.workers = []
+        for i in range(num_workers):
+            t = threading.Thread(target=self._worker, name=f"prefetch-{i}", daemon=True)
+            t.start()
+            self.workers.append(t)
+
+    def submit(self, key, tag=None):
+        dropped = None
+        with self.cond:
+            if self.stopped:
+                return False
+            if key in self.pending or key in self.running:
+                self.stats['deduped'] += 1
+                return False
+            if len(self.pending) >= self.max_queue:
+                dropped = self.pending.popitem(last=False)
+                self.stats['dropped'] += 1
+            self.pending[key] = tag
+            self.cond.notify()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(*dropped)
+        return True
+
+    def cancel(self, tag, keep=()):
+        """Hủy các job đang chờ của tag (trừ các key trong keep). Job đang chạy thì để chạy nốt"""
+        with self.cond:
+            stale = [k for k, t in self.pending.items() if t == tag and k not in keep]
+            for k in stale:
+                del self.pending[k]
+            self.stats['cancelled'] += len(stale)
+            return len(stale)
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.stopped:
+                    self.cond.wait()
+                if self.stopped:
+                    return
+                key, _ = self.pending.popitem(last=False)
+                self.running.add(key)
+                self.stats['issued'] += 1
+            try:
+                self.fetch_fn(key)
+            except Exception:
+                pass  # Prefetch lỗi không được làm chết worker
+            finally:
+                with self.cond:
+                    self.running.discard(key)
+
+    def shutdown(self, wait=True):
+        with self.cond:
+            self.stopped = True
+            self.pending.clear()
+            self.cond.notify_all()
+        if wait:
+            for t in self.workers:
+                t.join()
+
+    def get_stats(self):
+        with self.cond:
+            return dict(self.stats, queued=len(self.pending))
@@ -0,0 +1,392 @@
+import json
+import time
+import queue
+import struct
+import itertools
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor
+from .hash_ring import HashRing
+from .latency_histogram import LatencyHistogram
+from .origin import FileOrigin
+
+# Request: op (G = get, M = metrics, Q = dừng), request id, slot + segment_id (utf-8)
+_REQUEST = struct.Struct("<cII")
+# Response: request id, độ dài (-1 = không tồn tại), inline (1 = payload gửi tiếp qua pipe)
+_RESPONSE = struct.Struct("<IqB")
+
+
+def default_cache_factory(capacity_mb):
+    """Cache riêng của mỗi worker (nhiều thread trong worker dùng chung)"""
+    from cache.lru_cache import LRUCache
+    from cache.thread_safe_wrapper import ThreadSafeCache
+    return ThreadSafeCache(LRUCache(capacity_mb))
+
+
+def _worker_main(conn, shm_name, slot_size, data_dir, cache_factory, cache_mb, threads, media_kwargs):
+    """Vòng lặp worker: nhận request qua pipe, ghi payload vào slot shared memory của request"""
+    from .media_server import MediaServer
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buf = shm.buf
+    media = MediaServer(data_dir, cache=cache_factory(cache_mb), **media_kwargs)
+    send_lock = threading.Lock()
+
+    def reply(rid, data, inline):
+        with send_lock:
+            conn.send_bytes(_RESPONSE.pack(rid, len(data) if data is not None else -1, inline))
+            if inline and data is not None:
+                conn.send_bytes(data)
+
+    def handle_get(rid, slot, segment_id):
+        try:
+            data = media.get_segment(segment_id)
+        except Exception:
+            data = None
+        if data is not None and len(data) <= slot_size:
+            off = slot * slot_size
+            buf[off:off + len(data)] = data      # 1 lần copy vào shared memory, không pickle
+            reply(rid, data, 0)
+        else:
+            # Segment lớn hơn slot: gửi byte thô qua pipe (vẫn không pickle)
+            reply(rid, data, 1)
+
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="prefork-worker")
+    try:
+        while True:
+            try:
+                msg = conn.recv_bytes()
+            except EOFError:
+                break
+            op, rid, slot = _REQUEST.unpack_from(msg)
+            if op == b"Q":
+                break
+            if op == b"M":
+                cache = media.cache
+                report = {"metrics": media.get_metrics(), "stats": dict(media.stats),
+                          "cache": cache.get_stats() if cache else {}}
+                reply(rid, json.dumps(report).encode(), 1)
+            else:
+                pool.submit(handle_get, rid, slot, msg[_REQUEST.size:].decode())
+    finally:
+        pool.shutdown(wait=True)
+        media.close()
+        del buf
+        shm.close()
+        conn.close()
+
+
+class _Call:
+    __slots__ = ("done", "length", "inline_data", "slot", "abandoned")
+
+    def __init__(self, slot):
+        self.done = threading.Event()
+        self.length = -1
+        self.inline_data = None
+        self.slot = slot
+        self.abandoned = False      # hết rpc_timeout: slot chỉ được trả khi worker trả lời muộn
+
+
+class _WorkerHandle:
+    """Phía dispatcher của 1 worker: pipe, vùng slot shared memory, các request đang chờ"""
+
+    def __init__(self, worker_id, ctx, slots, slot_size, target, args, on_exit=None, rpc_timeout=None):
+        self.worker_id = worker_id
+        self.on_exit = on_exit      # gọi (từ thread reader) khi pipe tới worker bị đóng
+        self.rpc_timeout = rpc_timeout
+        self.slot_size = slot_size
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_size)
+        self.free_slots = queue.Queue()
+        for i in range(slots):
+            self.free_slots.put(i)
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=target, args=(child_conn, self.shm.name, slot_size) + args,
+                                   daemon=True, name=f"media-worker-{worker_id}")
+        self.process.start()
+        child_conn.close()
+        self.send_lock = threading.Lock()
+        self.pending = {}           # request id -> _Call
+        self.pending_lock = threading.Lock()
+        self.drained = threading.Condition(self.pending_lock)
+        self.inflight = 0           # get_segment đang dùng slot / shm của handle
+        self.requests = 0
+        self.timeouts = 0
+        self.alive = True
+        self.reader = threading.Thread(target=self._read_loop, daemon=True,
+                                       name=f"media-worker-{worker_id}-reader")
+        self.reader.start()
+
+    def _read_loop(self):
+        while True:
+            try:
+                rid, length, inline = _RESPONSE.unpack(self.conn.recv_bytes())
+                data = self.conn.recv_bytes() if inline and length >= 0 else None
+            except (EOFError, OSError):
+                break
+            with self.pending_lock:
+                call = self.pending.pop(rid, None)
+                if call is not None and call.abandoned:
+                    # Bên gọi đã bỏ cuộc: worker ghi xong slot rồi, giờ mới dùng lại được
+                    if call.slot is not None:
+                        self.free_slots.put(call.slot)
+                    continue
+            if call is not None:
+                call.length = length
+                call.inline_data = data
+                call.done.set()
+        # Worker chết / đã dừng: trả None cho mọi request còn chờ
+        with self.pending_lock:
+            self.alive = False
+            calls, self.pending = list(self.pending.values()), {}
+        for call in calls:
+            call.done.set()
+        if self.on_exit is not None:
+            self.on_exit(self)
+
+    def enter(self):
+        """Đánh dấu 1 request đang dùng slot / shm: stop() chờ hết rồi mới giải phóng shm"""
+        with self.pending_lock:
+            self.inflight += 1
+
+    def exit(self):
+        with self.pending_lock:
+            self.inflight -= 1
+            if not self.inflight:
+                self.drained.notify_all()
+
+    def request(self, op, rid, slot=None, payload=b""):
+        """
+        Gửi request, chờ tối đa rpc_timeout. Hết giờ: call.abandoned = True, length = -1;
+        slot vẫn thuộc về worker (nó có thể còn ghi vào) tới khi reader nhận câu trả lời muộn
+        """
+        rid &= 0xFFFFFFFF
+        call = _Call(slot)
+        with self.pending_lock:
+            if not self.alive:
+                return call         # length = -1
+            self.pending[rid] = call
+        try:
+            with self.send_lock:
+                self.conn.send_bytes(_REQUEST.pack(op, rid, slot or 0) + payload)
+        except (OSError, ValueError):
+            # Worker vừa chết: bỏ request, reader sẽ thấy EOF và báo dispatcher
+            with self.pending_lock:
+                self.pending.pop(rid, None)
+            return call
+        if not call.done.wait(self.rpc_timeout):
+            with self.pending_lock:
+                if rid in self.pending:
+                    call.abandoned = True
+                    self.timeouts += 1
+                    return call
+            call.done.wait()        # reader vừa nhận trả lời, đang điền kết quả
+        return call
+
+    def stop(self, timeout=5.0):
+        try:
+            with self.send_lock:
+                self.conn.send_bytes(_REQUEST.pack(b"Q", 0, 0))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        if self.reader is not threading.current_thread():
+            self.reader.join()
+        # Reader đã trả mọi call đang chờ: các get_segment còn lại chỉ còn copy khỏi slot
+        with self.pending_lock:
+            self.drained.wait_for(lambda: not self.inflight)
+        self.shm.close()
+        self.shm.unlink()
+
+
+class PreforkMediaServer:
+    def __init__(self, data_dir, num_workers=4, cache_mb=100, cache_factory=default_cache_factory,
+                 vnodes=160, slot_kb=256, slots_per_worker=16, worker_threads=8,
+                 mp_context=None, rpc_timeout=5.0, **media_kwargs):
+        """
+        Chế độ pre-fork: num_workers process, mỗi process 1 MediaServer với cache riêng
+        cache_factory(cache_mb / num_workers) (shard rời nhau, cùng tổng RAM với 1 process).
+        - Dispatcher (process hiện tại) chọn worker theo HashRing(vnodes) trên segment_id:
+          mỗi key chỉ được cache ở đúng 1 worker; add_worker/remove_worker chỉ chuyển ~1/N key
+        - Mỗi worker có slots_per_worker slot slot_kb trong shared memory: request mang số slot,
+          worker ghi payload vào slot rồi chỉ trả (id, độ dài) qua pipe. Segment lớn hơn slot
+          gửi byte thô qua pipe. Không pickle payload ở cả hai đường.
+        - get_segment trả về bytes (copy 1 lần khỏi slot để trả slot ngay)
+        - rpc_timeout (giây, None = chờ mãi): worker treo thì request trả None sau rpc_timeout
+          (chờ slot rảnh cũng vậy); slot của request bỏ cuộc chỉ được dùng lại khi worker trả lời
+        - get_metrics: latency end-to-end ở dispatcher + hit ratio tổng, tải/hit ratio từng worker
+        - Worker chết (pipe EOF): request đang chờ trả None, worker bị bỏ khỏi vòng và được
+          thay bằng worker mới (cache rỗng) để phần key của nó không hỏng mãi
+        media_kwargs (disk_latency, origin, chunk_kb, ...) truyền cho MediaServer của worker.
+        Dùng được làm media cho MediaHTTPServer (cache nằm trong worker nên cache/origin = None).
+        """
+        self.data_dir = data_dir
+        self.shard_mb = cache_mb / max(1, num_workers)
+        self.cache_factory = cache_factory
+        self.slot_size = slot_kb * 1024
+        self.slots_per_worker = slots_per_worker
+        self.worker_threads = worker_threads
+        self.rpc_timeout = rpc_timeout
+        self.media_kwargs = media_kwargs
+        self.ctx = mp_context or multiprocessing.get_context()
+        # Front-end HTTP kiểm tra 2 thuộc tính này để chọn đường sendfile: ở đây luôn qua worker
+        self.cache = None
+        self.origin = None
+        self._sizes = FileOrigin(data_dir)
+
+        self.ring = HashRing(vnodes=vnodes)
+        self.workers = {}           # worker id -> _WorkerHandle
+        self._ids = itertools.count()
+        self._rids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.closing = False
+        self.restarts = 0
+        self.latency = LatencyHistogram()
+        for _ in range(num_workers):
+            self.add_worker()
+
+    def add_worker(self):
+        """Thêm 1 worker (shard shard_mb như các worker đầu), trả về id"""
+        worker_id = next(self._ids)
+        args = (self.data_dir, self.cache_factory, self.shard_mb,
+                self.worker_threads, self.media_kwargs)
+        handle = _WorkerHandle(worker_id, self.ctx, self.slots_per_worker, self.slot_size,
+                               _worker_main, args, on_exit=self._on_worker_exit,
+                               rpc_timeout=self.rpc_timeout)
+        with self.lock:
+            self.workers[worker_id] = handle
+            self.ring.add_node(worker_id)
+        return worker_id
+
+    def remove_worker(self, worker_id):
+        """Bỏ worker khỏi vòng trước (request mới sang worker khác) rồi dừng process"""
+        with self.lock:
+            handle = self.workers.pop(worker_id, None)
+            self.ring.remove_node(worker_id)
+        if handle is not None:
+            handle.stop()
+
+    def _on_worker_exit(self, handle):
+        """Reader của handle thấy EOF: nếu không phải do remove_worker/close thì worker đã chết"""
+        with self.lock:
+            if self.closing or self.workers.get(handle.worker_id) is not handle:
+                return
+            del self.workers[handle.worker_id]
+            self.ring.remove_node(handle.worker_id)
+            self.restarts += 1
+        # Dọn + spawn ở thread khác: đang chạy trong thread reader của handle
+        threading.Thread(target=self._replace_worker, args=(handle,), daemon=True).start()
+
+    def _replace_worker(self, handle):
+        handle.stop()
+        with self.lock:
+            if self.closing:
+                return
+        worker_id = self.add_worker()
+        with self.lock:
+            closing = self.closing
+        if closing:
+            self.remove_worker(worker_id)   # close() chạy giữa chừng
+
+    def worker_for(self, segment_id):
+        with self.lock:
+            return self.ring.get_node(segment_id)
+
+    # --- API giống MediaServer ---
+
+    def get_segment(self, segment_id, session=None, as_view=False):
+        start_t = time.time()
+        with self.lock:
+            handle = self.workers.get(self.ring.get_node(segment_id))
+            if handle is not None:
+                handle.requests += 1
+                handle.enter()
+        if handle is None:
+            return None
+        data = None
+        try:
+            slot = handle.free_slots.get(timeout=self.rpc_timeout)
+        except queue.Empty:
+            # Mọi slot đang bị giữ (worker treo)
+            with handle.pending_lock:
+                handle.timeouts += 1
+            slot = None
+        try:
+            if slot is not None:
+                call = handle.request(b"G", next(self._rids), slot, segment_id.encode())
+                if call.length < 0:
+                    pass
+                elif call.inline_data is not None:
+                    data = call.inline_data
+                else:
+                    off = slot * handle.slot_size
+                    data = bytes(handle.shm.buf[off:off + call.length])
+                if not call.abandoned:
+                    handle.free_slots.put(slot)
+        finally:
+            handle.exit()
+        self.latency.record((time.time() - start_t) * 1000)
+        if as_view and data is not None:
+            return memoryview(data)
+        return data
+
+    def get_range_views(self, segment_id, offset, length):
+        """Range: lấy cả segment từ worker sở hữu rồi cắt view"""
+        data = self.get_segment(segment_id, as_view=True)
+        if data is None:
+            return None
+        return [data[offset:offset + length]]
+
+    def segment_size(self, segment_id):
+        try:
+            return self._sizes.size(segment_id)
+        except (OSError, ValueError):
+            return None
+
+    def get_metrics(self, interval=False):
+        lat = self.latency.interval_snapshot() if interval else self.latency.snapshot()
+        if not lat['count']: return {}
+
+        with self.lock:
+            handles = list(self.workers.values())
+        per_worker = []
+        requests = disk_reads = 0
+        total_routed = sum(h.requests for h in handles)
+        for h in handles:
+            call = h.request(b"M", next(self._rids))
+            report = json.loads(call.inline_data) if call.inline_data else {}
+            stats = report.get("stats", {})
+            requests += stats.get("requests", 0)
+            disk_reads += stats.get("disk_reads", 0)
+            per_worker.append({
+                'worker': h.worker_id,
+                'pid': h.process.pid,
+                'requests': h.requests,
+                'timeouts': h.timeouts,
+                'load_share': h.requests / total_routed if total_routed else 0,
+                'hit_ratio': report.get("metrics", {}).get("hit_ratio", 0),
+                'cache_mb': report.get("cache", {}).get("current_size_mb", 0)
+            })
+        return {
+            'avg_latency': lat['avg'],
+            'p50_latency': lat['p50'],
+            'p90_latency': lat['p90'],
+            'p95_latency': lat['p95'],
+            'p99_latency': lat['p99'],
+            'p999_latency': lat['p999'],
+            'max_latency': lat['max'],
+            'hit_ratio': 1.0 - (disk_reads / requests) if requests > 0 else 0,
+            'worker_restarts': self.restarts,
+            'workers': per_worker
+        }
+
+    def close(self):
+        with self.lock:
+            self.closing = True
+            handles = list(self.workers.values())
+            self.workers = {}
+        for h in handles:
+            h.stop()
@@ -0,0 +1,119 @@
+import re
+import threading
+from collections import OrderedDict
+
+# seg_0005.dat -> ("seg_", 5, 4, ".dat"): lấy cụm số cuối cùng trong tên
+_SEGMENT_RE = re.compile(r"^(.*?)(\d+)(\D*)$")
+
+
+def parse_segment_id(segment_id):
+    """Tách segment_id thành (prefix, index, width, suffix). Trả về None nếu không có số"""
+    m = _SEGMENT_RE.match(segment_id)
+    if not m:
+        return None
+    prefix, digits, suffix = m.groups()
+    return prefix, int(digits), len(digits), suffix
+
+
+def format_segment_id(prefix, idx, width, suffix):
+    return f"{prefix}{idx:0{width}d}{suffix}"
+
+
+class _Session:
+    __slots__ = ("stream", "last_idx", "window", "ahead_end")
+
+    def __init__(self, stream, idx, window):
+        self.stream = stream      # (prefix, width, suffix) của video đang xem
+        self.last_idx = idx
+        self.window = window
+        self.ahead_end = idx      # đã gửi prefetch tới index này (không vượt quá cuối window)
+
+
+class Readahead:
+    def __init__(self, min_window=1, max_window=16, session_budget_bytes=8 * 1024 * 1024,
+                 cache_fraction=0.25, max_sessions=4096):
+        """
+        Readahead thích nghi theo từng session (giống Linux readahead):
+        - Đọc tuần tự liên tiếp -> window nhân đôi (tối đa max_window)
+        - Seek (nhảy index / đổi video) -> window về min_window
+        - Số byte đọc trước bị giới hạn bởi budget mỗi session và phần cache
+          dành cho readahead (cache_fraction * capacity, chia đều cho các session)
+        """
+        self.min_window = min_window
+        self.max_window = max_window
+        self.session_budget_bytes = session_budget_bytes
+        self.cache_fraction = cache_fraction
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # session -> _Session (LRU để giới hạn bộ nhớ)
+        self.lock = threading.Lock()
+
+        self.stats = {'sequential': 0, 'seeks': 0}
+
+    def _window_cap(self, segment_size, cache):
+        if not segment_size:
+            return self.max_window
+        budget = self.session_budget_bytes
+        capacity = getattr(cache, 'capacity_bytes', None)
+        if capacity:
+            free = capacity - getattr(cache, 'current_size_bytes', capacity)
+            shared = max(free, capacity * self.cache_fraction) / max(1, len(self.sessions))
+            budget = min(budget, shared)
+        return max(self.min_window, min(self.max_window, int(budget // segment_size)))
+
+    def on_access(self, session, segment_id, segment_size=0, cache=None):
+        """
+        Ghi nhận 1 request của session.
+        Trả về (targets, window_ids): các segment cần prefetch thêm, và toàn bộ window hiện tại
+        (dùng để hủy các prefetch cũ nằm ngoài window).
+        """
+        parsed = parse_segment_id(segment_id)
+        if parsed is None:
+            return [], []
+        prefix, idx, width, suffix = parsed
+        stream = (prefix, width, suffix)
+
+        with self.lock:
+            state = self.sessions.get(session)
+            if state is not None and state.stream == stream and state.last_idx < idx <= state.last_idx + 1:
+                # Tuần tự: mở rộng window
+                state.window = min(state.window * 2, self.max_window)
+                self.stats['sequential'] += 1
+            elif state is not None and state.stream == stream and idx == state.last_idx:
+                pass  # Request lặp lại cùng segment: giữ nguyên
+            else:
+                if state is not None:
+                    self.stats['seeks'] += 1
+                state = _Session(stream, idx, self.min_window)
+                self.sessions[session] = state
+            self.sessions.move_to_end(session)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+            window = min(state.window, self._window_cap(segment_size, cache))
+            state.last_idx = idx
+            end = idx + window
+            start = max(state.ahead_end, idx) + 1
+            # Window co lại: phần ngoài window bị cancel, khi window nở lại phải gửi lại
+            state.ahead_end = end
+
+        window_ids = [format_segment_id(prefix, i, width, suffix) for i in range(idx + 1, end + 1)]
+        targets = window_ids[start - idx - 1:]
+        return targets, window_ids
+
+    def forget(self, session, segment_id):
+        """
+        Job prefetch segment_id của session bị bỏ trước khi chạy (vd hàng đợi đầy):
+        lùi ahead_end để lần access sau gửi lại, không để lại lỗ trong window
+        """
+        parsed = parse_segment_id(segment_id)
+        if parsed is None:
+            return
+        prefix, idx, width, suffix = parsed
+        with self.lock:
+            state = self.sessions.get(session)
+            if state is not None and state.stream == (prefix, width, suffix) and state.last_idx < idx <= state.ahead_end:
+                state.ahead_end = idx - 1
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, sessions=len(self.sessions))
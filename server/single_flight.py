@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+
+# Số key vừa xong flight được nhớ (cho finished_since)
+MAX_RECENT = 1024
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "tag")
+
+    def __init__(self, tag):
+        self.done = threading.Event()
+        self.tag = tag
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Gộp các lần đọc origin trùng key (request coalescing).
+        Request đầu tiên cho một key sẽ chạy fn(), các request đến sau
+        trong lúc đó chỉ chờ và dùng chung kết quả.
+        """
+        self.lock = threading.Lock()
+        self.calls = {}  # key -> _Call đang chạy
+        self.seq = 0                  # tăng mỗi khi 1 flight kết thúc
+        self.recent = OrderedDict()   # key -> seq lúc flight gần nhất của key kết thúc
+        self._forgotten = 0           # seq lớn nhất đã bị đẩy khỏi recent
+
+    def token(self):
+        """Mốc thời điểm (lấy trước khi tra cache) để hỏi finished_since sau đó"""
+        return self.seq
+
+    def finished_since(self, key, token):
+        """
+        Có flight nào của key kết thúc sau token không (-> cache có thể vừa được put).
+        Không còn nhớ key thì trả lời thận trọng theo seq đã quên.
+        """
+        with self.lock:
+            seq = self.recent.get(key)
+            return (seq if seq is not None else self._forgotten) > token
+
+    def do(self, key, fn, tag=True):
+        """
+        Trả về (result, shared). shared=False nếu tự chạy fn, ngược lại là tag của call
+        đang chạy mà mình chờ theo (mặc định True; vd tag="prefetch" để biết đã chờ prefetch)
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                owner = False
+            else:
+                call = _Call(tag)
+                self.calls[key] = call
+                owner = True
+
+        if not owner:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, call.tag
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+                self.seq += 1
+                self.recent[key] = self.seq
+                self.recent.move_to_end(key)
+                if len(self.recent) > MAX_RECENT:
+                    self._forgotten = self.recent.popitem(last=False)[1]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self, key):
+        with self.lock:
+            return key in self.calls
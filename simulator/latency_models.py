@@ -0,0 +1,45 @@
+import math
+import random
+
+
+class ConstantLatency:
+    def __init__(self, latency_ms=50.0):
+        """Origin luôn trả lời sau latency_ms (giống MediaServer.disk_latency)"""
+        self.latency_ms = latency_ms
+
+    def sample(self, n):
+        return [self.latency_ms] * n
+
+
+class LogNormalLatency:
+    def __init__(self, median_ms=50.0, sigma=0.5, seed=None):
+        """
+        Latency origin phân phối log-normal: phần lớn quanh median_ms, đuôi dài.
+        sigma càng lớn đuôi càng dài (sigma=0.5 -> p99 ~ 3.2 * median).
+        """
+        self.mu = math.log(median_ms)
+        self.sigma = sigma
+        self.rnd = random.Random(seed)
+
+    def sample(self, n):
+        lognormvariate = self.rnd.lognormvariate
+        mu, sigma = self.mu, self.sigma
+        return [lognormvariate(mu, sigma) for _ in range(n)]
+
+
+class EmpiricalLatency:
+    def __init__(self, samples_ms, seed=None):
+        """Lấy mẫu lại (có hoàn lại) từ các latency đo thật, vd từ log của origin"""
+        if not samples_ms:
+            raise ValueError("samples_ms is empty")
+        self.samples = list(samples_ms)
+        self.rnd = random.Random(seed)
+
+    @classmethod
+    def from_file(cls, path, seed=None):
+        """Mỗi dòng 1 giá trị latency (ms)"""
+        with open(path) as f:
+            return cls([float(line) for line in f if line.strip()], seed=seed)
+
+    def sample(self, n):
+        return self.rnd.choices(self.samples, k=n)
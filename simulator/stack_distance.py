@@ -0,0 +1,163 @@
+import zlib
+from array import array
+import numpy as np
+
+SHARDS_MODULUS = 1 << 24
+
+
+class StackDistanceAnalyzer:
+    def __init__(self, sample_rate=1.0, initial_slots=1 << 16):
+        """
+        Đường cong miss ratio của LRU cho MỌI dung lượng chỉ với 1 lần duyệt trace
+        (thuật toán Mattson, tính theo byte):
+        - Stack distance của 1 request = tổng size các key khác nhau được truy cập
+          kể từ lần trước của chính key đó (+ size của nó).
+          LRU dung lượng C hit <=> distance <= C.
+        - Fenwick tree đánh chỉ số theo thời điểm truy cập gần nhất của mỗi key
+          -> mỗi request O(log n).
+        - sample_rate < 1: lấy mẫu theo key kiểu SHARDS (hash(key) < rate * P),
+          distance được chia cho rate để quy về dung lượng thật.
+          Miss ratio theo request khá sát ở rate 1%; byte miss ratio dao động nhiều hơn
+          vì phụ thuộc size của vài key hot được chọn.
+        """
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        self.sample_rate = sample_rate
+        self.threshold = int(sample_rate * SHARDS_MODULUS)
+
+        self.slots = initial_slots
+        self.tree = [0] * (self.slots + 1)   # Fenwick, index 1..slots
+        self.next_pos = 1
+        self.last = {}                       # key -> (vị trí, size) của lần truy cập gần nhất
+        self.total_bytes = 0                 # tổng size các key đang có trong tree
+
+        # Kết quả: distance (byte, -1 = cold miss) và size của mỗi request được lấy mẫu
+        self.distances = array('q')
+        self.sizes = array('q')
+        self.requests = 0
+        self.cold_misses = 0
+
+    def _sampled(self, key):
+        if self.threshold >= SHARDS_MODULUS:
+            return True
+        if isinstance(key, str):
+            h = zlib.crc32(key.encode())
+        else:
+            h = hash(key)
+        return (h & (SHARDS_MODULUS - 1)) < self.threshold
+
+    def _add(self, pos, delta):
+        tree = self.tree
+        n = self.slots
+        while pos <= n:
+            tree[pos] += delta
+            pos += pos & -pos
+
+    def _prefix(self, pos):
+        tree = self.tree
+        s = 0
+        while pos > 0:
+            s += tree[pos]
+            pos -= pos & -pos
+        return s
+
+    def _compact(self):
+        """Hết chỗ trong tree: đánh số lại các key còn sống theo thứ tự thời gian"""
+        live = sorted(self.last.items(), key=lambda kv: kv[1][0])
+        self.slots = max(self.slots, 2 * len(live) + 1024)
+        self.tree = [0] * (self.slots + 1)
+        self.last = {}
+        for i, (key, (_, size)) in enumerate(live, 1):
+            self.last[key] = (i, size)
+            self._add(i, size)
+        self.next_pos = len(live) + 1
+
+    def access(self, key, size):
+        self.requests += 1
+        if not self._sampled(key):
+            return
+
+        prev = self.last.get(key)
+        if prev is None:
+            self.distances.append(-1)
+            self.cold_misses += 1
+        else:
+            pos, old_size = prev
+            # Byte của các key được truy cập sau lần trước của key này
+            above = self.total_bytes - self._prefix(pos)
+            self.distances.append(int((above + size) / self.sample_rate))
+            self._add(pos, -old_size)
+            self.total_bytes -= old_size
+        self.sizes.append(size)
+
+        if self.next_pos > self.slots:
+            self._compact()
+        pos = self.next_pos
+        self.next_pos += 1
+        self._add(pos, size)
+        self.total_bytes += size
+        self.last[key] = (pos, size)
+
+    def run(self, trace, sizes=None):
+        """trace: iterable các (key, size), hoặc các key nếu có sizes (dict hoặc hàm)"""
+        access = self.access
+        if sizes is None:
+            for key, size in trace:
+                access(key, size)
+        else:
+            size_of = sizes.__getitem__ if hasattr(sizes, '__getitem__') else sizes
+            for key in trace:
+                access(key, size_of(key))
+        return self
+
+    def curve(self, capacities_mb=None, points=100):
+        """
+        Miss ratio và byte miss ratio của LRU tại từng dung lượng (MB).
+        Mặc định: points điểm đều nhau từ 0 tới distance lớn nhất.
+        """
+        # Copy ra ndarray (view trực tiếp sẽ khóa không cho array append tiếp)
+        dist = np.array(self.distances, dtype=np.int64)
+        size = np.array(self.sizes, dtype=np.int64)
+        reuse = dist >= 0
+        order = np.argsort(dist[reuse], kind='stable')
+        sorted_dist = dist[reuse][order]
+        # cum_bytes[i] = số byte hit của i request có distance nhỏ nhất
+        cum_bytes = np.concatenate(([0], np.cumsum(size[reuse][order])))
+
+        if capacities_mb is None:
+            top = sorted_dist[-1] if len(sorted_dist) else 0
+            capacities = np.linspace(0, top, points)
+        else:
+            capacities = np.asarray(capacities_mb, dtype=np.float64) * 1024 * 1024
+
+        n = len(dist)
+        total_bytes = int(size.sum())
+        idx = np.searchsorted(sorted_dist, capacities, side='right')
+        hit_bytes = cum_bytes[idx]
+
+        # SHARDS-adj: số request lấy mẫu lệch khỏi kỳ vọng (requests * rate) chủ yếu do
+        # vài key rất hot được/không được chọn -> bù phần lệch vào các hit có distance nhỏ nhất
+        excess = int(round(n - self.requests * self.sample_rate)) if self.sample_rate < 1 else 0
+        if excess and len(sorted_dist):
+            k = min(abs(excess), len(sorted_dist))
+            adj_bytes = cum_bytes[k] / k * excess   # size trung bình của các hit đó
+            idx = np.maximum(idx - excess, 0)
+            hit_bytes = np.maximum(hit_bytes - adj_bytes, 0)
+            n, total_bytes = n - excess, total_bytes - adj_bytes
+        return {
+            "capacities_mb": capacities / (1024 * 1024),
+            "miss_ratio": (1 - idx / n) if n else np.ones_like(capacities),
+            "byte_miss_ratio": (1 - hit_bytes / total_bytes) if total_bytes else np.ones_like(capacities)
+        }
+
+    def miss_ratio(self, capacity_mb):
+        return float(self.curve([capacity_mb])["miss_ratio"][0])
+
+    def get_stats(self):
+        return {
+            "requests": self.requests,
+            "sampled": len(self.distances),
+            "sample_rate": self.sample_rate,
+            "cold_misses": self.cold_misses,
+            "tracked_keys": len(self.last)
+        }
@@ -0,0 +1,111 @@
+import time
+from server.latency_histogram import LatencyHistogram, PERCENTILES
+from .latency_models import ConstantLatency
+
+SAMPLE_BATCH = 65536   # số latency origin lấy mẫu trước mỗi lần
+
+
+class TraceSimulator:
+    def __init__(self, latency_model=None, hit_latency_ms=0.0, bandwidth_mb_s=None, warmup=0):
+        """
+        Replay trace vào 1 cache bất kỳ (get/put) với đồng hồ ảo:
+        không sleep, không đọc file, size object lấy từ metadata.
+        - latency_model: latency origin khi miss (ConstantLatency / LogNormalLatency /
+                         EmpiricalLatency), mặc định hằng 50ms như MediaServer
+        - hit_latency_ms: latency khi hit cache
+        - bandwidth_mb_s: nếu có, cộng thêm thời gian truyền size / bandwidth khi miss
+        - warmup: bỏ qua số request đầu khi tính số liệu (cache vẫn được nạp)
+        Client tuần tự: đồng hồ ảo tiến thêm latency của từng request.
+        Percentile lấy từ LatencyHistogram (bộ nhớ cố định, sai số < ~1.6%), avg/max chính xác.
+        """
+        self.latency_model = latency_model or ConstantLatency()
+        self.hit_latency_ms = hit_latency_ms
+        self.bandwidth_mb_s = bandwidth_mb_s
+        self.warmup = warmup
+        self._payload_buf = memoryview(b'')
+        self._payloads = {}   # size -> memoryview, dùng chung cho mọi key cùng size
+
+    def _payload(self, size):
+        """Giá trị giả để đưa vào cache: slice của 1 buffer chung, không cấp phát theo key"""
+        view = self._payloads.get(size)
+        if view is None:
+            if size > len(self._payload_buf):
+                self._payload_buf = memoryview(bytes(size))
+                self._payloads.clear()
+            view = self._payloads[size] = self._payload_buf[:size]
+        return view
+
+    def run(self, cache, trace, sizes=None):
+        """
+        trace: iterable các (key, size), hoặc các key nếu có sizes
+        sizes: dict key -> size (hoặc hàm key -> size)
+        Trả về dict số liệu giống MediaServer.get_metrics()
+        """
+        if sizes is not None:
+            size_of = sizes.__getitem__ if hasattr(sizes, '__getitem__') else sizes
+            trace = ((key, size_of(key)) for key in trace)
+
+        get, put = cache.get, cache.put
+        record_cost = getattr(cache, 'record_cost', None)
+        payload = self._payload
+        payloads = self._payloads
+        sample = self.latency_model.sample
+        bandwidth = self.bandwidth_mb_s * 1024 * 1024 / 1000 if self.bandwidth_mb_s else None  # byte/ms
+
+        pending = []      # latency origin đã lấy mẫu sẵn, lấy ra từ cuối
+        hist = LatencyHistogram()
+        record = hist.record
+        requests = hits = misses = 0
+        bytes_cache = bytes_disk = 0
+        clock_ms = 0.0    # đồng hồ ảo
+        warmup = self.warmup
+        hit_latency = self.hit_latency_ms
+
+        t0 = time.perf_counter()
+        for key, size in trace:
+            requests += 1
+            if get(key) is not None:
+                clock_ms += hit_latency
+                if requests > warmup:
+                    hits += 1
+                    bytes_cache += size
+                continue
+
+            if not pending:
+                pending = sample(SAMPLE_BATCH)
+            lat = pending.pop()
+            if bandwidth:
+                lat += size / bandwidth
+            clock_ms += lat
+            if record_cost is not None:
+                record_cost(key, lat / 1000)
+            put(key, payloads.get(size) or payload(size))
+            if requests > warmup:
+                record(lat)
+                misses += 1
+                bytes_disk += size
+        wall = time.perf_counter() - t0
+
+        counted = max(0, requests - warmup)
+        if hits:
+            record(hit_latency, hits)
+        lat = hist.snapshot()
+        metrics = {
+            "requests": counted,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": (hits / counted) if counted else 0,
+            "byte_hit_ratio": (bytes_cache / (bytes_cache + bytes_disk)) if bytes_cache + bytes_disk else 0,
+            "bytes_disk": bytes_disk,
+            "bytes_cache": bytes_cache,
+            "avg_latency": lat.get('avg', 0),
+            "max_latency": lat.get('max', 0),
+            "virtual_time_s": clock_ms / 1000,
+            "wall_time_s": wall,
+            "requests_per_s": (requests / wall) if wall > 0 else 0,
+            "cache": cache.get_stats()
+        }
+        for p in PERCENTILES:
+            name = f"p{p:g}".replace('.', '')
+            metrics[f"{name}_latency"] = lat.get(name, 0)
+        return metrics
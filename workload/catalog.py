@@ -0,0 +1,141 @@
+import os
+import json
+import random
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+FILL_MODES = ("sparse", "fallocate", "random")
+_RANDOM_BLOCK = 1 << 20   # fill="random": lặp lại 1 block ngẫu nhiên 1MB
+
+
+class Catalog:
+    def __init__(self, num_videos, seed=1, segment_seconds=4, median_segments=100,
+                 max_segments=1800, bitrates_kbps=(400, 800, 1500, 3000), thumb_kb=(8, 40)):
+        """
+        Catalog nhiều video, sinh xác định từ tham số (seed) -> chỉ cần lưu tham số.
+        Mỗi video: 1 thumbnail + N segment, N ~ log-normal quanh median_segments.
+        Size segment = bitrate của video * segment_seconds (±30%), thumbnail thumb_kb.
+        Object đánh số liên tục: base[v] = thumbnail của video v, base[v] + 1 + j = segment j.
+        """
+        self.params = {
+            "num_videos": num_videos,
+            "seed": seed,
+            "segment_seconds": segment_seconds,
+            "median_segments": median_segments,
+            "max_segments": max_segments,
+            "bitrates_kbps": list(bitrates_kbps),
+            "thumb_kb": list(thumb_kb)
+        }
+        self.num_videos = num_videos
+        self.segment_seconds = segment_seconds
+
+        rnd = random.Random(seed)
+        self.base = array('Q')       # object index đầu tiên (thumbnail) của từng video
+        self.sizes = array('I')      # size (byte) từng object
+        for _ in range(num_videos):
+            self.base.append(len(self.sizes))
+            n = min(max_segments, max(1, int(rnd.lognormvariate(0, 0.8) * median_segments)))
+            seg_bytes = rnd.choice(bitrates_kbps) * 1000 // 8 * segment_seconds
+            self.sizes.append(rnd.randint(thumb_kb[0], thumb_kb[1]) * 1024)
+            self.sizes.extend(int(seg_bytes * rnd.uniform(0.7, 1.3)) for _ in range(n))
+        self.base.append(len(self.sizes))
+
+    @classmethod
+    def from_meta(cls, params):
+        return cls(**params)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_meta(json.load(f))
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.params, f, indent=2)
+
+    @property
+    def num_objects(self):
+        return len(self.sizes)
+
+    @property
+    def total_bytes(self):
+        return sum(self.sizes)
+
+    def num_segments(self, video):
+        return self.base[video + 1] - self.base[video] - 1
+
+    def thumbnail(self, video):
+        return self.base[video]
+
+    def segment(self, video, idx):
+        return self.base[video] + 1 + idx
+
+    def video_of(self, obj):
+        return bisect_right(self.base, obj) - 1
+
+    def key(self, obj):
+        """Object index -> segment_id dùng với MediaServer (đường dẫn tương đối)"""
+        video = self.video_of(obj)
+        idx = obj - self.base[video]
+        if idx == 0:
+            return f"vid_{video:06d}/thumb.jpg"
+        return f"vid_{video:06d}/seg_{idx - 1:04d}.dat"
+
+    def size(self, obj):
+        return self.sizes[obj]
+
+    def materialize(self, root, fill="sparse", workers=None, chunk_videos=256):
+        """
+        Tạo file thật cho cả catalog dưới root (mỗi video 1 thư mục), song song nhiều process.
+        fill="sparse": chỉ truncate tới đúng size, không ghi dữ liệu (nhanh nhất, đọc ra toàn 0)
+        fill="fallocate": cấp phát block thật trên đĩa (posix_fallocate), không ghi dữ liệu
+        fill="random": ghi dữ liệu ngẫu nhiên (chậm, giống generate_data.py cũ)
+        """
+        if fill not in FILL_MODES:
+            raise ValueError(f"Unknown fill mode: {fill}")
+        os.makedirs(root, exist_ok=True)
+        self.save(os.path.join(root, "catalog.json"))
+
+        jobs = []
+        for start in range(0, self.num_videos, chunk_videos):
+            stop = min(start + chunk_videos, self.num_videos)
+            lo, hi = self.base[start], self.base[stop]
+            jobs.append((root, fill, start, stop, self.base[start:stop + 1], self.sizes[lo:hi]))
+
+        if workers == 1:
+            return sum(_write_videos(*job) for job in jobs)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return sum(pool.map(_write_videos, *zip(*jobs)))
+
+
+def _write_videos(root, fill, start, stop, base, sizes):
+    """Worker: tạo file cho video [start, stop). Trả về số file đã tạo"""
+    block = os.urandom(_RANDOM_BLOCK) if fill == "random" else None
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    offset = base[0]
+    count = 0
+    for i, video in enumerate(range(start, stop)):
+        vdir = os.path.join(root, f"vid_{video:06d}")
+        os.makedirs(vdir, exist_ok=True)
+        first, last = base[i] - offset, base[i + 1] - offset
+        for j in range(first, last):
+            name = "thumb.jpg" if j == first else f"seg_{j - first - 1:04d}.dat"
+            size = sizes[j]
+            fd = os.open(os.path.join(vdir, name), flags, 0o644)
+            try:
+                if fill == "sparse":
+                    os.ftruncate(fd, size)
+                elif fill == "fallocate":
+                    if size and hasattr(os, "posix_fallocate"):
+                        os.posix_fallocate(fd, 0, size)
+                    else:
+                        os.ftruncate(fd, size)   # macOS không có posix_fallocate
+                else:
+                    left = size
+                    while left > 0:
+                        left -= os.write(fd, block[:min(left, _RANDOM_BLOCK)])
+            finally:
+                os.close(fd)
+            count += 1
+    return count
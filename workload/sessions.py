@@ -0,0 +1,142 @@
+import math
+import heapq
+import random
+from itertools import accumulate
+
+DAY_SECONDS = 24 * 3600
+
+
+class SessionModel:
+    def __init__(self, catalog, seed=1, sessions_per_hour=3600, duration_hours=24,
+                 zipf_alpha=0.9, diurnal_amplitude=0.6, peak_hour=21,
+                 thumbs_per_session=4, early_abandon=0.15, abandon_hazard=0.01, seek_prob=0.02,
+                 flash_crowds=3, flash_minutes=30, flash_boost=2.0, flash_share=0.6):
+        """
+        Mô hình người xem sinh trace request theo thời gian:
+        - Session đến theo Poisson, tốc độ thay đổi theo giờ trong ngày (diurnal):
+              rate(t) = sessions_per_hour * (1 + amplitude * cos(2pi (t - peak) / 1 ngày))
+        - Mỗi session lướt vài thumbnail (video chọn theo Zipf), rồi xem 1 video (Zipf):
+          segment tuần tự, mỗi segment_seconds 1 request; bỏ xem với xác suất
+          early_abandon mỗi segment ở 3 segment đầu, abandon_hazard các segment sau;
+          seek tới vị trí ngẫu nhiên với xác suất seek_prob mỗi segment.
+        - flash_crowds lần trong trace, 1 video lạnh bỗng hot trong flash_minutes phút:
+          tốc độ session tăng thêm flash_boost lần và flash_share số session xem video đó.
+        requests() sinh (thời điểm giây, session id, object index) theo thứ tự thời gian,
+        bộ nhớ chỉ tỉ lệ với số session đang xem (không giữ cả trace).
+        """
+        self.catalog = catalog
+        self.params = {
+            "seed": seed,
+            "sessions_per_hour": sessions_per_hour,
+            "duration_hours": duration_hours,
+            "zipf_alpha": zipf_alpha,
+            "diurnal_amplitude": diurnal_amplitude,
+            "peak_hour": peak_hour,
+            "thumbs_per_session": thumbs_per_session,
+            "early_abandon": early_abandon,
+            "abandon_hazard": abandon_hazard,
+            "seek_prob": seek_prob,
+            "flash_crowds": flash_crowds,
+            "flash_minutes": flash_minutes,
+            "flash_boost": flash_boost,
+            "flash_share": flash_share
+        }
+        self.rnd = random.Random(seed)
+        self.duration = duration_hours * 3600
+        self.base_rate = sessions_per_hour / 3600
+        self.amplitude = diurnal_amplitude
+        self.peak = peak_hour * 3600
+        self.thumbs = thumbs_per_session
+        self.early_abandon = early_abandon
+        self.abandon_hazard = abandon_hazard
+        self.seek_prob = seek_prob
+        self.flash_boost = flash_boost
+        self.flash_share = flash_share
+
+        # Độ phổ biến Zipf: rank -> video ngẫu nhiên (video 0 không phải lúc nào cũng hot nhất)
+        n = catalog.num_videos
+        self.by_rank = list(range(n))
+        self.rnd.shuffle(self.by_rank)
+        self.cum_weights = list(accumulate(1 / (r + 1) ** zipf_alpha for r in range(n)))
+
+        # Flash crowd: (bắt đầu, kết thúc, video), chọn trong nửa ít phổ biến của catalog
+        self.flashes = []
+        for _ in range(flash_crowds):
+            start = self.rnd.uniform(0, max(0, self.duration - flash_minutes * 60))
+            video = self.by_rank[self.rnd.randrange(n // 2, n)] if n > 1 else 0
+            self.flashes.append((start, start + flash_minutes * 60, video))
+        self.flashes.sort()
+
+    def _popular_video(self):
+        return self.by_rank[self.rnd.choices(range(len(self.by_rank)), cum_weights=self.cum_weights)[0]]
+
+    def _flash_at(self, t):
+        for start, end, video in self.flashes:
+            if start <= t < end:
+                return video
+        return None
+
+    def _rate(self, t):
+        diurnal = 1 + self.amplitude * math.cos(2 * math.pi * (t - self.peak) / DAY_SECONDS)
+        boost = 1 + self.flash_boost if self._flash_at(t) is not None else 1
+        return self.base_rate * diurnal * boost
+
+    def _arrivals(self):
+        """Poisson không đồng nhất bằng thinning: sinh theo rate tối đa rồi giữ lại rate(t)/max"""
+        rnd = self.rnd
+        max_rate = self.base_rate * (1 + self.amplitude) * (1 + self.flash_boost)
+        t = 0.0
+        while True:
+            t += rnd.expovariate(max_rate)
+            if t >= self.duration:
+                return
+            if rnd.random() * max_rate <= self._rate(t):
+                yield t
+
+    def _session(self, t):
+        """Các request của 1 session: generator (thời điểm, object index)"""
+        rnd = self.rnd
+        catalog = self.catalog
+        for _ in range(rnd.randint(0, 2 * self.thumbs)):
+            yield t, catalog.thumbnail(self._popular_video())
+            t += rnd.uniform(0.3, 2.0)
+
+        flash = self._flash_at(t)
+        video = flash if flash is not None and rnd.random() < self.flash_share else self._popular_video()
+        n = catalog.num_segments(video)
+        idx = 0
+        watched = 0
+        while idx < n:
+            yield t, catalog.segment(video, idx)
+            watched += 1
+            hazard = self.early_abandon if watched <= 3 else self.abandon_hazard
+            if rnd.random() < hazard:
+                return
+            if rnd.random() < self.seek_prob:
+                idx = rnd.randrange(n)
+                t += rnd.uniform(0.2, 1.0)
+            else:
+                idx += 1
+                t += catalog.segment_seconds
+
+    def requests(self):
+        """Gộp các session đang chạy theo thời gian bằng heap"""
+        active = []   # (thời điểm request kế tiếp, session id, object, generator)
+        session_id = 0
+        for arrival in self._arrivals():
+            while active and active[0][0] <= arrival:
+                yield self._step(active)
+            gen = self._session(arrival)
+            first = next(gen, None)
+            if first is not None:
+                heapq.heappush(active, (first[0], session_id, first[1], gen))
+            session_id += 1
+        while active:
+            yield self._step(active)
+
+    def _step(self, active):
+        t, sid, obj, gen = heapq.heappop(active)
+        nxt = next(gen, None)
+        if nxt is not None:
+            heapq.heappush(active, (nxt[0], sid, nxt[1], gen))
+        return t, sid, obj
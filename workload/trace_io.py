@@ -0,0 +1,94 @@
+import json
+import struct
+from .catalog import Catalog
+
+MAGIC = b"MCTRACE1"
+# 1 record = thời điểm (µs), session id, object index, size (byte): 20 byte
+RECORD = struct.Struct("<QIII")
+_HEADER_LEN = struct.Struct("<I")
+BATCH_RECORDS = 65536
+
+
+class TraceWriter:
+    def __init__(self, path, meta=None):
+        """
+        Ghi trace nhị phân: MAGIC + độ dài header + header JSON (meta) + các record RECORD.
+        meta nên chứa "catalog" (Catalog.params) để lúc đọc dựng lại key của object.
+        """
+        self.f = open(path, "wb")
+        header = json.dumps(dict(meta or {}, record=RECORD.format)).encode()
+        self.f.write(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+        self.buf = bytearray(RECORD.size * BATCH_RECORDS)
+        self.pos = 0
+        self.count = 0
+
+    def write(self, t, session, obj, size):
+        RECORD.pack_into(self.buf, self.pos, int(t * 1_000_000), session, obj, size)
+        self.pos += RECORD.size
+        self.count += 1
+        if self.pos == len(self.buf):
+            self.f.write(self.buf)
+            self.pos = 0
+
+    def close(self):
+        if self.f:
+            self.f.write(memoryview(self.buf)[:self.pos])
+            self.f.close()
+            self.f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    def __init__(self, path):
+        """Đọc trace theo từng batch BATCH_RECORDS record, không nạp cả file vào RAM"""
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path}: not a trace file")
+            (n,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            self.meta = json.loads(f.read(n))
+            self.data_offset = f.tell()
+        self._catalog = None
+
+    @property
+    def catalog(self):
+        if self._catalog is None:
+            if "catalog" not in self.meta:
+                raise ValueError(f"{self.path}: trace has no catalog metadata")
+            self._catalog = Catalog.from_meta(self.meta["catalog"])
+        return self._catalog
+
+    def __iter__(self):
+        """(thời điểm giây, session id, object index, size)"""
+        with open(self.path, "rb") as f:
+            f.seek(self.data_offset)
+            while True:
+                chunk = f.read(RECORD.size * BATCH_RECORDS)
+                if not chunk:
+                    return
+                chunk = chunk[:len(chunk) - len(chunk) % RECORD.size]
+                for t_us, session, obj, size in RECORD.iter_unpack(chunk):
+                    yield t_us / 1_000_000, session, obj, size
+
+    def requests(self):
+        """(key, size): dùng trực tiếp cho TraceSimulator.run / StackDistanceAnalyzer.run"""
+        key = self.catalog.key
+        for _, _, obj, size in self:
+            yield key(obj), size
+
+
+def write_trace(path, model, max_requests=None):
+    """Ghi trace từ SessionModel, trả về số request đã ghi"""
+    catalog = model.catalog
+    meta = {"catalog": catalog.params, "sessions": model.params}
+    with TraceWriter(path, meta) as w:
+        for t, session, obj in model.requests():
+            w.write(t, session, obj, catalog.sizes[obj])
+            if max_requests and w.count >= max_requests:
+                break
+    return w.count